@@ -19,11 +19,31 @@ class CustomUserAdmin(UserAdmin):
     
     readonly_fields = ('uid',)
 
+class AdmissionPersonalInline(admin.StackedInline):
+    model = AdmissionPersonal
+    can_delete = False
+
+class AdmissionVisitorInline(admin.StackedInline):
+    model = AdmissionVisitor
+    can_delete = False
+
+class AdmissionCredentialInline(admin.StackedInline):
+    model = AdmissionCredential
+    can_delete = False
+
 class AdmissionAdmin(admin.ModelAdmin):
     list_display = ('student_name', 'father_name', 'mobile_number', 'enrolled_for', 'created_at')
     list_filter = ('enrolled_for', 'batch', 'created_at')
-    search_fields = ('student_name', 'father_name', 'mobile_number', 'adhaar_number')
+    list_select_related = ('personal',)
+    search_fields = ('student_name', 'personal__father_name', 'mobile_number', 'personal__adhaar_number')
     readonly_fields = ('created_at', 'updated_at')
+    inlines = [AdmissionPersonalInline, AdmissionVisitorInline, AdmissionCredentialInline]
+
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ('recorded_at', 'view_name', 'duration_ms', 'shape')
+    list_filter = ('view_name',)
+    search_fields = ('shape', 'view_name')
+    readonly_fields = ('shape', 'sql', 'params_sample', 'duration_ms', 'view_name', 'query_plan', 'recorded_at')
 
 admin.site.register(CustomUser, CustomUserAdmin)
 admin.site.register(Admission, AdmissionAdmin)
@@ -33,3 +53,4 @@ admin.site.register(Organization)
 admin.site.register(Exam)
 admin.site.register(StudentResult)
 admin.site.register(ExamAttendance)
+admin.site.register(SlowQuery, SlowQueryAdmin)
@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class InstituteConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'institute'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from .changes import connect_tombstones
+        from .db import apply_sqlite_pragmas
+        from .terms import connect_term_results
+
+        connection_created.connect(apply_sqlite_pragmas, dispatch_uid='institute_sqlite_pragmas')
+        connect_tombstones()
+        connect_term_results()
@@ -0,0 +1,66 @@
+"""Archive database for passed-out batches.
+
+``python manage.py archive_batch`` moves a finished batch into the ``archive``
+database. Primary keys are kept, and SQLite AUTOINCREMENT never reuses an id,
+so an id identifies the same row whichever database now holds it.
+"""
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import QuerySet
+from django.http import Http404
+
+ARCHIVE_DB = 'archive'
+
+# Apps whose tables exist in the archive database
+ARCHIVE_APPS = {'institute', 'auth', 'contenttypes'}
+
+
+def archive_configured():
+    return ARCHIVE_DB in settings.DATABASES
+
+
+def get_live_or_archived(queryset, **lookup):
+    """``get_object_or_404`` that falls back to the archive database.
+
+    The returned instance remembers its database, so related managers on it
+    (``admission.payments``, ``student.exam_results``) read from the same place.
+    """
+    if not isinstance(queryset, QuerySet):
+        queryset = queryset._default_manager.all()
+    try:
+        return queryset.get(**lookup)
+    except queryset.model.DoesNotExist:
+        pass
+    if archive_configured():
+        try:
+            return queryset.using(ARCHIVE_DB).get(**lookup)
+        except (queryset.model.DoesNotExist, DatabaseError):
+            # A missing row or an archive that was never migrated
+            pass
+    raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
+
+
+class ArchiveRouter:
+    """Keep archived rows, and everything reached through them, in the archive database.
+
+    Queries without an instance hint go to ``default``; the archive is only
+    read when a view asks for it with ``get_live_or_archived`` or ``using()``.
+    """
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return None
+
+    db_for_write = db_for_read
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if obj1._state.db and obj2._state.db:
+            return obj1._state.db == obj2._state.db
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == ARCHIVE_DB:
+            return app_label in ARCHIVE_APPS
+        return None
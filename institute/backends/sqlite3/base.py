@@ -0,0 +1,16 @@
+"""SQLite backend that can open write transactions with BEGIN IMMEDIATE.
+
+A plain (deferred) BEGIN only takes the write lock at the first INSERT or
+UPDATE; if another connection got there first, SQLite fails the upgrade
+with "database is locked" without waiting for busy_timeout. Blocks run
+through ``institute.db.write_transaction`` set ``begin_immediate`` so the
+lock is taken up front, where busy_timeout applies.
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    begin_immediate = False
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE' if self.begin_immediate else 'BEGIN')
@@ -0,0 +1,73 @@
+"""Shared helpers for the benchmark management commands."""
+import json
+import platform
+from datetime import datetime
+
+import django
+from django.test import Client
+
+from .models import Admission, CustomUser, Exam, Expense, Payment, StudentResult
+
+BENCHMARK_USERNAME = 'benchmark_admin'
+
+
+def get_benchmark_user():
+    """Admin account used to drive the views; created on first use."""
+    user, created = CustomUser.objects.get_or_create(
+        username=BENCHMARK_USERNAME, defaults={'user_type': 'admin', 'is_staff': True}
+    )
+    if created:
+        user.set_password(BENCHMARK_USERNAME)
+        user.save()
+    return user
+
+
+def logged_in_client(host='localhost'):
+    client = Client(HTTP_HOST=host)
+    client.force_login(get_benchmark_user())
+    return client
+
+
+def sample_ids():
+    """Representative primary keys for URL arguments (None when a table is empty)."""
+    result = (
+        StudentResult.objects.filter(exam__status='completed', student__is_admitted=True)
+        .values('exam_id', 'student_id').first()
+    )
+    return {
+        'admission': Admission.objects.filter(is_admitted=True).values_list('id', flat=True).first(),
+        'registration': Admission.objects.filter(is_admitted=False).values_list('id', flat=True).first(),
+        'payment': Payment.objects.values_list('id', flat=True).first(),
+        'expense': Expense.objects.values_list('id', flat=True).first(),
+        'exam': result['exam_id'] if result else Exam.objects.values_list('id', flat=True).first(),
+        'result_student': result['student_id'] if result else None,
+        'user': get_benchmark_user().id,
+    }
+
+
+def dataset_size():
+    return {
+        'admissions': Admission.objects.count(),
+        'payments': Payment.objects.count(),
+        'expenses': Expense.objects.count(),
+        'exams': Exam.objects.count(),
+        'results': StudentResult.objects.count(),
+    }
+
+
+def report_meta(include_dataset=True, **extra):
+    meta = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+    }
+    if include_dataset:
+        meta['dataset'] = dataset_size()
+    meta.update(extra)
+    return meta
+
+
+def write_report(path, report):
+    with open(path, 'w') as fh:
+        json.dump(report, fh, indent=2, sort_keys=True)
+        fh.write('\n')
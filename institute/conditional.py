@@ -0,0 +1,152 @@
+"""ETag validators for pages and JSON endpoints that staff re-open often.
+
+A validator reads, in one query, the ``updated_at`` of the main row plus the
+row count and newest ``updated_at`` of each related set the response shows.
+The count catches deletes, the timestamp catches inserts and edits. Pages
+also depend on who is looking and on the templates, so their ETag adds the
+user, the CSRF secret baked into their forms, the organization shown in the
+chrome and the deployed release.
+
+``revalidated(etag_func)`` wraps ``django.views.decorators.http.condition``:
+an unchanged response is answered with 304 before the view runs, and every
+response is marked ``private, no-cache`` so browsers always ask.
+"""
+import hashlib
+import os
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.db import DatabaseError
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+from .archive import ARCHIVE_DB, archive_configured
+from .models import Admission, Exam, Expense, Organization, Payment, StudentResult
+
+
+def count_and_latest(queryset, group_by, field='updated_at'):
+    """Scalar subqueries for the row count and newest ``field`` of ``queryset``."""
+    grouped = queryset.order_by().values(group_by)
+    return (
+        Subquery(grouped.annotate(rows=Count('pk')).values('rows')),
+        Subquery(grouped.annotate(latest=Max(field)).values('latest')),
+    )
+
+
+def first_row(queryset, archive=False):
+    """First row of ``queryset`` from the live database, then optionally the archive."""
+    row = queryset.first()
+    if row is None and archive and archive_configured():
+        try:
+            row = queryset.using(ARCHIVE_DB).first()
+        except DatabaseError:
+            row = None
+    return row
+
+
+def admission_state(admission_id):
+    return first_row(Admission.objects.filter(pk=admission_id).values_list('updated_at'))
+
+
+def account_state(admission_id, archive=False):
+    payments = count_and_latest(Payment.objects.filter(admission=OuterRef('pk')), 'admission')
+    expenses = count_and_latest(Expense.objects.filter(admission=OuterRef('pk')), 'admission')
+    return first_row(
+        Admission.objects.filter(pk=admission_id).annotate(
+            payment_rows=payments[0], payments_latest=payments[1],
+            expense_rows=expenses[0], expenses_latest=expenses[1],
+        ).values_list('updated_at', 'payment_rows', 'payments_latest', 'expense_rows', 'expenses_latest'),
+        archive=archive,
+    )
+
+
+def exam_state(exam_id):
+    """The exam, its results and the admitted roster of its batch."""
+    results = count_and_latest(StudentResult.objects.filter(exam=OuterRef('pk')), 'exam')
+    roster = count_and_latest(Admission.objects.filter(batch=OuterRef('batch'), is_admitted=True), 'batch')
+    return first_row(
+        Exam.objects.filter(pk=exam_id).annotate(
+            result_rows=results[0], results_latest=results[1],
+            roster_rows=roster[0], roster_latest=roster[1],
+        ).values_list('updated_at', 'result_rows', 'results_latest', 'roster_rows', 'roster_latest')
+    )
+
+
+def report_card_state(exam_id, student_id):
+    # The class rank on the card moves with every result of the exam
+    results = count_and_latest(StudentResult.objects.filter(exam_id=exam_id), 'exam')
+    row = first_row(
+        Admission.objects.filter(pk=student_id, is_admitted=True).annotate(
+            exam_updated=Subquery(Exam.objects.filter(pk=exam_id).values('updated_at')),
+            result_rows=results[0], results_latest=results[1],
+        ).values_list('updated_at', 'exam_updated', 'result_rows', 'results_latest'),
+        archive=True,
+    )
+    # A missing exam is the view's 404
+    return row if row is not None and row[1] is not None else None
+
+
+@lru_cache(maxsize=None)
+def release_version():
+    """Newest modification time of the templates, views and static manifest."""
+    paths = [os.path.join(os.path.dirname(__file__), 'views')]
+    paths += [str(directory) for directory in settings.TEMPLATES[0]['DIRS']]
+    latest = 0
+    for path in paths:
+        for dirpath, _, filenames in os.walk(path):
+            for filename in filenames:
+                latest = max(latest, os.stat(os.path.join(dirpath, filename)).st_mtime_ns)
+    if settings.STATIC_ROOT:
+        try:
+            latest = max(latest, os.stat(os.path.join(settings.STATIC_ROOT, 'staticfiles.json')).st_mtime_ns)
+        except OSError:
+            pass
+    return latest
+
+
+def make_etag(request, state, page):
+    if state is None or getattr(request.user, 'user_type', None) != 'admin':
+        return None
+    parts = [state]
+    if page:
+        # Flash messages are shown once; a 304 would hide them
+        if len(get_messages(request)):
+            return None
+        # Kept for organization_context, so a full render does not read it again
+        request.organization = Organization.objects.filter(status='active').first()
+        organization = (request.organization.pk, request.organization.updated_at) if request.organization else None
+        parts += [request.user.pk, request.META.get('CSRF_COOKIE', ''), organization, release_version()]
+    return '"%s"' % hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def student_account_etag(request, admission_id):
+    return make_etag(request, account_state(admission_id, archive=True), page=True)
+
+
+def result_list_etag(request, exam_id):
+    return make_etag(request, exam_state(exam_id), page=True)
+
+
+def report_card_etag(request, exam_id, student_id):
+    return make_etag(request, report_card_state(exam_id, student_id), page=True)
+
+
+def student_details_etag(request, student_id):
+    return make_etag(request, account_state(student_id), page=False)
+
+
+def admission_details_etag(request, student_id):
+    return make_etag(request, admission_state(student_id), page=False)
+
+
+def exam_stats_etag(request, exam_id):
+    return make_etag(request, exam_state(exam_id), page=False)
+
+
+def revalidated(etag_func):
+    """``condition(etag_func=...)`` plus ``Cache-Control: private, no-cache``."""
+    def decorator(view):
+        return cache_control(private=True, no_cache=True)(condition(etag_func=etag_func)(view))
+    return decorator
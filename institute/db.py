@@ -0,0 +1,68 @@
+"""SQLite tuning: per-connection pragmas and write transactions with retry."""
+import functools
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+
+logger = logging.getLogger('institute.performance')
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """connection_created hook applying ``settings.SQLITE_PRAGMAS`` to new SQLite connections."""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', None)
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def is_locked_error(exc):
+    message = str(exc).lower()
+    return 'database is locked' in message or 'database table is locked' in message
+
+
+def write_transaction(func=None, *, using=None, attempts=None, backoff=None):
+    """Run ``func`` in an atomic block opened with BEGIN IMMEDIATE, retrying on lock errors.
+
+    Retries happen only for the outermost block, up to ``SQLITE_WRITE_ATTEMPTS``
+    times with jittered exponential backoff starting at ``SQLITE_WRITE_BACKOFF``
+    seconds. On backends other than ``institute.backends.sqlite3`` the block is
+    a normal ``transaction.atomic``.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def inner(*args, **kwargs):
+            alias = using or DEFAULT_DB_ALIAS
+            max_attempts = attempts or getattr(settings, 'SQLITE_WRITE_ATTEMPTS', 5)
+            delay = backoff if backoff is not None else getattr(settings, 'SQLITE_WRITE_BACKOFF', 0.05)
+            connection = connections[alias]
+
+            for attempt in range(1, max_attempts + 1):
+                outermost = not connection.in_atomic_block
+                try:
+                    if outermost:
+                        connection.begin_immediate = True
+                    try:
+                        with transaction.atomic(using=alias):
+                            # Only the outermost BEGIN needs to be immediate
+                            connection.begin_immediate = False
+                            return func(*args, **kwargs)
+                    finally:
+                        connection.begin_immediate = False
+                except OperationalError as exc:
+                    if not outermost or not is_locked_error(exc) or attempt == max_attempts:
+                        raise
+                    logger.warning('%s hit a locked database (attempt %d/%d), retrying',
+                                   func.__qualname__, attempt, max_attempts)
+                    time.sleep(delay * (2 ** (attempt - 1)) * (1 + random.random()))
+        return inner
+
+    if func is not None:
+        return decorator(func)
+    return decorator
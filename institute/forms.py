@@ -1,6 +1,8 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
+from django.core.validators import FileExtensionValidator
 from .models import * 
+from .images import process_photo
 
 class UserRegistrationForm(UserCreationForm):
     user_type = forms.ChoiceField(choices=CustomUser.USER_TYPE_CHOICES, required=True)
@@ -32,7 +34,9 @@ class UserLoginForm(forms.Form):
 class AdmissionForm(forms.ModelForm):
     class Meta:
         model = Admission
-        fields = '__all__'  # Make sure this includes all fields
+        # submitted_by/admitted_by are set by the views; as fields they would
+        # render a <select> of every user and accept any user id from the client
+        exclude = ['submitted_by', 'admitted_by']
         widgets = {
             'date_of_birth': forms.DateInput(attrs={'type': 'date'}),
             'address': forms.Textarea(attrs={'rows': 3}),
@@ -44,6 +48,14 @@ class AdmissionForm(forms.ModelForm):
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        # Personal, visitor and credential fields live on Admission's detail records
+        for model in Admission.DETAIL_MODELS.values():
+            detail_fields = forms.fields_for_model(model, exclude=['admission'], widgets=self._meta.widgets)
+            self.fields.update(detail_fields)
+            if self.instance.pk:
+                for field_name in detail_fields:
+                    self.initial.setdefault(field_name, getattr(self.instance, field_name))
+        
         # Add help text for student_image field
         self.fields['student_image'].help_text = 'Accepted formats: JPG, PNG, GIF (Max 5MB)'
         self.fields['student_image'].required = False
@@ -66,8 +78,29 @@ class AdmissionForm(forms.ModelForm):
         # Make sure is_admitted is not required (it has a default)
         if 'is_admitted' in self.fields:
             self.fields['is_admitted'].required = False
+    
+    def save(self, commit=True):
+        # Admission.save() writes the detail records, also after commit=False
+        for field_name in Admission.DETAIL_FIELDS:
+            if field_name in self.cleaned_data:
+                setattr(self.instance, field_name, self.cleaned_data[field_name])
+        # Store the upload once per content hash, re-encoded with its thumbnails
+        photo = self.cleaned_data.get('student_image')
+        if photo and 'student_image' in self.changed_data:
+            photo.seek(0)
+            self.instance.student_image = process_photo(photo.read())
+        return super().save(commit)
         
         
+class AdmissionImportForm(forms.Form):
+    """Sheet of registrations for ``institute.imports``"""
+    file = forms.FileField(
+        validators=[FileExtensionValidator(['csv', 'xlsx'])],
+        widget=forms.FileInput(attrs={'accept': '.csv,.xlsx', 'class': 'form-control'}),
+        help_text='CSV (UTF-8) or XLSX, one registration per row, column names in the first row',
+    )
+
+
 class ExpenseForm(forms.ModelForm):
     class Meta:
         model = Expense
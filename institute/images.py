@@ -0,0 +1,96 @@
+"""Student photo processing: orientation fix, metadata stripping and thumbnails.
+
+A processed photo is stored once per content hash as
+``student_images/<hash>.jpg`` with its derivatives beside it in
+``student_images/thumbs/<hash>-<size>.<webp|jpg>``, so the same upload made
+twice shares its files. Photos saved before processing existed keep their
+original name and are served as-is until ``manage.py process_student_images``
+converts them.
+"""
+import hashlib
+import io
+import os
+import re
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+UPLOAD_DIR = 'student_images'
+THUMBNAIL_DIR = f'{UPLOAD_DIR}/thumbs'
+THUMBNAIL_SIZES = (64, 160, 480)
+# Longest side of the stored photo; phone originals are several times larger
+MAX_SIZE = 1600
+JPEG_QUALITY = 85
+WEBP_QUALITY = 80
+
+HASHED_NAME = re.compile(r'^[0-9a-f]{32}$')
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+def photo_hash(name):
+    """The content hash in a processed photo's file name, else None."""
+    stem = os.path.splitext(os.path.basename(name or ''))[0]
+    return stem if HASHED_NAME.match(stem) else None
+
+
+def thumbnail_name(digest, size, fmt='webp'):
+    return f"{THUMBNAIL_DIR}/{digest}-{size}.{'jpg' if fmt == 'jpeg' else fmt}"
+
+
+def encode(image, fmt):
+    buffer = io.BytesIO()
+    if fmt == 'webp':
+        image.save(buffer, 'WEBP', quality=WEBP_QUALITY, method=4)
+    else:
+        image.save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def save_once(storage, name, data):
+    if not storage.exists(name):
+        storage.save(name, ContentFile(data))
+
+
+def process_photo(data, storage=None):
+    """Store a photo upload and its thumbnails; returns the stored photo's name.
+
+    ``data`` is the raw upload. EXIF orientation is applied to the pixels and
+    every file is re-encoded, which drops EXIF, GPS and other metadata.
+    """
+    storage = storage or default_storage
+    digest = content_hash(data)
+    name = f'{UPLOAD_DIR}/{digest}.jpg'
+    if storage.exists(name) and all(
+        storage.exists(thumbnail_name(digest, size, fmt))
+        for size in THUMBNAIL_SIZES for fmt in ('webp', 'jpeg')
+    ):
+        return name
+
+    # Pillow is only needed once a photo is uploaded
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+    image.thumbnail((MAX_SIZE, MAX_SIZE), Image.LANCZOS)
+    save_once(storage, name, encode(image, 'jpeg'))
+    for size in THUMBNAIL_SIZES:
+        thumb = image.copy()
+        thumb.thumbnail((size, size), Image.LANCZOS)
+        for fmt in ('webp', 'jpeg'):
+            save_once(storage, thumbnail_name(digest, size, fmt), encode(thumb, fmt))
+    return name
+
+
+def thumbnail_url(image_file, size, fmt='webp'):
+    """URL of the ``size`` px derivative of ``image_file``, or of the original if unprocessed."""
+    if not image_file:
+        return ''
+    digest = photo_hash(image_file.name)
+    if digest is None:
+        return image_file.url
+    return image_file.storage.url(thumbnail_name(digest, size, fmt))
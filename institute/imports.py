@@ -0,0 +1,213 @@
+"""Bulk admission import from CSV or XLSX sheets sent by partner schools.
+
+Rows are read one at a time and checked with ``AdmissionForm``'s field
+rules: the form's fields are built once and each value goes through
+``Field.clean``, so no form is built per row. Valid rows are written
+``batch_size`` at a time, each batch in one write transaction that takes a
+block of consecutive ``TMIS`` numbers and ``bulk_create``s the admissions
+with their detail records. Rejected rows are copied to a CSV error report
+with their row number and errors, so memory use does not grow with the file.
+
+XLSX files need ``openpyxl``; CSV always works.
+"""
+import csv
+import io
+import os
+import re
+import time
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+
+from .db import write_transaction
+from .exports import csv_value
+from .forms import AdmissionForm
+from .models import Admission
+
+try:
+    import openpyxl
+except ImportError:  # XLSX import is optional
+    openpyxl = None
+
+# Filled in by the import, never read from the sheet
+SKIPPED_FIELDS = ('admission_id', 'student_image', 'is_admitted', 'admission_date')
+BATCH_SIZE = 500
+REPORT_PREFIX = 'admissions-'
+REPORT_NAME = re.compile(r'admissions-[0-9a-f]{32}\.csv')
+# Error reports older than this are removed by the next import
+REPORT_MAX_AGE = 7 * 24 * 3600
+
+
+def get_report_root():
+    return getattr(settings, 'IMPORT_REPORT_ROOT', 'import_reports')
+
+
+def new_report_path():
+    """Path for a new error report; its name is what the download URL carries."""
+    root = get_report_root()
+    os.makedirs(root, exist_ok=True)
+    prune_reports(root)
+    return os.path.join(root, f'{REPORT_PREFIX}{uuid.uuid4().hex}.csv')
+
+
+def report_path(name):
+    """Path of an existing error report, or None for unknown or malformed names."""
+    if not REPORT_NAME.fullmatch(name):
+        return None
+    path = os.path.join(get_report_root(), name)
+    return path if os.path.isfile(path) else None
+
+
+def prune_reports(root):
+    cutoff = time.time() - REPORT_MAX_AGE
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if REPORT_NAME.fullmatch(name) and os.path.getmtime(path) < cutoff:
+            os.remove(path)
+
+
+def import_fields():
+    """``{name: form field}`` for every column a sheet may fill."""
+    return {name: field for name, field in AdmissionForm().fields.items() if name not in SKIPPED_FIELDS}
+
+
+def normalize_header(header):
+    return '_'.join(str(header or '').replace("'", '').lower().split())
+
+
+def read_csv(fh):
+    try:
+        yield from csv.reader(io.TextIOWrapper(fh, encoding='utf-8-sig', newline=''))
+    except UnicodeDecodeError:
+        raise ValidationError('The CSV file is not UTF-8 encoded; save it again as "CSV UTF-8".')
+
+
+def read_xlsx(fh):
+    if openpyxl is None:
+        raise ValidationError('XLSX import needs the openpyxl package; save the sheet as CSV instead.')
+    # read_only streams the sheet instead of loading every cell
+    workbook = openpyxl.load_workbook(fh, read_only=True, data_only=True)
+    try:
+        yield from workbook.worksheets[0].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def read_rows(fh, filename):
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == '.csv':
+        return read_csv(fh)
+    if extension == '.xlsx':
+        return read_xlsx(fh)
+    raise ValidationError('Upload a .csv or .xlsx file.')
+
+
+def map_columns(header, fields):
+    """``([(position, field name)], ignored headers)``; raises if required columns are missing."""
+    names = {}
+    for name, field in fields.items():
+        names[normalize_header(name)] = name
+        names.setdefault(normalize_header(field.label), name)
+    columns, ignored, present = [], [], set()
+    for position, title in enumerate(header):
+        name = names.get(normalize_header(title))
+        if name and name not in present:
+            columns.append((position, name))
+            present.add(name)
+        elif str(title or '').strip():
+            ignored.append(str(title).strip())
+    missing = [name for name, field in fields.items() if field.required and name not in present]
+    if missing:
+        raise ValidationError(f'Missing required columns: {", ".join(missing)}')
+    return columns, ignored
+
+
+def defaulted_fields():
+    """Admission fields whose model default fills an empty cell (subjects, fees)."""
+    return {field.name for field in Admission._meta.concrete_fields if field.has_default()}
+
+
+def clean_row(fields, columns, values, defaulted=()):
+    """``(cleaned values, error messages)`` of one sheet row."""
+    cleaned, errors = {}, []
+    for position, name in columns:
+        value = values[position] if position < len(values) else None
+        if isinstance(value, str):
+            value = value.strip()
+        elif isinstance(value, float) and value.is_integer():
+            # Spreadsheets store mobile and roll numbers as floats
+            value = int(value)
+        if value in (None, '') and name in defaulted:
+            continue
+        try:
+            cleaned[name] = fields[name].clean(value)
+        except ValidationError as e:
+            errors.append(f'{name}: {" ".join(e.messages)}')
+    return cleaned, errors
+
+
+def next_admission_number():
+    """Number after the newest admission's ``TMIS`` id, as ``Admission.save`` counts."""
+    last = Admission.objects.exclude(admission_id__isnull=True).order_by('-id').values_list('admission_id', flat=True).first()
+    try:
+        return int(last[4:]) + 1
+    except (TypeError, ValueError):
+        return 1
+
+
+@write_transaction
+def insert_batch(admissions):
+    """Give ``admissions`` one block of consecutive ids and insert them."""
+    number = next_admission_number()
+    for offset, admission in enumerate(admissions):
+        admission.admission_id = f'TMIS{number + offset:04d}'
+    Admission.objects.bulk_create(admissions)
+
+
+def import_sheet(fh, filename, user=None, report=None, batch_size=BATCH_SIZE):
+    """Import the registrations in ``fh``; rejected rows are written to the ``report`` text file.
+
+    Returns ``{'rows', 'imported', 'rejected', 'first_id', 'last_id', 'ignored_columns'}``.
+    Batches already written stay if a later one fails.
+    """
+    rows = read_rows(fh, filename)
+    header = next(rows, None)
+    if not header:
+        raise ValidationError('The file is empty.')
+    fields = import_fields()
+    columns, ignored = map_columns(header, fields)
+    defaulted = defaulted_fields()
+    writer = csv.writer(report) if report is not None else None
+    if writer:
+        writer.writerow(['row', 'errors', *map(csv_value, header)])
+
+    summary = {'rows': 0, 'imported': 0, 'rejected': 0, 'first_id': None, 'last_id': None,
+               'ignored_columns': ignored}
+    batch = []
+
+    def flush():
+        insert_batch(batch)
+        summary['imported'] += len(batch)
+        summary['first_id'] = summary['first_id'] or batch[0].admission_id
+        summary['last_id'] = batch[-1].admission_id
+        batch.clear()
+
+    # Row numbers as the spreadsheet shows them, the header being row 1
+    for number, values in enumerate(rows, start=2):
+        values = list(values)
+        if not any(str(value).strip() for value in values if value is not None):
+            continue
+        summary['rows'] += 1
+        cleaned, errors = clean_row(fields, columns, values, defaulted)
+        if errors:
+            summary['rejected'] += 1
+            if writer:
+                writer.writerow([number, '; '.join(errors), *map(csv_value, values)])
+            continue
+        batch.append(Admission(submitted_by=user, **cleaned))
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return summary
@@ -0,0 +1,265 @@
+"""Replay a weighted request mix against a running server with concurrent workers.
+
+Used by the ``loadtest`` management command. Each worker thread picks
+requests from a mix according to their weights until the run's deadline,
+recording latency, status and whether the response reports SQLite's
+"database is locked" error, in its body or the ``X-Database-Locked`` header.
+"""
+import http.client
+import json
+import random
+import threading
+import time
+from datetime import date
+from urllib.parse import urlencode, urlsplit
+
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.middleware.csrf import CSRF_ALLOWED_CHARS, CSRF_SECRET_LENGTH
+from django.urls import reverse
+from django.utils.crypto import get_random_string
+
+from .middleware import LOCKED_HEADER
+from .models import Admission, Exam, Payment, StudentResult
+from .stats import summarize
+
+LOCKED_MARKER = b'database is locked'
+
+
+class RequestSpec:
+    """One entry of a request mix: a weight and a builder returning (method, path, body).
+
+    ``body`` is a dict for form posts, a JSON string for AJAX posts or None.
+    """
+
+    def __init__(self, name, weight, build):
+        self.name = name
+        self.weight = weight
+        self.build = build
+
+
+class SampleData:
+    """Primary keys the request builders draw from, loaded once before the run."""
+
+    def __init__(self, limit=2000):
+        self.admitted = list(Admission.objects.filter(is_admitted=True).values_list('id', flat=True)[:limit])
+        self.registrations = list(Admission.objects.filter(is_admitted=False).values_list('id', flat=True)[:limit])
+        self.names = list(
+            Admission.objects.filter(is_admitted=True).values_list('student_name', flat=True)[:200]
+        )
+        self.payments = list(Payment.objects.values_list('id', flat=True)[:limit])
+        self.exams = list(Exam.objects.filter(status='completed').values_list('id', flat=True)[:200])
+        self.exam_students = {}
+        for exam_id, student_id in StudentResult.objects.filter(exam_id__in=self.exams).values_list('exam_id', 'student_id'):
+            self.exam_students.setdefault(exam_id, []).append(student_id)
+        self.exams = [exam_id for exam_id in self.exams if exam_id in self.exam_students]
+        self.report_cards = list(
+            StudentResult.objects.filter(exam_id__in=self.exams).values_list('exam_id', 'student_id')[:limit]
+        )
+
+    def search_term(self, rng):
+        name = rng.choice(self.names) if self.names else 'Das'
+        return name.split()[-1][:4]
+
+
+def _search(rng, data):
+    return 'GET', reverse('search_students') + '?' + urlencode({'q': data.search_term(rng)}), None
+
+
+def _account_search(rng, data):
+    return 'GET', reverse('account_search') + '?' + urlencode({'search': data.search_term(rng)}), None
+
+
+def _dashboard(rng, data):
+    return 'GET', reverse('admin_dashboard'), None
+
+
+def _student_account(rng, data):
+    return 'GET', reverse('student_account', args=[rng.choice(data.admitted)]), None
+
+
+def _payment(rng, data):
+    return 'POST', reverse('add_payment_general'), {
+        'admission_id': rng.choice(data.admitted),
+        'date': date.today().isoformat(),
+        'payment_method': rng.choice(['cash', 'online']),
+        'payment_type': 'tuition',
+        'description': 'Load test installment',
+        'amount': rng.randrange(5, 50) * 100,
+    }
+
+
+def _result_entry(rng, data):
+    exam_id = rng.choice(data.exams)
+    students = data.exam_students[exam_id]
+    post = {}
+    for student_id in rng.sample(students, min(len(students), 30)):
+        post[f'marks_{student_id}'] = rng.randrange(20, 100)
+    return 'POST', reverse('bulk_update_results', args=[exam_id]), post
+
+
+def _admit(rng, data):
+    pool = data.registrations or data.admitted
+    return 'POST', reverse('toggle_admit', args=[rng.choice(pool)]), json.dumps({'is_admitted': True})
+
+
+def _receipt_pdf(rng, data):
+    return 'GET', reverse('generate_receipt', args=[rng.choice(data.payments)]), None
+
+
+def _ledger_pdf(rng, data):
+    return 'GET', reverse('account_report', args=[rng.choice(data.admitted)]), None
+
+
+def _report_card_pdf(rng, data):
+    exam_id, student_id = rng.choice(data.report_cards)
+    query = urlencode({'download': 'pdf', 'exam': exam_id, 'student': student_id})
+    return 'GET', reverse('report_card') + '?' + query, None
+
+
+# Weighted mixes; weights are relative within a mix
+MIXES = {
+    # Counter staff and teachers during admission week
+    'admission_week': [
+        RequestSpec('search_students', 25, _search),
+        RequestSpec('account_search', 5, _account_search),
+        RequestSpec('admin_dashboard', 10, _dashboard),
+        RequestSpec('student_account', 15, _student_account),
+        RequestSpec('add_payment_general', 20, _payment),
+        RequestSpec('bulk_update_results', 8, _result_entry),
+        RequestSpec('toggle_admit', 5, _admit),
+        RequestSpec('generate_receipt', 6, _receipt_pdf),
+        RequestSpec('account_report', 3, _ledger_pdf),
+        RequestSpec('report_card_pdf', 3, _report_card_pdf),
+    ],
+    # Write-only mix for measuring lock contention
+    'writes': [
+        RequestSpec('add_payment_general', 60, _payment),
+        RequestSpec('bulk_update_results', 25, _result_entry),
+        RequestSpec('toggle_admit', 15, _admit),
+    ],
+}
+
+
+def parse_weights(mix, overrides):
+    """Apply ``name=weight,...`` overrides to a mix, dropping zero-weight entries."""
+    weights = {}
+    for item in filter(None, (part.strip() for part in overrides.split(','))):
+        name, _, weight = item.partition('=')
+        weights[name.strip()] = float(weight)
+    specs = [RequestSpec(spec.name, weights.get(spec.name, spec.weight), spec.build) for spec in mix]
+    return [spec for spec in specs if spec.weight > 0]
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(host='127.0.0.1', port=0):
+    """Serve the project's WSGI application from a background thread."""
+    from django.core.wsgi import get_wsgi_application
+
+    server = ThreadedWSGIServer((host, port), QuietRequestHandler)
+    server.set_app(get_wsgi_application())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+
+class LoadTest:
+    def __init__(self, base_url, mix, session_key, workers=15, duration=60.0, seed=None, timeout=60.0):
+        self.base_url = urlsplit(base_url)
+        self.mix = mix
+        self.workers = workers
+        self.duration = duration
+        self.seed = seed
+        self.timeout = timeout
+        self.csrf_token = get_random_string(CSRF_SECRET_LENGTH, allowed_chars=CSRF_ALLOWED_CHARS)
+        self.cookie = f'sessionid={session_key}; csrftoken={self.csrf_token}'
+        self.samples = []
+        self.lock = threading.Lock()
+
+    def run(self, data):
+        deadline = time.perf_counter() + self.duration
+        started = time.perf_counter()
+        threads = [
+            threading.Thread(target=self.worker, args=(index, data, deadline), daemon=True)
+            for index in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.report(time.perf_counter() - started)
+
+    def worker(self, index, data, deadline):
+        rng = random.Random(None if self.seed is None else self.seed + index)
+        weights = [spec.weight for spec in self.mix]
+        while time.perf_counter() < deadline:
+            spec = rng.choices(self.mix, weights)[0]
+            method, path, post = spec.build(rng, data)
+            sample = self.send(spec.name, method, path, post)
+            with self.lock:
+                self.samples.append(sample)
+
+    def send(self, name, method, path, post):
+        headers = {'Cookie': self.cookie, 'X-CSRFToken': self.csrf_token}
+        body = None
+        if isinstance(post, dict):
+            body = urlencode(post)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        elif post is not None:
+            body = post
+            headers['Content-Type'] = 'application/json'
+        start = time.perf_counter()
+        connection = http.client.HTTPConnection(self.base_url.hostname, self.base_url.port, timeout=self.timeout)
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            payload = response.read()
+            status = response.status
+            locked = response.getheader(LOCKED_HEADER) == '1'
+        except (OSError, http.client.HTTPException):
+            payload, status, locked = b'', 0, False
+        finally:
+            connection.close()
+        return {
+            'name': name,
+            'latency_ms': (time.perf_counter() - start) * 1000,
+            'status': status,
+            # JSON views report the message themselves; the header covers plain 500 pages
+            'locked': locked or LOCKED_MARKER in payload,
+        }
+
+    def report(self, elapsed):
+        endpoints = {}
+        for sample in self.samples:
+            endpoints.setdefault(sample['name'], []).append(sample)
+
+        per_endpoint = {}
+        for name, samples in sorted(endpoints.items()):
+            latency = summarize([s['latency_ms'] for s in samples])
+            errors = sum(1 for s in samples if s['status'] == 0 or s['status'] >= 500)
+            locked = sum(1 for s in samples if s['locked'])
+            per_endpoint[name] = {
+                'requests': len(samples),
+                'throughput_rps': len(samples) / elapsed if elapsed else 0.0,
+                'latency_ms': latency,
+                'errors': errors,
+                'locked_errors': locked,
+                'locked_error_rate': locked / len(samples),
+            }
+
+        total = len(self.samples)
+        locked_total = sum(1 for s in self.samples if s['locked'])
+        return {
+            'workers': self.workers,
+            'duration_s': elapsed,
+            'requests': total,
+            'throughput_rps': total / elapsed if elapsed else 0.0,
+            'latency_ms': summarize([s['latency_ms'] for s in self.samples]),
+            'errors': sum(e['errors'] for e in per_endpoint.values()),
+            'locked_errors': locked_total,
+            'locked_error_rate': locked_total / total if total else 0.0,
+            'endpoints': per_endpoint,
+        }
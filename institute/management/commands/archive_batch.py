@@ -0,0 +1,162 @@
+"""Move a passed-out batch into the archive database.
+
+::
+
+    python manage.py archive_batch 2022-2024 --dry-run
+    python manage.py archive_batch 2022-2024 --vacuum
+
+The batch's admissions, their detail records, payments, expenses, results and
+exam attendance are copied to the ``archive`` database in chunks inside one
+archive transaction, counted, and only then deleted from ``default`` in one
+write transaction. Exams of the batch move too; exams and users referenced by
+the moved rows are copied (users with an unusable password) so the archive is
+self-contained. A run interrupted between the two transactions can simply be
+repeated: the copy ignores rows the archive already has.
+"""
+import re
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from institute.archive import ARCHIVE_DB, archive_configured
+from institute.db import write_transaction
+from institute.models import (
+    Admission, AdmissionCredential, AdmissionPersonal, AdmissionVisitor, CustomUser,
+    Exam, ExamAttendance, Expense, Payment, StudentResult, TermResult,
+)
+
+# Foreign keys to CustomUser on the moved models
+USER_FIELDS = {
+    Admission: ['submitted_by', 'admitted_by'],
+    Payment: ['received_by'],
+    Expense: ['added_by'],
+    StudentResult: ['entered_by'],
+    ExamAttendance: ['marked_by'],
+    Exam: ['created_by'],
+}
+
+
+def batch_end_year(batch):
+    years = re.findall(r'\d{4}', batch)
+    return int(years[-1]) if years else None
+
+
+class Command(BaseCommand):
+    help = 'Move a passed-out batch and its payments, expenses, results and attendance into the archive database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('batch', help='Batch name, e.g. 2022-2024')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Rows per bulk_create call')
+        parser.add_argument('--force', action='store_true', help='Archive a batch whose last year has not ended')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be moved')
+        parser.add_argument('--vacuum', action='store_true', help='VACUUM the live database afterwards')
+
+    def handle(self, *args, **options):
+        if not archive_configured():
+            raise CommandError(f"settings.DATABASES has no '{ARCHIVE_DB}' database")
+        batch = options['batch']
+        end_year = batch_end_year(batch)
+        if not options['force'] and (end_year is None or end_year >= timezone.now().year):
+            raise CommandError(f'Batch {batch} has not passed out yet; use --force to archive it anyway')
+        if not Admission.objects.filter(batch=batch).exists():
+            raise CommandError(f'No admissions in batch {batch}')
+        self.check_id_sequences(batch)
+
+        moved = self.moved_querysets(batch)
+        exams = self.exam_queryset(batch)
+        users = CustomUser.objects.filter(self.user_filter(batch))
+        counts = {model._meta.label: queryset.count() for model, queryset in moved}
+        for label, count in counts.items():
+            self.stdout.write(f'{label:32s} {count:8d}')
+        if options['dry_run']:
+            return
+
+        call_command('migrate', database=ARCHIVE_DB, interactive=False, verbosity=0)
+        chunk_size = options['chunk_size']
+        with transaction.atomic(using=ARCHIVE_DB):
+            self.copy(users, chunk_size, prepare=lambda user: user.set_unusable_password())
+            self.copy(exams, chunk_size)
+            for model, queryset in moved:
+                self.copy(queryset, chunk_size)
+            for model, queryset in moved:
+                archived = queryset.using(ARCHIVE_DB).count()
+                if archived < counts[model._meta.label]:
+                    raise CommandError(
+                        f'{model._meta.label}: {archived} rows in the archive, '
+                        f'expected {counts[model._meta.label]}; nothing was deleted'
+                    )
+
+        @write_transaction
+        def delete_live():
+            # Children first, so each delete is a single statement
+            for model, queryset in reversed(moved):
+                queryset.delete()
+            exams.filter(batch=batch).exclude(
+                Exists(StudentResult.objects.filter(exam=OuterRef('pk')))
+            ).exclude(
+                Exists(ExamAttendance.objects.filter(exam=OuterRef('pk')))
+            ).delete()
+
+        delete_live()
+        if options['vacuum'] and connections[DEFAULT_DB_ALIAS].vendor == 'sqlite':
+            with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+                cursor.execute('VACUUM')
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived batch {batch}: {counts[Admission._meta.label]} admissions"
+        ))
+
+    def check_id_sequences(self, batch):
+        # Admission IDs and receipt numbers continue from the newest live row
+        newest_admission = Admission.objects.order_by('-id').values_list('batch', flat=True).first()
+        newest_payment = Payment.objects.order_by('-id').values_list('admission__batch', flat=True).first()
+        if batch in (newest_admission, newest_payment):
+            raise CommandError(
+                f'Batch {batch} holds the newest admission or payment, which numbers the next one; '
+                'archive it after a newer batch has been entered'
+            )
+
+    def moved_querysets(self, batch):
+        """``[(model, queryset)]`` in foreign key order, parents first."""
+        in_batch = Q(admission__batch=batch)
+        return [
+            (Admission, Admission.objects.filter(batch=batch)),
+            (AdmissionPersonal, AdmissionPersonal.objects.filter(in_batch)),
+            (AdmissionVisitor, AdmissionVisitor.objects.filter(in_batch)),
+            (AdmissionCredential, AdmissionCredential.objects.filter(in_batch)),
+            (Payment, Payment.objects.filter(in_batch)),
+            (Expense, Expense.objects.filter(in_batch)),
+            (StudentResult, StudentResult.objects.filter(student__batch=batch)),
+            (ExamAttendance, ExamAttendance.objects.filter(student__batch=batch)),
+            (TermResult, TermResult.objects.filter(student__batch=batch)),
+        ]
+
+    def exam_queryset(self, batch):
+        return Exam.objects.filter(
+            Q(batch=batch)
+            | Exists(StudentResult.objects.filter(exam=OuterRef('pk'), student__batch=batch))
+            | Exists(ExamAttendance.objects.filter(exam=OuterRef('pk'), student__batch=batch))
+        )
+
+    def user_filter(self, batch):
+        querysets = dict(self.moved_querysets(batch))
+        querysets[Exam] = self.exam_queryset(batch)
+        user_filter = Q(pk__in=[])
+        for model, fields in USER_FIELDS.items():
+            for field in fields:
+                user_filter |= Q(pk__in=querysets[model].filter(**{f'{field}__isnull': False}).values(field))
+        return user_filter
+
+    def copy(self, queryset, chunk_size, prepare=None):
+        model = queryset.model
+        chunk = []
+        for obj in queryset.order_by('pk').iterator(chunk_size=chunk_size):
+            if prepare:
+                prepare(obj)
+            chunk.append(obj)
+            if len(chunk) >= chunk_size:
+                model._base_manager.using(ARCHIVE_DB).bulk_create(chunk, ignore_conflicts=True)
+                chunk = []
+        model._base_manager.using(ARCHIVE_DB).bulk_create(chunk, ignore_conflicts=True)
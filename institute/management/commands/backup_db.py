@@ -0,0 +1,91 @@
+"""Snapshot the SQLite databases while the app keeps serving requests.
+
+::
+
+    python manage.py backup_db --dest /srv/backups --keep 14 --media
+
+Each file database in ``settings.DATABASES`` (or each ``--database``) is
+copied with the SQLite backup API into ``<dest>/<alias>-<timestamp>.sqlite3``,
+a few pages at a time. The copy is written to a ``.part`` file, must pass
+``PRAGMA integrity_check`` and is only then renamed into place and rotated.
+``--media`` mirrors changed files under ``MEDIA_ROOT`` to ``<dest>/media``.
+"""
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from institute.backup import backup_sqlite, integrity_check, rotate_snapshots, sync_media
+from institute.benchmarking import write_report
+
+
+class Command(BaseCommand):
+    help = 'Back up the SQLite databases online with the backup API, verify, rotate and sync media'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dest', default=getattr(settings, 'BACKUP_ROOT', 'backups'))
+        parser.add_argument('--database', action='append', dest='databases',
+                            help='Alias to back up (repeatable); default: every SQLite file database')
+        parser.add_argument('--pages', type=int, default=256, help='Pages copied per backup step')
+        parser.add_argument('--sleep', type=float, default=0.01, help='Seconds to pause between steps')
+        parser.add_argument('--keep', type=int, default=7, help='Snapshots kept per database')
+        parser.add_argument('--media', action='store_true', help='Also sync changed files under MEDIA_ROOT')
+        parser.add_argument('--output', help='Write the report as JSON to this file')
+
+    def handle(self, *args, **options):
+        dest = Path(options['dest'])
+        dest.mkdir(parents=True, exist_ok=True)
+        stamp = timezone.now().strftime('%Y%m%d-%H%M%S')
+        report = {'databases': {}}
+
+        for alias in options['databases'] or self.default_aliases():
+            source = self.source_path(alias)
+            if source is None:
+                continue
+            final = dest / f'{alias}-{stamp}.sqlite3'
+            part = final.with_name(final.name + '.part')
+            stats = backup_sqlite(source, str(part), pages=options['pages'], sleep=options['sleep'])
+            problems = integrity_check(part)
+            if problems != ['ok']:
+                part.unlink()
+                raise CommandError(f'{alias}: integrity check failed: {"; ".join(problems[:5])}')
+            os.replace(part, final)
+            stats['path'] = str(final)
+            stats['rotated'] = [str(path) for path in rotate_snapshots(dest, alias, options['keep'])]
+            report['databases'][alias] = stats
+            self.stdout.write(
+                f"{alias:10s} {stats['bytes'] / 1e6:8.2f} MB  {stats['pages']:7d} pages "
+                f"{stats['steps']:5d} steps  {stats['seconds']:6.2f} s  -> {final.name}"
+            )
+
+        if options['media']:
+            stats = sync_media(settings.MEDIA_ROOT, dest / 'media')
+            report['media'] = stats
+            self.stdout.write(
+                f"media      {stats['copied']} of {stats['files']} files changed, {stats['bytes'] / 1e6:.2f} MB copied"
+            )
+
+        if options['output']:
+            write_report(options['output'], report)
+        self.stdout.write(self.style.SUCCESS(f'Backup written to {dest}'))
+
+    def default_aliases(self):
+        return [alias for alias in settings.DATABASES if connections[alias].vendor == 'sqlite']
+
+    def source_path(self, alias):
+        if alias not in settings.DATABASES:
+            raise CommandError(f'Unknown database alias: {alias}')
+        connection = connections[alias]
+        if connection.vendor != 'sqlite':
+            raise CommandError(f'{alias} is not an SQLite database')
+        if connection.is_in_memory_db():
+            self.stderr.write(f'{alias}: in-memory database, skipped')
+            return None
+        path = str(connection.settings_dict['NAME'])
+        if not os.path.exists(path):
+            self.stderr.write(f'{alias}: {path} does not exist, skipped')
+            return None
+        return path
@@ -0,0 +1,100 @@
+"""Measure how long a fresh worker takes to import the project.
+
+Each run starts a new interpreter with ``python -X importtime``, loads
+``mother_institute.wsgi`` and resolves the URLconf (which imports every view
+module), the same work a WSGI worker does before serving its first request::
+
+    python manage.py benchmark_imports --runs 5 --output bench_imports.json
+
+The report lists cold-start percentiles, the import time per top-level
+package and whether ReportLab was pulled in at boot.
+"""
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from institute.benchmarking import report_meta, write_report
+from institute.stats import summarize
+
+BOOT_SCRIPT = (
+    'import mother_institute.wsgi\n'
+    'from django.urls import get_resolver\n'
+    'get_resolver().url_patterns\n'
+)
+
+# "import time:       812 |       1344 |   django.urls"
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def parse_importtime(stderr):
+    """Return ``{module: self_us}`` from ``-X importtime`` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(1))
+    return modules
+
+
+def by_package(modules):
+    """Sum self import time (ms) per top-level package."""
+    totals = defaultdict(float)
+    for name, self_us in modules.items():
+        totals[name.split('.')[0]] += self_us / 1000
+    return dict(totals)
+
+
+class Command(BaseCommand):
+    help = 'Time a cold import of the WSGI application and URLconf; write a JSON report'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--top', type=int, default=15, help='Packages to list in the summary')
+        parser.add_argument('--output', default='bench_imports.json')
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+        wall_times = []
+        package_times = defaultdict(list)
+        loaded = set()
+
+        for _ in range(options['runs']):
+            start = time.perf_counter()
+            proc = subprocess.run(
+                [sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT],
+                cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+            )
+            wall_times.append((time.perf_counter() - start) * 1000)
+            if proc.returncode != 0:
+                raise CommandError(f'Boot script failed:\n{proc.stderr[-2000:]}')
+
+            modules = parse_importtime(proc.stderr)
+            loaded.update(name.split('.')[0] for name in modules)
+            for package, ms in by_package(modules).items():
+                package_times[package].append(ms)
+
+        packages = {
+            package: summarize(times)
+            for package, times in sorted(package_times.items(), key=lambda item: -sum(item[1]))
+        }
+        report = {
+            'meta': report_meta(include_dataset=False, runs=options['runs'], settings=settings.SETTINGS_MODULE),
+            'cold_start_ms': summarize(wall_times),
+            'reportlab_loaded': 'reportlab' in loaded,
+            'packages': packages,
+        }
+
+        cold = report['cold_start_ms']
+        self.stdout.write(f"cold start p50={cold['p50']:.1f}ms p95={cold['p95']:.1f}ms max={cold['max']:.1f}ms")
+        self.stdout.write(f"reportlab loaded at boot: {report['reportlab_loaded']}")
+        for package, timing in list(packages.items())[:options['top']]:
+            self.stdout.write(f"  {package:30s} p50={timing['p50']:8.1f}ms")
+
+        write_report(options['output'], report)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
@@ -0,0 +1,114 @@
+"""Count the SQLite pages the hot admission queries read.
+
+Each query runs on a fresh read-only connection with memory mapping off, so
+every page it touches is fetched with a read() call; the bytes read are taken
+from ``/proc/self/io`` (Linux) and divided by the page size::
+
+    python manage.py benchmark_page_reads --runs 5 --output bench_pages.json
+
+Table sizes come from the ``dbstat`` virtual table when SQLite has it.
+"""
+import sqlite3
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Q
+
+from institute.benchmarking import report_meta, write_report
+from institute.models import Admission
+from institute.stats import summarize
+
+
+def read_bytes():
+    try:
+        with open('/proc/self/io') as fh:
+            for line in fh:
+                if line.startswith('rchar:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def hot_queries():
+    """``{name: queryset}`` for the roster, search and ledger paths."""
+    batch = Admission.objects.values_list('batch', flat=True).first() or ''
+    search = Q(student_name__icontains='Das') | Q(admission_id__icontains='Das') | Q(mobile_number__icontains='Das')
+    return {
+        'roster': Admission.objects.for_roster().filter(is_admitted=True, batch=batch).order_by('student_name'),
+        'search': Admission.objects.for_ledger().filter(search, is_admitted=True)[:10],
+        'ledger': Admission.objects.for_ledger().filter(is_admitted=True),
+        'list': Admission.objects.for_list().order_by('-created_at')[:10],
+    }
+
+
+class Command(BaseCommand):
+    help = 'Measure SQLite pages read by the roster, search and ledger queries; write a JSON report'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--output', default='bench_pages.json')
+
+    def handle(self, *args, **options):
+        connection = connections['default']
+        if connection.vendor != 'sqlite':
+            raise CommandError('The default database must be SQLite')
+        if read_bytes() is None:
+            raise CommandError('/proc/self/io is not available on this platform')
+        self.path = connection.settings_dict['NAME']
+        self.page_size = self.pragma('page_size')
+        # Schema pages read when a connection opens are not part of any query
+        self.overhead = 0
+        self.overhead = min(self.measure('SELECT 1', ()) for _ in range(3))
+
+        results = {}
+        for name, queryset in hot_queries().items():
+            sql, params = queryset.query.sql_with_params()
+            pages = [self.measure(sql, params) for _ in range(options['runs'])]
+            results[name] = {'sql': sql, 'pages_read': summarize(pages)}
+            self.stdout.write(f"{name:10s} pages read p50={results[name]['pages_read']['p50']:8.0f}")
+
+        tables = self.table_pages()
+        for table, pages in tables.items():
+            self.stdout.write(f'  {table:40s} {pages:8d} pages')
+
+        write_report(options['output'], {
+            'meta': report_meta(runs=options['runs'], page_size=self.page_size),
+            'queries': results,
+            'table_pages': tables,
+        })
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+    def connect(self):
+        db = sqlite3.connect(f'file:{self.path}?mode=ro', uri=True)
+        db.execute('PRAGMA mmap_size = 0')
+        return db
+
+    def pragma(self, name):
+        db = self.connect()
+        try:
+            return db.execute(f'PRAGMA {name}').fetchone()[0]
+        finally:
+            db.close()
+
+    def measure(self, sql, params):
+        before = read_bytes()
+        db = self.connect()
+        try:
+            db.execute(sql.replace('%s', '?'), params).fetchall()
+        finally:
+            db.close()
+        pages = (read_bytes() - before) / self.page_size
+        return pages - self.overhead
+
+    def table_pages(self):
+        db = self.connect()
+        try:
+            rows = db.execute(
+                "SELECT name, COUNT(*) FROM dbstat WHERE name LIKE 'institute_admission%' GROUP BY name ORDER BY name"
+            ).fetchall()
+        except sqlite3.OperationalError:
+            return {}
+        finally:
+            db.close()
+        return dict(rows)
@@ -0,0 +1,106 @@
+"""Measure what a first and a repeat visit to a page transfers.
+
+Run with the production settings after ``collectstatic`` so static files go
+through ``institute.static_serving``::
+
+    python manage.py benchmark_page_weight --pages home,admissions_list --output bench_weight.json
+
+Assets linked from the page (stylesheets, scripts, images) are fetched with
+``Accept-Encoding: br, gzip``. On the repeat visit assets whose
+Cache-Control allows reuse cost nothing, the rest are revalidated with
+If-None-Match. Assets on other hosts are listed but not fetched.
+"""
+import gzip
+import re
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+
+from institute.benchmarking import logged_in_client, report_meta, write_report
+
+ASSET_URL = re.compile(r'<(?:link|script|img|source)\b[^>]*?\b(?:href|src|srcset)="([^"]+)"', re.IGNORECASE)
+ACCEPT_ENCODING = 'br, gzip'
+
+
+def body_size(response):
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+    return len(response.content)
+
+
+def reusable(response):
+    cache_control = response.get('Cache-Control', '')
+    if 'no-cache' in cache_control or 'no-store' in cache_control:
+        return False
+    match = re.search(r'max-age=(\d+)', cache_control)
+    return bool(match and int(match.group(1)) > 0)
+
+
+class Command(BaseCommand):
+    help = 'Measure first-visit and repeat-visit transfer for pages and their assets; write a JSON report'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', default='home,admin_dashboard,admissions_list',
+                            help='Comma-separated URL names without arguments')
+        parser.add_argument('--output', default='bench_weight.json')
+        parser.add_argument('--host', default='localhost', help='Host header (must be in ALLOWED_HOSTS)')
+
+    def handle(self, *args, **options):
+        client = logged_in_client(options['host'])
+        pages = {}
+        for name in filter(None, options['pages'].split(',')):
+            pages[name] = self.measure(client, reverse(name))
+            first, repeat = pages[name]['first_visit'], pages[name]['repeat_visit']
+            self.stdout.write(
+                f"{name:20s} html {pages[name]['html_bytes'] / 1024:7.1f} KB "
+                f"({pages[name]['html_transferred_bytes'] / 1024:6.1f} KB sent)  "
+                f"first {first['requests']:3d} req {first['bytes'] / 1024:8.1f} KB  "
+                f"repeat {repeat['requests']:3d} req {repeat['bytes'] / 1024:8.1f} KB  "
+                f"third-party {len(pages[name]['third_party'])}"
+            )
+        write_report(options['output'], {'meta': report_meta(include_dataset=False), 'pages': pages})
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+    def measure(self, client, url):
+        page = client.get(url, HTTP_ACCEPT_ENCODING=ACCEPT_ENCODING)
+        transferred = len(page.content)
+        html = gzip.decompress(page.content) if page.get('Content-Encoding') == 'gzip' else page.content
+        first = {'requests': 1, 'bytes': transferred}
+        repeat = {'requests': 1, 'bytes': transferred}
+        assets, third_party = {}, set()
+
+        for asset_url in dict.fromkeys(ASSET_URL.findall(html.decode('utf-8', 'replace'))):
+            parts = urlsplit(asset_url)
+            if parts.netloc or asset_url.startswith('data:'):
+                if parts.netloc:
+                    third_party.add(parts.netloc)
+                continue
+            response = client.get(asset_url, HTTP_ACCEPT_ENCODING=ACCEPT_ENCODING)
+            size = body_size(response)
+            first['requests'] += 1
+            first['bytes'] += size
+            assets[asset_url] = {
+                'status': response.status_code,
+                'bytes': size,
+                'encoding': response.get('Content-Encoding', 'identity'),
+                'cache_control': response.get('Cache-Control', ''),
+            }
+            if reusable(response):
+                continue
+            revalidated = client.get(
+                asset_url, HTTP_ACCEPT_ENCODING=ACCEPT_ENCODING,
+                HTTP_IF_NONE_MATCH=response.get('ETag', ''),
+                HTTP_IF_MODIFIED_SINCE=response.get('Last-Modified', ''),
+            )
+            repeat['requests'] += 1
+            repeat['bytes'] += body_size(revalidated)
+
+        return {
+            'html_bytes': len(html),
+            'html_transferred_bytes': transferred,
+            'first_visit': first,
+            'repeat_visit': repeat,
+            'assets': assets,
+            'third_party': sorted(third_party),
+        }
@@ -0,0 +1,122 @@
+"""Time template rendering of base.html-heavy pages.
+
+::
+
+    python manage.py benchmark_templates --pages view_registrations,result_list --output bench_templates.json
+
+Each page is requested through the test client in three configurations:
+
+* ``uncached``: templates re-read and compiled per request, no fragment cache;
+* ``cached_loader``: compiled templates kept by ``cached.Loader``;
+* ``cached_fragments``: the cached loader plus base.html's navigation and
+  footer fragments served from the cache.
+
+Only the time spent inside the page's outermost ``Template.render`` is
+recorded, so view queries do not blur the comparison.
+"""
+import logging
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.template import base as template_base
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from institute.benchmarking import logged_in_client, report_meta, sample_ids, write_report
+from institute.stats import summarize
+
+# URL name -> (URL kwarg, key in sample_ids())
+PAGE_ARGUMENTS = {
+    'result_list': ('exam_id', 'exam'),
+    'view_report_card': ('exam_id', 'exam'),
+    'student_account': ('admission_id', 'admission'),
+}
+DUMMY_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                             'LOCATION': 'benchmark-templates'}}
+
+
+def templates_setting(cached):
+    loaders = ['django.template.loaders.filesystem.Loader', 'django.template.loaders.app_directories.Loader']
+    if cached:
+        loaders = [('django.template.loaders.cached.Loader', loaders)]
+    options = {**settings.TEMPLATES[0]['OPTIONS'], 'loaders': loaders}
+    return [{**settings.TEMPLATES[0], 'APP_DIRS': False, 'OPTIONS': options}]
+
+
+@contextmanager
+def render_timer(timings):
+    """Append the duration of every outermost ``Template.render`` call to ``timings``."""
+    original = template_base.Template.render
+    depth = 0
+
+    def timed_render(self, context):
+        nonlocal depth
+        depth += 1
+        start = time.perf_counter()
+        try:
+            return original(self, context)
+        finally:
+            depth -= 1
+            if depth == 0:
+                timings.append((time.perf_counter() - start) * 1000)
+
+    template_base.Template.render = timed_render
+    try:
+        yield
+    finally:
+        template_base.Template.render = original
+
+
+class Command(BaseCommand):
+    help = 'Compare render time of base.html pages with and without template and fragment caching'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', default='view_registrations,result_list,admin_dashboard')
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--output', default='bench_templates.json')
+        parser.add_argument('--host', default='localhost', help='Host header (must be in ALLOWED_HOSTS)')
+
+    def handle(self, *args, **options):
+        logging.getLogger('institute.performance').disabled = True
+        client = logged_in_client(options['host'])
+        ids = sample_ids()
+        configurations = {
+            'uncached': (templates_setting(False), DUMMY_CACHES),
+            'cached_loader': (templates_setting(True), DUMMY_CACHES),
+            'cached_fragments': (templates_setting(True), LOCMEM_CACHES),
+        }
+
+        pages = {}
+        for name in filter(None, options['pages'].split(',')):
+            kwargs = {}
+            if name in PAGE_ARGUMENTS:
+                arg, key = PAGE_ARGUMENTS[name]
+                kwargs[arg] = ids[key]
+            path = reverse(name, kwargs=kwargs)
+            pages[name] = {'path': path}
+            for label, (templates, caches) in configurations.items():
+                with override_settings(TEMPLATES=templates, CACHES=caches):
+                    cache.clear()
+                    pages[name][label] = self.measure(client, path, options['iterations'])
+            line = '  '.join(f"{label} p50={pages[name][label]['render_ms']['p50']:7.2f}ms" for label in configurations)
+            self.stdout.write(f'{name:22s} {line}')
+
+        write_report(options['output'], {'meta': report_meta(iterations=options['iterations']), 'pages': pages})
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+    def measure(self, client, path, iterations):
+        # Warm-up request fills the loader and fragment caches
+        client.get(path)
+        timings = []
+        with render_timer(timings):
+            for _ in range(iterations):
+                response = client.get(path)
+        return {
+            'status': response.status_code,
+            'response_bytes': len(response.content),
+            'render_ms': summarize(timings),
+        }
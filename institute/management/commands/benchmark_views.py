@@ -0,0 +1,141 @@
+"""Drive every institute URL through the test client and record timings.
+
+Run against a seeded database (see ``generate_synthetic_data``)::
+
+    python manage.py benchmark_views --iterations 5 --output bench.json
+
+The JSON report holds latency percentiles, query counts and peak traced
+memory per URL name so two releases can be compared with a plain diff.
+"""
+import logging
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.urls import reverse
+
+from institute import urls as institute_urls
+from institute.benchmarking import logged_in_client, report_meta, sample_ids, write_report
+from institute.stats import summarize
+
+# Views that would end the benchmark session
+SKIPPED_URLS = {'logout'}
+
+# URL keyword argument -> key in sample_ids()
+URL_ARGUMENTS = {
+    'admission_id': 'admission',
+    'payment_id': 'payment',
+    'expense_id': 'expense',
+    'exam_id': 'exam',
+    'student_id': 'admission',
+    'user_id': 'user',
+}
+
+# Extra query strings so search views exercise their filters
+QUERY_PARAMS = {
+    'account_section': {'search': 'Das'},
+    'account_search': {'search': 'Das', 'date_from': '2023-01-01'},
+    'admin_dashboard': {'search': 'Das'},
+    'view_registrations': {'search': 'Das'},
+    'search_admission': {'search': 'Das'},
+    'search_students': {'q': 'Das'},
+    'get_student_details': {'search': 'Das'},
+    'exam_list': {'status': 'completed'},
+}
+
+
+class Command(BaseCommand):
+    help = 'Benchmark every institute view and the PDF endpoints; write a JSON report'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=5)
+        parser.add_argument('--warmup', type=int, default=1)
+        parser.add_argument('--output', default='bench_views.json')
+        parser.add_argument('--host', default='localhost', help='Host header (must be in ALLOWED_HOSTS)')
+        parser.add_argument('--only', default='', help='Comma-separated URL names to run')
+
+    def handle(self, *args, **options):
+        # Slow-request and N+1 warnings would drown the report
+        logging.getLogger('institute.performance').disabled = True
+        client = logged_in_client(options['host'])
+        ids = sample_ids()
+        only = {name for name in options['only'].split(',') if name}
+
+        results = {}
+        for name, path, params in self.targets(ids):
+            if only and name not in only:
+                continue
+            results[name] = self.measure(client, path, params, options['iterations'], options['warmup'])
+            timing = results[name]['latency_ms']
+            self.stdout.write(
+                f"{name:40s} p50={timing['p50']:8.1f}ms p95={timing['p95']:8.1f}ms "
+                f"queries={results[name]['queries']:6d} peak={results[name]['peak_memory_kb']:9.1f}KB"
+            )
+
+        write_report(options['output'], {
+            'meta': report_meta(iterations=options['iterations'], sample_ids=ids),
+            'results': results,
+        })
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+    def targets(self, ids):
+        """Yield ``(name, path, query_params)`` for every URL that can be built."""
+        for pattern in institute_urls.urlpatterns:
+            name = pattern.name
+            if not name or name in SKIPPED_URLS:
+                continue
+            kwargs = {}
+            for arg in pattern.pattern.converters:
+                kwargs[arg] = ids.get(URL_ARGUMENTS.get(arg))
+            if name == 'view_report_card':
+                kwargs['student_id'] = ids['result_student']
+            if any(value is None for value in kwargs.values()):
+                self.stderr.write(f'Skipping {name}: no sample data for {sorted(kwargs)}')
+                continue
+            yield name, reverse(name, kwargs=kwargs), QUERY_PARAMS.get(name, {})
+
+        # Receipt and ledger PDFs are regular URLs above; the report card PDF is a query flag
+        if ids['result_student'] and ids['exam']:
+            yield 'report_card_pdf', reverse('report_card'), {
+                'download': 'pdf', 'exam': ids['exam'], 'student': ids['result_student'],
+            }
+
+    def measure(self, client, path, params, iterations, warmup):
+        for _ in range(warmup):
+            client.get(path, params)
+
+        latencies = []
+        query_count = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal query_count
+            query_count += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_queries):
+            for _ in range(iterations):
+                start = time.perf_counter()
+                response = client.get(path, params)
+                if getattr(response, 'streaming', False):
+                    b''.join(response.streaming_content)
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        # Separate traced run so tracemalloc overhead does not skew latencies
+        tracemalloc.start()
+        try:
+            tracemalloc.reset_peak()
+            client.get(path, params)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'path': path,
+            'params': params,
+            'status': response.status_code,
+            'latency_ms': summarize(latencies),
+            'queries': query_count // max(iterations, 1),
+            'response_bytes': len(response.content) if not getattr(response, 'streaming', False) else None,
+            'peak_memory_kb': peak / 1024,
+        }
@@ -0,0 +1,94 @@
+"""Compare write throughput and lock errors with and without the SQLite production profile.
+
+Each profile runs ``loadtest --mix writes`` in a subprocess against its own
+copy of the current database::
+
+    python manage.py benchmark_write_contention --workers 15 --duration 30
+
+``baseline`` uses ``mother_institute.settings`` with the copy switched back
+to rollback-journal mode; ``production`` uses
+``mother_institute.settings_production`` (WAL, tuned pragmas, BEGIN
+IMMEDIATE with retry).
+"""
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from institute.benchmarking import report_meta, write_report
+
+PROFILES = [
+    ('baseline', 'mother_institute.settings'),
+    ('production', 'mother_institute.settings_production'),
+]
+
+
+class Command(BaseCommand):
+    help = 'Run the write-heavy load mix under the default and production SQLite profiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=15)
+        parser.add_argument('--duration', type=float, default=30.0)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', default='')
+
+    def handle(self, *args, **options):
+        source = connections['default'].settings_dict['NAME']
+        if connections['default'].vendor != 'sqlite' or not os.path.exists(source):
+            raise CommandError('The default database must be an existing SQLite file')
+
+        results = {}
+        with tempfile.TemporaryDirectory() as tmp:
+            for profile, settings_module in PROFILES:
+                db_path = os.path.join(tmp, f'{profile}.sqlite3')
+                self.copy_database(source, db_path, wal=(profile == 'production'))
+                results[profile] = self.run_profile(profile, settings_module, db_path, tmp, options)
+
+        self.print_comparison(results)
+        if options['output']:
+            write_report(options['output'], {
+                'meta': report_meta(workers=options['workers'], duration=options['duration']),
+                'results': results,
+            })
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+    @staticmethod
+    def copy_database(source, target, wal):
+        src = sqlite3.connect(source)
+        dst = sqlite3.connect(target)
+        try:
+            src.backup(dst)
+            dst.execute(f"PRAGMA journal_mode = {'WAL' if wal else 'DELETE'}")
+        finally:
+            dst.close()
+            src.close()
+
+    def run_profile(self, profile, settings_module, db_path, tmp, options):
+        output = os.path.join(tmp, f'{profile}.json')
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module, INSTITUTE_DB_PATH=db_path)
+        command = [
+            sys.executable, str(settings.BASE_DIR / 'manage.py'), 'loadtest', '--mix', 'writes',
+            '--workers', str(options['workers']), '--duration', str(options['duration']),
+            '--seed', str(options['seed']), '--output', output,
+        ]
+        self.stdout.write(f'Running {profile} profile ({settings_module})...')
+        completed = subprocess.run(command, env=env, capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise CommandError(f'{profile} run failed:\n{completed.stderr[-2000:]}')
+        with open(output) as fh:
+            return json.load(fh)['results']
+
+    def print_comparison(self, results):
+        self.stdout.write(f"{'profile':12s} {'reqs':>6s} {'writes/s':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'errors':>7s} {'locked':>7s}")
+        for profile, report in results.items():
+            self.stdout.write(
+                f"{profile:12s} {report['requests']:6d} {report['throughput_rps']:9.1f} "
+                f"{report['latency_ms']['p95']:9.1f} {report['latency_ms']['p99']:9.1f} "
+                f"{report['errors']:7d} {report['locked_error_rate']:7.1%}"
+            )
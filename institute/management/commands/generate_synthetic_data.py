@@ -0,0 +1,272 @@
+"""Bulk-generate realistic institute data for benchmarking.
+
+Example::
+
+    python manage.py generate_synthetic_data --admissions 50000 \\
+        --payments 500000 --expenses 500000 --exams 2000 --results 1000000
+"""
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from institute.models import Admission, CustomUser, Exam, Expense, Payment, StudentResult
+from institute.terms import rebuild_term_results
+
+FIRST_NAMES = [
+    'Aarav', 'Aditya', 'Ananya', 'Anjali', 'Arpita', 'Ashish', 'Bishnu', 'Debasish',
+    'Deepak', 'Gayatri', 'Itishree', 'Jagannath', 'Jyoti', 'Kalpana', 'Lipsa', 'Manas',
+    'Monalisa', 'Nibedita', 'Niranjan', 'Pallavi', 'Pradeep', 'Priyanka', 'Rajesh',
+    'Rashmi', 'Ritesh', 'Sambit', 'Sasmita', 'Smruti', 'Soumya', 'Subhashree',
+    'Sudhansu', 'Sunita', 'Swagat', 'Tapas', 'Trupti',
+]
+LAST_NAMES = [
+    'Behera', 'Biswal', 'Das', 'Dash', 'Jena', 'Mallick', 'Mishra', 'Mohanty',
+    'Nayak', 'Panda', 'Parida', 'Patnaik', 'Pradhan', 'Rath', 'Rout', 'Sahoo',
+    'Samal', 'Sethi', 'Swain', 'Tripathy',
+]
+FATHER_NAMES = ['Prakash', 'Ramesh', 'Sarat', 'Bijay', 'Dilip', 'Hemanta', 'Kailash', 'Manoj']
+MOTHER_NAMES = ['Sabita', 'Mamata', 'Sujata', 'Bharati', 'Geeta', 'Kuni', 'Laxmi', 'Minati']
+COLLEGES = ['Jajpur Junior College', 'NC College', 'Biraja Higher Secondary School', 'Vyasanagar College']
+PLACES = ['Trilochanpada', 'Jajpur Town', 'Kuakhia', 'Byasanagar', 'Panikoili', 'Dharmasala']
+SIXTH_SUBJECTS = ['Biology', 'Information Technology', 'Electronics']
+BLOOD_GROUPS = ['A+', 'A-', 'B+', 'B-', 'O+', 'O-', 'AB+', 'AB-']
+CATEGORIES = ['General', 'OBC', 'SC', 'ST', 'SEBC']
+EXPENSE_DESCRIPTIONS = {
+    'food': 'Monthly mess charges',
+    'transport': 'Bus pass',
+    'hostel': 'Hostel rent',
+    'academic': 'Study material',
+    'other': 'Miscellaneous',
+}
+
+
+class Command(BaseCommand):
+    help = 'Bulk-generate synthetic admissions, payments, expenses, exams and results'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--admissions', type=int, default=50000)
+        parser.add_argument('--payments', type=int, default=500000)
+        parser.add_argument('--expenses', type=int, default=500000)
+        parser.add_argument('--exams', type=int, default=2000)
+        parser.add_argument('--results', type=int, default=1000000)
+        parser.add_argument('--batches', default='2022-2024,2023-2025,2024-2026,2025-2027',
+                            help='Comma-separated batch names to spread students over')
+        parser.add_argument('--admitted-ratio', type=float, default=0.85)
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk_create call')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        batches = [b.strip() for b in options['batches'].split(',') if b.strip()]
+        if not batches:
+            raise CommandError('At least one batch is required')
+
+        staff = self.get_staff_user()
+        started = time.perf_counter()
+
+        admission_ids = self.create_admissions(options['admissions'], batches, options['admitted_ratio'], staff)
+        admitted = list(
+            Admission.objects.filter(id__in=admission_ids, is_admitted=True).values_list('id', 'batch')
+        )
+        admitted_ids = [pk for pk, _ in admitted]
+        if admitted_ids:
+            self.create_payments(options['payments'], admitted_ids, staff)
+            self.create_expenses(options['expenses'], admitted_ids, staff)
+        exams = self.create_exams(options['exams'], batches, staff)
+        self.create_results(options['results'], exams, admitted, staff)
+        # bulk_create sends no signals, so the term results are built in one pass
+        self.stdout.write(f'  term results: {rebuild_term_results()}')
+
+        self.stdout.write(self.style.SUCCESS(f'Done in {time.perf_counter() - started:.1f}s'))
+
+    def get_staff_user(self):
+        user, created = CustomUser.objects.get_or_create(
+            username='synthetic_admin', defaults={'user_type': 'admin', 'is_staff': True}
+        )
+        if created:
+            user.set_password('synthetic_admin')
+            user.save()
+        return user
+
+    def bulk_insert(self, model, rows, label):
+        """bulk_create a generator of unsaved instances in fixed-size transactions."""
+        total = 0
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.batch_size:
+                total += self.flush(model, chunk)
+                chunk = []
+        if chunk:
+            total += self.flush(model, chunk)
+        self.stdout.write(f'  {label}: {total}')
+        return total
+
+    def flush(self, model, chunk):
+        with transaction.atomic():
+            model.objects.bulk_create(chunk, batch_size=self.batch_size)
+        return len(chunk)
+
+    @staticmethod
+    def next_number(model, field, prefix):
+        last = model.objects.exclude(**{f'{field}__isnull': True}).order_by('-id').values_list(field, flat=True).first()
+        try:
+            return int(last[len(prefix):]) + 1
+        except (TypeError, ValueError):
+            return 1
+
+    def random_date(self, start, days):
+        return start + timedelta(days=self.rng.randrange(days))
+
+    def create_admissions(self, count, batches, admitted_ratio, staff):
+        rng = self.rng
+        first_number = self.next_number(Admission, 'admission_id', 'TMIS')
+        first_pk = (Admission.objects.order_by('-id').values_list('id', flat=True).first() or 0) + 1
+
+        def rows():
+            for i in range(count):
+                batch = batches[i % len(batches)]
+                start_year = int(batch[:4]) if batch[:4].isdigit() else 2024
+                admitted = rng.random() < admitted_ratio
+                last_name = rng.choice(LAST_NAMES)
+                mobile = f'9{rng.randrange(10 ** 9):09d}'
+                yield Admission(
+                    admission_id=f'TMIS{first_number + i:04d}',
+                    student_name=f'{rng.choice(FIRST_NAMES)} {last_name}',
+                    father_name=f'{rng.choice(FATHER_NAMES)} {last_name}',
+                    mother_name=f'{rng.choice(MOTHER_NAMES)} {last_name}',
+                    date_of_birth=self.random_date(date(start_year - 17, 1, 1), 730),
+                    mobile_number=mobile,
+                    whatsapp_number=mobile,
+                    address=f'{rng.choice(PLACES)}, Jajpur, Odisha',
+                    adhaar_number=f'{rng.randrange(10 ** 12):012d}',
+                    blood_group=rng.choice(BLOOD_GROUPS),
+                    category=rng.choice(CATEGORIES),
+                    college_name=rng.choice(COLLEGES),
+                    board_name='CHSE Odisha',
+                    college_roll_no=f'R{start_year}{i:06d}',
+                    batch=batch,
+                    eleventh_year=str(start_year),
+                    twelfth_year=str(start_year + 1),
+                    course='Science',
+                    enrolled_for='+2 Science',
+                    hostel_fees=Decimal(rng.choice([0, 24000, 36000])),
+                    admitted_college_fees=Decimal(rng.choice([8000, 12000])),
+                    tms_fees=Decimal(rng.choice([30000, 45000, 60000])),
+                    subject6=rng.choice(SIXTH_SUBJECTS),
+                    submitted_by=staff,
+                    is_admitted=admitted,
+                    admission_date=self.random_date(date(start_year, 4, 1), 120) if admitted else None,
+                    admitted_by=staff if admitted else None,
+                )
+
+        self.bulk_insert(Admission, rows(), 'admissions')
+        return list(Admission.objects.filter(id__gte=first_pk).values_list('id', flat=True))
+
+    def create_payments(self, count, admission_ids, staff):
+        rng = self.rng
+        first_number = self.next_number(Payment, 'receipt_number', 'RECPT')
+        methods = [c[0] for c in Payment._meta.get_field('payment_method').choices]
+        types = [c[0] for c in Payment._meta.get_field('payment_type').choices]
+
+        def rows():
+            for i in range(count):
+                payment_type = rng.choice(types)
+                yield Payment(
+                    admission_id=rng.choice(admission_ids),
+                    date=self.random_date(date(2022, 4, 1), 1460),
+                    payment_method=rng.choice(methods),
+                    payment_type=payment_type,
+                    description=f'{payment_type.title()} installment',
+                    amount=Decimal(rng.randrange(5, 200) * 100),
+                    receipt_number=f'RECPT{first_number + i:04d}',
+                    received_by=staff,
+                )
+
+        self.bulk_insert(Payment, rows(), 'payments')
+
+    def create_expenses(self, count, admission_ids, staff):
+        rng = self.rng
+        categories = list(EXPENSE_DESCRIPTIONS)
+
+        def rows():
+            for _ in range(count):
+                category = rng.choice(categories)
+                yield Expense(
+                    admission_id=rng.choice(admission_ids),
+                    date=self.random_date(date(2022, 4, 1), 1460),
+                    category=category,
+                    description=EXPENSE_DESCRIPTIONS[category],
+                    amount=Decimal(rng.randrange(1, 80) * 50),
+                    added_by=staff,
+                )
+
+        self.bulk_insert(Expense, rows(), 'expenses')
+
+    def create_exams(self, count, batches, staff):
+        rng = self.rng
+        exam_types = [c[0] for c in Exam.EXAM_TYPE_CHOICES]
+        subjects = [c[0] for c in Exam.SUBJECT_CHOICES]
+        sessions = [c[0] for c in Exam.SESSION_CHOICES]
+        first_pk = (Exam.objects.order_by('-id').values_list('id', flat=True).first() or 0) + 1
+
+        def rows():
+            for i in range(count):
+                batch = batches[i % len(batches)]
+                subject = rng.choice(subjects)
+                exam_type = rng.choice(exam_types)
+                exam_date = self.random_date(date(2022, 5, 1), 1460)
+                yield Exam(
+                    name=f'{exam_type.replace("_", " ").title()} Test {i + 1}',
+                    exam_type=exam_type,
+                    subject=subject,
+                    session=rng.choice(sessions),
+                    batch=batch,
+                    stream='science',
+                    year='12th' if subject.endswith('_12') else '11th',
+                    exam_date=exam_date,
+                    total_marks=100,
+                    passing_marks=33,
+                    room_number=f'R{rng.randrange(1, 12)}',
+                    status='completed' if exam_date < date.today() else 'scheduled',
+                    created_by=staff,
+                )
+
+        self.bulk_insert(Exam, rows(), 'exams')
+        return list(Exam.objects.filter(id__gte=first_pk).values_list('id', 'batch'))
+
+    def create_results(self, count, exams, admitted, staff):
+        rng = self.rng
+        if not exams or not admitted:
+            self.stdout.write('  results: 0')
+            return
+        students_by_batch = {}
+        for pk, batch in admitted:
+            students_by_batch.setdefault(batch, []).append(pk)
+        # Capped by batch size, so tiny datasets may end up with fewer rows
+        per_exam = max(1, -(-count // len(exams)))
+
+        def rows():
+            remaining = count
+            for exam_id, batch in exams:
+                students = students_by_batch.get(batch, [])
+                take = min(per_exam, len(students), remaining)
+                for student_id in rng.sample(students, take):
+                    absent = rng.random() < 0.05
+                    yield StudentResult(
+                        exam_id=exam_id,
+                        student_id=student_id,
+                        marks_obtained=Decimal(0 if absent else rng.randrange(10, 100)),
+                        is_absent=absent,
+                        entered_by=staff,
+                    )
+                remaining -= take
+                if remaining <= 0:
+                    return
+
+        self.bulk_insert(StudentResult, rows(), 'results')
@@ -0,0 +1,51 @@
+"""Import registrations from a CSV or XLSX sheet, as the Import page does.
+
+::
+
+    python manage.py import_admissions partner_school.xlsx --report errors.csv --username office
+
+Rejected rows go to ``--report`` with their row number and errors.
+"""
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from institute.imports import BATCH_SIZE, import_sheet
+from institute.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = 'Import registrations from a CSV or XLSX file, writing rejected rows to an error report'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--report', default='import_errors.csv')
+        parser.add_argument('--username', help='Recorded as submitted_by')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Rows per bulk_create call')
+
+    def handle(self, *args, **options):
+        user = None
+        if options['username']:
+            user = CustomUser.objects.filter(username=options['username']).first()
+            if user is None:
+                raise CommandError(f"No user named {options['username']}")
+
+        started = time.perf_counter()
+        try:
+            with open(options['path'], 'rb') as fh, open(options['report'], 'w', newline='', encoding='utf-8') as report:
+                summary = import_sheet(fh, options['path'], user=user, report=report,
+                                       batch_size=options['batch_size'])
+        except ValidationError as e:
+            raise CommandError(' '.join(e.messages))
+
+        self.stdout.write(
+            f"{summary['imported']} of {summary['rows']} rows imported "
+            f"({summary['first_id']} - {summary['last_id']}) in {time.perf_counter() - started:.1f}s"
+        )
+        if summary['ignored_columns']:
+            self.stdout.write(f"Ignored columns: {', '.join(summary['ignored_columns'])}")
+        if summary['rejected']:
+            self.stdout.write(self.style.WARNING(f"{summary['rejected']} rows rejected, see {options['report']}"))
+        else:
+            self.stdout.write(self.style.SUCCESS('No rows rejected'))
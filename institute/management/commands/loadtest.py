@@ -0,0 +1,78 @@
+"""Replay a weighted request mix with concurrent workers and report latencies.
+
+Seed the database first (``generate_synthetic_data``), then::
+
+    python manage.py loadtest --workers 15 --duration 60 --output load.json
+
+By default a threaded WSGI server is started in-process on a free port.
+Pass ``--url`` to target a server started separately (gunicorn, uvicorn,
+``runserver``) that uses the same database.
+"""
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from institute.benchmarking import logged_in_client, report_meta, write_report
+from institute.loadtest import MIXES, LoadTest, SampleData, parse_weights, start_server
+
+
+class Command(BaseCommand):
+    help = 'Run a concurrent load test against a local server and report throughput and percentiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=15)
+        parser.add_argument('--duration', type=float, default=60.0, help='Seconds to run')
+        parser.add_argument('--mix', choices=sorted(MIXES), default='admission_week')
+        parser.add_argument('--weights', default='', help='Override weights, e.g. "add_payment_general=40,report_card_pdf=0"')
+        parser.add_argument('--url', default='', help='Base URL of an already running server')
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--output', default='')
+
+    def handle(self, *args, **options):
+        data = SampleData()
+        if not data.admitted or not data.exams or not data.payments:
+            raise CommandError('Database has no admitted students, completed exams or payments; '
+                               'run generate_synthetic_data first.')
+
+        session_key = logged_in_client().session.session_key
+
+        server = None
+        base_url = options['url']
+        if not base_url:
+            server, base_url = start_server()
+        mix = parse_weights(MIXES[options['mix']], options['weights'])
+        # Silence per-request warnings after the server has configured logging
+        logging.getLogger('institute.performance').disabled = True
+
+        try:
+            self.stdout.write(f"Running {options['mix']} mix against {base_url} with "
+                              f"{options['workers']} workers for {options['duration']:.0f}s")
+            report = LoadTest(
+                base_url, mix, session_key,
+                workers=options['workers'], duration=options['duration'], seed=options['seed'],
+            ).run(data)
+        finally:
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+
+        self.print_report(report)
+        if options['output']:
+            write_report(options['output'], {
+                'meta': report_meta(mix=options['mix'], base_url=base_url),
+                'results': report,
+            })
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+    def print_report(self, report):
+        self.stdout.write(f"{'endpoint':24s} {'reqs':>6s} {'rps':>7s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'err':>5s} {'locked':>7s}")
+        for name, row in report['endpoints'].items():
+            latency = row['latency_ms']
+            self.stdout.write(
+                f"{name:24s} {row['requests']:6d} {row['throughput_rps']:7.1f} {latency['p50']:8.1f} "
+                f"{latency['p95']:8.1f} {latency['p99']:8.1f} {row['errors']:5d} {row['locked_error_rate']:7.1%}"
+            )
+        self.stdout.write(
+            f"Total: {report['requests']} requests, {report['throughput_rps']:.1f} req/s, "
+            f"{report['errors']} errors, database-locked rate {report['locked_error_rate']:.1%}"
+        )
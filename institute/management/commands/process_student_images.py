@@ -0,0 +1,96 @@
+"""Convert student photos uploaded before processing existed.
+
+::
+
+    python manage.py process_student_images --workers 4 --delete-originals
+
+Each unprocessed photo is re-encoded with its thumbnails by
+``institute.images.process_photo`` in a process pool; the new names are
+written back with ``bulk_update`` in chunks.
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from institute.db import write_transaction
+from institute.images import photo_hash, process_photo
+from institute.models import Admission
+
+
+def process_stored_photo(item):
+    """Worker: ``(pk, name)`` -> ``(pk, name, new_name, bytes_before, error)``."""
+    pk, name = item
+    try:
+        with default_storage.open(name) as fh:
+            data = fh.read()
+        return pk, name, process_photo(data), len(data), None
+    except Exception as exc:
+        return pk, name, None, 0, str(exc)
+
+
+class Command(BaseCommand):
+    help = 'Re-encode existing student photos and build their thumbnails in a process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Worker processes (default: CPU count; 1 runs in this process)')
+        parser.add_argument('--chunk-size', type=int, default=200, help='Rows per bulk_update')
+        parser.add_argument('--delete-originals', action='store_true',
+                            help='Delete each original file once its row points at the processed photo')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        pending = [
+            (pk, name) for pk, name in
+            Admission.objects.exclude(student_image='').exclude(student_image__isnull=True)
+            .values_list('pk', 'student_image').iterator()
+            if photo_hash(name) is None
+        ]
+        self.stdout.write(f'{len(pending)} photos to process')
+        if not pending:
+            return
+
+        if options['workers'] == 1:
+            results = map(process_stored_photo, pending)
+        else:
+            # Forked workers must not share the parent's database connections
+            connections.close_all()
+            pool = ProcessPoolExecutor(max_workers=options['workers'])
+            results = pool.map(process_stored_photo, pending, chunksize=8)
+
+        done = failed = bytes_before = 0
+        chunk = []
+        originals = []
+        try:
+            for pk, name, new_name, size, error in results:
+                if error:
+                    failed += 1
+                    self.stderr.write(f'{name}: {error}')
+                    continue
+                done += 1
+                bytes_before += size
+                chunk.append(Admission(pk=pk, student_image=new_name))
+                if new_name != name:
+                    originals.append(name)
+                if len(chunk) >= options['chunk_size']:
+                    self.save_chunk(chunk, originals, options['delete_originals'])
+                    chunk, originals = [], []
+            self.save_chunk(chunk, originals, options['delete_originals'])
+        finally:
+            if options['workers'] != 1:
+                pool.shutdown()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Processed {done} photos ({bytes_before / 1e6:.1f} MB of originals), '
+            f'{failed} failed, in {time.perf_counter() - started:.1f} s'
+        ))
+
+    def save_chunk(self, chunk, originals, delete_originals):
+        if chunk:
+            write_transaction(Admission.objects.bulk_update)(chunk, ['student_image'])
+        if delete_originals:
+            for name in originals:
+                default_storage.delete(name)
@@ -0,0 +1,28 @@
+"""Recompute the term and year results from the exam results.
+
+::
+
+    python manage.py rebuild_term_results --batch 2024-2026
+
+Needed once after migrating, and after results were written without model
+signals (``bulk_create``, ``QuerySet.update()``, raw SQL).
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from institute.terms import rebuild_term_results
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the TermResult summary rows (totals, grades and ranks) from StudentResult'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', help='Only this batch (default: every batch)')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        created = rebuild_term_results(options['batch'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{created} term results rebuilt in {time.perf_counter() - started:.1f}s'
+        ))
@@ -0,0 +1,125 @@
+"""Student × exam marks matrix of a batch.
+
+``MarksMatrix.for_batch`` runs three queries whatever the batch size: the
+completed exams, the admitted roster and every result of those exams. The
+results are pivoted into one flat ``array('d')`` (row = student index,
+column = exam index) with ``ABSENT`` and NaN (not entered) as sentinels,
+and the per-student and per-exam totals are added up in that same pass.
+Ranks come from a single sort of the student percentages afterwards.
+"""
+import math
+from array import array
+
+from .models import Admission, Exam, StudentResult
+
+ABSENT = -1.0
+NOT_ENTERED = math.nan
+
+
+class MarksMatrix:
+    def __init__(self, students, exams):
+        # students: (id, admission_id, student_name) tuples
+        self.students = students
+        self.exams = exams
+        self.student_index = {student[0]: i for i, student in enumerate(students)}
+        self.exam_index = {exam.id: j for j, exam in enumerate(exams)}
+        self.cells = array('d', [NOT_ENTERED]) * (len(students) * len(exams))
+        self.totals = array('d', [0.0]) * len(students)
+        # Sum of total_marks over the exams a student has a result in, absences included
+        self.maximums = array('d', [0.0]) * len(students)
+        self.ranks = array('l', [0]) * len(students)
+        self.exam_totals = array('d', [0.0]) * len(exams)
+        self.exam_appeared = array('l', [0]) * len(exams)
+
+    @classmethod
+    def for_batch(cls, batch):
+        exams = list(Exam.objects.filter(batch=batch, status='completed').order_by('exam_date', 'id').only(
+            'id', 'name', 'subject', 'exam_date', 'total_marks'
+        ))
+        students = list(Admission.objects.filter(batch=batch, is_admitted=True).order_by(
+            'student_name', 'id'
+        ).values_list('id', 'admission_id', 'student_name'))
+        matrix = cls(students, exams)
+        if exams and students:
+            matrix.fill(StudentResult.objects.filter(
+                exam__in=[exam.id for exam in exams], student__batch=batch, student__is_admitted=True,
+            ).values_list('student_id', 'exam_id', 'marks_obtained', 'is_absent'))
+        return matrix
+
+    def fill(self, results):
+        """Place ``(student_id, exam_id, marks, is_absent)`` rows and total them up."""
+        width = len(self.exams)
+        out_of = [float(exam.total_marks) for exam in self.exams]
+        for student_id, exam_id, marks, is_absent in results:
+            i = self.student_index.get(student_id)
+            j = self.exam_index.get(exam_id)
+            if i is None or j is None:
+                continue
+            self.maximums[i] += out_of[j]
+            if is_absent:
+                self.cells[i * width + j] = ABSENT
+                continue
+            marks = float(marks)
+            self.cells[i * width + j] = marks
+            self.totals[i] += marks
+            self.exam_totals[j] += marks
+            self.exam_appeared[j] += 1
+        self.rank()
+
+    def percentage(self, i):
+        return self.totals[i] / self.maximums[i] * 100 if self.maximums[i] else 0.0
+
+    def rank(self):
+        """Competition ranks by percentage (1, 2, 2, 4); students with no results stay unranked (0)."""
+        ranked = sorted((i for i in range(len(self.students)) if self.maximums[i]),
+                        key=self.percentage, reverse=True)
+        previous = rank = None
+        for position, i in enumerate(ranked, 1):
+            percentage = round(self.percentage(i), 2)
+            if percentage != previous:
+                rank, previous = position, percentage
+            self.ranks[i] = rank
+
+    def order(self, by='name'):
+        """Row indices by name (the roster order) or by rank, unranked last."""
+        if by == 'rank':
+            return sorted(range(len(self.students)), key=lambda i: (not self.ranks[i], self.ranks[i], i))
+        return list(range(len(self.students)))
+
+    def marks(self, i):
+        """Row ``i`` as display values: a float, ``'AB'`` or None when not entered."""
+        width = len(self.exams)
+        return [
+            None if math.isnan(value) else 'AB' if value == ABSENT else value
+            for value in self.cells[i * width:(i + 1) * width]
+        ]
+
+    def row(self, i):
+        student_id, admission_id, student_name = self.students[i]
+        return {
+            'id': student_id,
+            'admission_id': admission_id,
+            'student_name': student_name,
+            'marks': self.marks(i),
+            'total': self.totals[i],
+            'maximum': self.maximums[i],
+            'percentage': self.percentage(i),
+            'rank': self.ranks[i] or None,
+        }
+
+    def exam_averages(self):
+        return [
+            total / appeared if appeared else None
+            for total, appeared in zip(self.exam_totals, self.exam_appeared)
+        ]
+
+    def header(self):
+        exams = [f'{exam.name} - {exam.get_subject_display()}' for exam in self.exams]
+        return ['Rank', 'Admission ID', 'Student Name', *exams, 'Total', 'Out Of', 'Percentage']
+
+    def export_rows(self, by='name'):
+        for i in self.order(by):
+            row = self.row(i)
+            marks = [round(value, 2) if isinstance(value, float) else value for value in row['marks']]
+            yield [row['rank'], row['admission_id'], row['student_name'], *marks,
+                   round(row['total'], 2), round(row['maximum'], 2), round(row['percentage'], 2)]
@@ -0,0 +1,192 @@
+"""Per-request SQL and template instrumentation.
+
+QueryInstrumentationMiddleware counts queries and DB time for every request,
+spots repeated SQL shapes (N+1 signatures), adds a ``Server-Timing`` header
+and logs requests slower than ``INSTITUTE_SLOW_REQUEST_MS``. Individual slow
+statements are handed to ``slow_query_log`` for storage. Streaming responses
+are measured until their body is exhausted or closed and get no header.
+Views failing on an SQLite lock error are flagged with ``X-Database-Locked``.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import OperationalError, connections
+from django.template.backends.django import Template as DjangoBackendTemplate
+
+from .db import is_locked_error
+
+logger = logging.getLogger('institute.performance')
+
+# Set on responses whose view failed on an SQLite lock error
+LOCKED_HEADER = 'X-Database-Locked'
+
+# Metrics of the request currently being served (None outside a request)
+_current_metrics = ContextVar('institute_request_metrics', default=None)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST = re.compile(r'\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_sql(sql):
+    """Reduce a SQL statement to its shape: literals and IN-lists collapsed."""
+    shape = _STRING_LITERAL.sub('?', sql)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = shape.replace('%s', '?')
+    shape = _PLACEHOLDER_LIST.sub('(...)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+def get_slow_request_ms():
+    return getattr(settings, 'INSTITUTE_SLOW_REQUEST_MS', 500)
+
+
+def get_n_plus_one_threshold():
+    return getattr(settings, 'INSTITUTE_N_PLUS_ONE_THRESHOLD', 5)
+
+
+class RequestMetrics:
+    """Query and render timings collected while serving one request"""
+
+    def __init__(self):
+        self.query_count = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.total_time = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        # Used as a connection execute_wrapper
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_count += 1
+            self.db_time += time.perf_counter() - start
+            self.shapes[normalize_sql(sql)] += 1
+
+    def repeated_shapes(self, threshold=None):
+        """Return ``[(shape, count)]`` for SQL shapes run at least ``threshold`` times."""
+        if threshold is None:
+            threshold = get_n_plus_one_threshold()
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+    def server_timing(self):
+        return ', '.join([
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.query_count} queries"',
+            f'template;dur={self.template_time * 1000:.1f}',
+            f'total;dur={self.total_time * 1000:.1f}',
+        ])
+
+
+_template_timer_installed = False
+
+
+def _install_template_timer():
+    """Time top-level template renders (includes/extends are counted in their parent)."""
+    global _template_timer_installed
+    if _template_timer_installed:
+        return
+    original_render = DjangoBackendTemplate.render
+
+    def timed_render(self, context=None, request=None):
+        metrics = _current_metrics.get()
+        if metrics is None:
+            return original_render(self, context, request)
+        start = time.perf_counter()
+        try:
+            return original_render(self, context, request)
+        finally:
+            metrics.template_time += time.perf_counter() - start
+
+    DjangoBackendTemplate.render = timed_render
+    _template_timer_installed = True
+
+
+class QueryInstrumentationMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        _install_template_timer()
+
+    def __call__(self, request):
+        from .slow_query_log import SlowQueryRecorder
+
+        metrics = RequestMetrics()
+        recorders = [SlowQueryRecorder(connection.alias) for connection in connections.all()]
+        token = _current_metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            with self.instrument(metrics, recorders):
+                response = self.get_response(request)
+        finally:
+            metrics.total_time = time.perf_counter() - start
+            _current_metrics.reset(token)
+
+        request.query_metrics = metrics
+        response.query_metrics = metrics
+        if getattr(request, 'database_locked', False):
+            response[LOCKED_HEADER] = '1'
+        if response.streaming and not response.is_async:
+            # The body (and its queries) runs after the headers are sent, so no
+            # Server-Timing; the stream is measured and logged once it ends
+            response.streaming_content = self.measure_stream(
+                response.streaming_content, request, metrics, recorders, start,
+            )
+            return response
+        self.finish(request, metrics, recorders)
+        response['Server-Timing'] = metrics.server_timing()
+        return response
+
+    def process_exception(self, request, exception):
+        # The 500 page hides the message unless DEBUG is on
+        if isinstance(exception, OperationalError) and is_locked_error(exception):
+            request.database_locked = True
+
+    @staticmethod
+    def instrument(metrics, recorders):
+        stack = ExitStack()
+        for connection, recorder in zip(connections.all(), recorders):
+            # Recorder sits inside the metrics wrapper so both see every statement
+            stack.enter_context(connection.execute_wrapper(metrics))
+            stack.enter_context(connection.execute_wrapper(recorder))
+        return stack
+
+    def measure_stream(self, content, request, metrics, recorders, start):
+        try:
+            with self.instrument(metrics, recorders):
+                yield from content
+        finally:
+            # Exhausted or closed by the server
+            metrics.total_time = time.perf_counter() - start
+            self.finish(request, metrics, recorders)
+
+    def finish(self, request, metrics, recorders):
+        view_name = self.get_view_name(request)
+        for recorder in recorders:
+            recorder.flush(view_name)
+        self.log_request(request, metrics)
+
+    @staticmethod
+    def get_view_name(request):
+        match = getattr(request, 'resolver_match', None)
+        return match.url_name if match else None
+
+    def log_request(self, request, metrics):
+        view_name = self.get_view_name(request)
+        repeated = metrics.repeated_shapes()
+
+        if metrics.total_time * 1000 >= get_slow_request_ms():
+            logger.warning(
+                'Slow request %s %s (view=%s): %.1f ms total, %d queries, %.1f ms db, %.1f ms template',
+                request.method, request.path, view_name,
+                metrics.total_time * 1000, metrics.query_count,
+                metrics.db_time * 1000, metrics.template_time * 1000,
+            )
+        for shape, count in repeated:
+            logger.warning('Possible N+1 in view=%s: %d x %s', view_name, count, shape)
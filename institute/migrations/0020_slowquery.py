@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('institute', '0019_alter_exam_subject'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shape', models.TextField()),
+                ('sql', models.TextField()),
+                ('params_sample', models.TextField(blank=True)),
+                ('duration_ms', models.FloatField()),
+                ('view_name', models.CharField(blank=True, max_length=100)),
+                ('query_plan', models.TextField(blank=True)),
+                ('recorded_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Slow Query',
+                'verbose_name_plural': 'Slow Queries',
+                'ordering': ['-recorded_at'],
+            },
+        ),
+    ]
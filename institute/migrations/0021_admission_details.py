@@ -0,0 +1,63 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('institute', '0020_slowquery'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdmissionCredential',
+            fields=[
+                ('admission', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='credentials', serialize=False, to='institute.admission')),
+                ('sams_login_id', models.CharField(blank=True, max_length=100)),
+                ('sams_password', models.CharField(blank=True, max_length=100)),
+                ('pen_number', models.CharField(blank=True, max_length=100)),
+                ('apaar_id', models.CharField(blank=True, max_length=100)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AdmissionPersonal',
+            fields=[
+                ('admission', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='personal', serialize=False, to='institute.admission')),
+                ('father_name', models.CharField(max_length=100)),
+                ('mother_name', models.CharField(max_length=100)),
+                ('date_of_birth', models.DateField()),
+                ('address', models.TextField()),
+                ('adhaar_number', models.CharField(max_length=20)),
+                ('whatsapp_number', models.CharField(max_length=15)),
+                ('blood_group', models.CharField(max_length=5)),
+                ('category', models.CharField(max_length=50)),
+                ('college_name', models.CharField(max_length=200)),
+                ('board_name', models.CharField(max_length=100)),
+                ('college_roll_no', models.CharField(max_length=50)),
+                ('eleventh_year', models.CharField(max_length=10)),
+                ('twelfth_year', models.CharField(max_length=10)),
+                ('academics_accommodation', models.TextField(blank=True)),
+                ('college_dress', models.CharField(blank=True, max_length=100)),
+                ('books', models.CharField(blank=True, max_length=100)),
+                ('college_transportation', models.CharField(blank=True, max_length=100)),
+                ('tms_dress', models.CharField(blank=True, max_length=100)),
+                ('guardian_signature', models.CharField(blank=True, max_length=100)),
+                ('student_signature', models.CharField(blank=True, max_length=100)),
+                ('tms_signature', models.CharField(blank=True, max_length=100)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AdmissionVisitor',
+            fields=[
+                ('admission', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='visitors', serialize=False, to='institute.admission')),
+                ('visitor1_name', models.CharField(blank=True, max_length=100)),
+                ('visitor1_relation', models.CharField(blank=True, max_length=100)),
+                ('visitor1_contact', models.CharField(blank=True, max_length=15)),
+                ('visitor2_name', models.CharField(blank=True, max_length=100)),
+                ('visitor2_relation', models.CharField(blank=True, max_length=100)),
+                ('visitor2_contact', models.CharField(blank=True, max_length=15)),
+            ],
+        ),
+    ]
@@ -0,0 +1,51 @@
+from django.db import migrations
+
+DETAIL_FIELDS = {
+    'AdmissionPersonal': [
+        'father_name', 'mother_name', 'date_of_birth', 'address', 'adhaar_number',
+        'whatsapp_number', 'blood_group', 'category', 'college_name', 'board_name',
+        'college_roll_no', 'eleventh_year', 'twelfth_year', 'academics_accommodation',
+        'college_dress', 'books', 'college_transportation', 'tms_dress',
+        'guardian_signature', 'student_signature', 'tms_signature',
+    ],
+    'AdmissionVisitor': [
+        'visitor1_name', 'visitor1_relation', 'visitor1_contact',
+        'visitor2_name', 'visitor2_relation', 'visitor2_contact',
+    ],
+    'AdmissionCredential': ['sams_login_id', 'sams_password', 'pen_number', 'apaar_id'],
+}
+CHUNK_SIZE = 2000
+
+
+def copy_to_details(apps, schema_editor):
+    db = schema_editor.connection.alias
+    Admission = apps.get_model('institute', 'Admission')
+    for model_name, fields in DETAIL_FIELDS.items():
+        Detail = apps.get_model('institute', model_name)
+        chunk = []
+        for row in Admission.objects.using(db).order_by('id').values('id', *fields).iterator(chunk_size=CHUNK_SIZE):
+            chunk.append(Detail(admission_id=row.pop('id'), **row))
+            if len(chunk) >= CHUNK_SIZE:
+                Detail.objects.using(db).bulk_create(chunk)
+                chunk = []
+        Detail.objects.using(db).bulk_create(chunk)
+
+
+def copy_from_details(apps, schema_editor):
+    db = schema_editor.connection.alias
+    Admission = apps.get_model('institute', 'Admission')
+    for model_name, fields in DETAIL_FIELDS.items():
+        Detail = apps.get_model('institute', model_name)
+        for row in Detail.objects.using(db).values('admission_id', *fields).iterator(chunk_size=CHUNK_SIZE):
+            Admission.objects.using(db).filter(id=row.pop('admission_id')).update(**row)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('institute', '0021_admission_details'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_to_details, copy_from_details),
+    ]
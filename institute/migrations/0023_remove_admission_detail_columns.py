@@ -0,0 +1,137 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:20
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('institute', '0022_copy_admission_details'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='admission',
+            name='academics_accommodation',
+        ),
+        migrations.RemoveField(
+            model_name='admission',
+            name='address',
+        ),
+        migrations.RemoveField(
+            model_name='admission',
+            name='adhaar_number',
+        ),
+        migrations.RemoveField(
+            model_name='admission',
+            name='apaar_id',
+        ),
+        migrations.RemoveField(
+            model_name='admission',
+            name='blood_group',
+        ),
+        migrations.RemoveField(
+            model_name='admission',
+            name='board_name',
+        ),
+        migrations.RemoveField(
+            model_name='admission',
+            name='books',
+        ),
+        migrations.RemoveField(
+            model_name='admission',
+            name='category',
+        ),
+        migrations.RemoveField(
+            model_name='admission',
+            name='college_dress',
+        ),
+        migrations.RemoveField(
+            model_name='admission',
+            name='college_name',
+        ),
+        migrations.RemoveField(
+            model_name='admission',
+            name='college_roll_no',
+        ),
+        migrations.RemoveField(
+            model_name='admission',
+            name='college_transportation',
+        ),
+        migrations.RemoveField(
+            model_name='admission',
+            name='date_of_birth',
+        ),
+        migrations.RemoveField(
+            model_name='admission',
+            name='eleventh_year',
+        ),
+        migrations.RemoveField(
+            model_name='admission',
+            name='father_name',
+        ),
+        migrations.RemoveField(
+            model_name='admission',
+            name='guardian_signature',
+        ),
+        migrations.RemoveField(
+            model_name='admission',
+            name='mother_name',
+        ),
+        migrations.RemoveField(
+            model_name='admission',
+            name='pen_number',
+        ),
+        migrations.RemoveField(
+            model_name='admission',
+            name='sams_login_id',
+        ),
+        migrations.RemoveField(
+            model_name='admission',
+            name='sams_password',
+        ),
+        migrations.RemoveField(
+            model_name='admission',
+            name='student_signature',
+        ),
+        migrations.RemoveField(
+            model_name='admission',
+            name='tms_dress',
+        ),
+        migrations.RemoveField(
+            model_name='admission',
+            name='tms_signature',
+        ),
+        migrations.RemoveField(
+            model_name='admission',
+            name='twelfth_year',
+        ),
+        migrations.RemoveField(
+            model_name='admission',
+            name='visitor1_contact',
+        ),
+        migrations.RemoveField(
+            model_name='admission',
+            name='visitor1_name',
+        ),
+        migrations.RemoveField(
+            model_name='admission',
+            name='visitor1_relation',
+        ),
+        migrations.RemoveField(
+            model_name='admission',
+            name='visitor2_contact',
+        ),
+        migrations.RemoveField(
+            model_name='admission',
+            name='visitor2_name',
+        ),
+        migrations.RemoveField(
+            model_name='admission',
+            name='visitor2_relation',
+        ),
+        migrations.RemoveField(
+            model_name='admission',
+            name='whatsapp_number',
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+def vacuum_sqlite(apps, schema_editor):
+    # SQLite's DROP COLUMN rewrites rows in place; rebuilding the file packs
+    # the narrower admission rows into fewer pages
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('VACUUM')
+
+
+class Migration(migrations.Migration):
+    # VACUUM cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('institute', '0023_remove_admission_detail_columns'),
+    ]
+
+    operations = [
+        migrations.RunPython(vacuum_sqlite, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_created_at(apps, schema_editor):
+    db = schema_editor.connection.alias
+    for name in ('Expense', 'Payment'):
+        apps.get_model('institute', name).objects.using(db).update(updated_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('institute', '0024_vacuum_admission'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expense',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_created_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('institute', '0025_expense_payment_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=50)),
+                ('object_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='admission',
+            index=models.Index(fields=['updated_at', 'id'], name='institute_a_updated_d81240_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['updated_at', 'id'], name='institute_e_updated_661ba6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['updated_at', 'id'], name='institute_e_updated_dcca52_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['updated_at', 'id'], name='institute_p_updated_a7fdcd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentresult',
+            index=models.Index(fields=['updated_at', 'id'], name='institute_s_updated_306d4a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['model', 'id'], name='institute_t_model_0af3b2_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_term_results(apps, schema_editor):
+    # Incremental refreshes only rank the students they touch, so start from every existing result
+    from institute.terms import fill_term_results
+
+    db = schema_editor.connection.alias
+    fill_term_results(
+        exams=apps.get_model('institute', 'Exam').objects.db_manager(db),
+        results=apps.get_model('institute', 'StudentResult').objects.db_manager(db),
+        terms=apps.get_model('institute', 'TermResult').objects.db_manager(db),
+    )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('institute', '0026_change_feed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TermResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('batch', models.CharField(max_length=50)),
+                ('exam_type', models.CharField(blank=True, choices=[('weekly', 'Weekly Test'), ('monthly', 'Monthly Test'), ('quarterly', 'Quarterly Exam'), ('half_yearly', 'Half Yearly Exam'), ('annual', 'Annual Exam'), ('pre_board', 'Pre-Board Exam'), ('other', 'Other')], max_length=20)),
+                ('exams', models.PositiveIntegerField(default=0)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('out_of', models.PositiveIntegerField(default=0)),
+                ('percentage', models.DecimalField(decimal_places=2, default=0, max_digits=5)),
+                ('grade', models.CharField(max_length=2)),
+                ('rank', models.PositiveIntegerField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='term_results', to='institute.admission')),
+            ],
+            options={
+                'ordering': ['batch', 'exam_type', 'rank'],
+                'indexes': [models.Index(fields=['batch', 'exam_type', 'rank'], name='institute_t_batch_4c117f_idx')],
+                'unique_together': {('student', 'batch', 'exam_type')},
+            },
+        ),
+        migrations.RunPython(fill_term_results, migrations.RunPython.noop),
+    ]
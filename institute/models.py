@@ -1,5 +1,7 @@
 # models.py - COMPLETE UPDATED FILE
+from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
+from django.db.models.functions import Cast, CumeDist, DenseRank, Rank
 from django.contrib.auth.models import AbstractUser
 
 class CustomUser(AbstractUser):
@@ -27,6 +29,74 @@ class CustomUser(AbstractUser):
     def __str__(self):
         return f"{self.username} - {self.user_type}"
 
+class AdmissionQuerySet(models.QuerySet):
+    """Named column projections for pages that only show a few Admission fields.
+
+    Touching a field outside the projection costs one extra query per row, so
+    templates rendered from these querysets must stick to the listed fields.
+    """
+    # Needed by every projection (__str__ uses enrolled_for)
+    IDENTITY_FIELDS = ('id', 'admission_id', 'student_name', 'mobile_number', 'enrolled_for')
+    LIST_FIELDS = IDENTITY_FIELDS + (
+        'student_image', 'course', 'batch', 'is_admitted', 'admission_date', 'created_at',
+    )
+    ROSTER_FIELDS = IDENTITY_FIELDS + (
+        'batch', 'subject1', 'subject2', 'subject3', 'subject4', 'subject5', 'subject6',
+    )
+    LEDGER_FIELDS = IDENTITY_FIELDS + ('course', 'tms_fees', 'admitted_college_fees', 'hostel_fees')
+
+    def for_list(self, *extra_fields):
+        """Registration/admission tables: name, contacts, course and status.
+
+        ``extra_fields`` may name detail columns such as
+        ``'personal__father_name'``; their tables are joined in.
+        """
+        related = {name.split('__')[0] for name in extra_fields if '__' in name}
+        queryset = self.select_related(*related) if related else self
+        return queryset.only(*self.LIST_FIELDS, *extra_fields)
+
+    def for_roster(self):
+        """Exam rosters: identity, batch and the six subject columns."""
+        return self.only(*self.ROSTER_FIELDS)
+
+    def for_ledger(self):
+        """Account pages: identity, course and the fee columns."""
+        return self.only(*self.LEDGER_FIELDS)
+
+    def with_details(self):
+        """Join all detail tables, for pages that show the full record."""
+        return self.select_related(*Admission.DETAIL_MODELS)
+
+    def with_transaction_flag(self):
+        """Annotate ``has_transactions``: any payment, expense or exam result.
+
+        Students with transactions can be neither un-admitted nor deleted.
+        """
+        return self.annotate(
+            has_transactions=models.ExpressionWrapper(
+                models.Q(models.Exists(Payment.objects.filter(admission=models.OuterRef('pk')))) |
+                models.Q(models.Exists(Expense.objects.filter(admission=models.OuterRef('pk')))) |
+                models.Q(models.Exists(StudentResult.objects.filter(student=models.OuterRef('pk')))),
+                output_field=models.BooleanField(),
+            )
+        )
+
+    def bulk_create(self, objs, *args, **kwargs):
+        # Detail values given to unsaved admissions are written after the core rows
+        objs = super().bulk_create(objs, *args, **kwargs)
+        for accessor, model in Admission.DETAIL_MODELS.items():
+            details = []
+            for obj in objs:
+                if accessor in obj.dirty_details:
+                    detail = obj.get_detail(accessor)
+                    detail.admission = obj
+                    details.append(detail)
+            model.objects.bulk_create(details, batch_size=kwargs.get('batch_size'))
+        for obj in objs:
+            obj.dirty_details.clear()
+        return objs
+
+
 class Admission(models.Model):
     # Custom Admission ID Field
     admission_id = models.CharField(max_length=20, unique=True, blank=True, null=True, verbose_name="Admission ID")
@@ -35,48 +105,18 @@ class Admission(models.Model):
     student_image = models.ImageField(upload_to='student_images/', blank=True, null=True, verbose_name="Student Photo")
     
     student_name = models.CharField(max_length=100)
-    father_name = models.CharField(max_length=100)
-    mother_name = models.CharField(max_length=100)
-    date_of_birth = models.DateField()
     mobile_number = models.CharField(max_length=15)
-    address = models.TextField()
-    adhaar_number = models.CharField(max_length=20)
-    whatsapp_number = models.CharField(max_length=15)
-    blood_group = models.CharField(max_length=5)
-    category = models.CharField(max_length=50)
     
     # College details
-    college_name = models.CharField(max_length=200)
-    board_name = models.CharField(max_length=100)
-    college_roll_no = models.CharField(max_length=50)
     batch = models.CharField(max_length=50)
-    eleventh_year = models.CharField(max_length=10)
-    twelfth_year = models.CharField(max_length=10)
     course = models.CharField(max_length=100)
     
     # Enrollment
     enrolled_for = models.CharField(max_length=100, blank=True, null=True)
-    sams_login_id = models.CharField(max_length=100, blank=True)
-    sams_password = models.CharField(max_length=100, blank=True)
-    pen_number = models.CharField(max_length=100, blank=True)
-    apaar_id = models.CharField(max_length=100, blank=True)
-    
-    # Visitors
-    visitor1_name = models.CharField(max_length=100, blank=True)
-    visitor1_relation = models.CharField(max_length=100, blank=True)
-    visitor1_contact = models.CharField(max_length=15, blank=True)
-    visitor2_name = models.CharField(max_length=100, blank=True)
-    visitor2_relation = models.CharField(max_length=100, blank=True)
-    visitor2_contact = models.CharField(max_length=15, blank=True)
     
-    # Fees and facilities
+    # Fees
     hostel_fees = models.DecimalField(max_digits=10, decimal_places=2, default=0, blank=True, null=True)
-    academics_accommodation = models.TextField(blank=True)
     admitted_college_fees = models.DecimalField(max_digits=10, decimal_places=2, default=0, blank=True, null=True)
-    college_dress = models.CharField(max_length=100, blank=True)
-    books = models.CharField(max_length=100, blank=True)
-    college_transportation = models.CharField(max_length=100, blank=True)
-    tms_dress = models.CharField(max_length=100, blank=True)
     
     # Subjects
     subject1 = models.CharField(max_length=100, blank=True, null=True,default="Odia")
@@ -91,11 +131,6 @@ class Admission(models.Model):
     ])
     tms_fees = models.DecimalField(max_digits=10, decimal_places=2, default=0, blank=True, null=True)
     
-    # Signatures (in real app, these would be FileFields)
-    guardian_signature = models.CharField(max_length=100, blank=True)
-    student_signature = models.CharField(max_length=100, blank=True)
-    tms_signature = models.CharField(max_length=100, blank=True)
-    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     submitted_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True)
@@ -103,7 +138,9 @@ class Admission(models.Model):
     is_admitted = models.BooleanField(default=False, verbose_name="Admitted")
     admission_date = models.DateField(null=True, blank=True)
     admitted_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='admitted_students')
-    
+
+    objects = AdmissionQuerySet.as_manager()
+
     def save(self, *args, **kwargs):
         # Generate custom admission ID if not already set (only for new records)
         if not self.admission_id and not self.pk:
@@ -123,11 +160,125 @@ class Admission(models.Model):
             self.admission_id = f"TMIS{next_number:04d}"
         
         super().save(*args, **kwargs)
+        self.save_details()
+    
+    @property
+    def dirty_details(self):
+        """Accessors of detail records changed since the last save"""
+        return self.__dict__.setdefault('_dirty_details', set())
+    
+    def get_detail(self, accessor):
+        """Return the detail record, or a new unsaved one if none exists yet"""
+        try:
+            return getattr(self, accessor)
+        except ObjectDoesNotExist:
+            detail = self.DETAIL_MODELS[accessor](admission=self)
+            setattr(self, accessor, detail)
+            return detail
+    
+    def save_details(self):
+        for accessor in sorted(self.dirty_details):
+            detail = self.get_detail(accessor)
+            detail.admission = self
+            detail.save(force_insert=detail._state.adding)
+        self.dirty_details.clear()
     
     def __str__(self):
         admission_id_display = self.admission_id if self.admission_id else f"ID:{self.id}"
         return f"{admission_id_display} - {self.student_name} - {self.enrolled_for}"
     
+    class Meta:
+        # Change feed cursor (institute.changes)
+        indexes = [models.Index(fields=['updated_at', 'id'])]
+
+
+class AdmissionPersonal(models.Model):
+    """Personal, previous-college, facility and signature details of an admission"""
+    admission = models.OneToOneField(Admission, on_delete=models.CASCADE, primary_key=True, related_name='personal')
+    father_name = models.CharField(max_length=100)
+    mother_name = models.CharField(max_length=100)
+    date_of_birth = models.DateField()
+    address = models.TextField()
+    adhaar_number = models.CharField(max_length=20)
+    whatsapp_number = models.CharField(max_length=15)
+    blood_group = models.CharField(max_length=5)
+    category = models.CharField(max_length=50)
+
+    # College details
+    college_name = models.CharField(max_length=200)
+    board_name = models.CharField(max_length=100)
+    college_roll_no = models.CharField(max_length=50)
+    eleventh_year = models.CharField(max_length=10)
+    twelfth_year = models.CharField(max_length=10)
+
+    # Facilities
+    academics_accommodation = models.TextField(blank=True)
+    college_dress = models.CharField(max_length=100, blank=True)
+    books = models.CharField(max_length=100, blank=True)
+    college_transportation = models.CharField(max_length=100, blank=True)
+    tms_dress = models.CharField(max_length=100, blank=True)
+
+    # Signatures
+    guardian_signature = models.CharField(max_length=100, blank=True)
+    student_signature = models.CharField(max_length=100, blank=True)
+    tms_signature = models.CharField(max_length=100, blank=True)
+
+    def __str__(self):
+        return f"Personal details of {self.admission_id}"
+
+
+class AdmissionVisitor(models.Model):
+    """Visitors allowed to meet the student"""
+    admission = models.OneToOneField(Admission, on_delete=models.CASCADE, primary_key=True, related_name='visitors')
+    visitor1_name = models.CharField(max_length=100, blank=True)
+    visitor1_relation = models.CharField(max_length=100, blank=True)
+    visitor1_contact = models.CharField(max_length=15, blank=True)
+    visitor2_name = models.CharField(max_length=100, blank=True)
+    visitor2_relation = models.CharField(max_length=100, blank=True)
+    visitor2_contact = models.CharField(max_length=15, blank=True)
+
+    def __str__(self):
+        return f"Visitors of {self.admission_id}"
+
+
+class AdmissionCredential(models.Model):
+    """Government portal logins and IDs"""
+    admission = models.OneToOneField(Admission, on_delete=models.CASCADE, primary_key=True, related_name='credentials')
+    sams_login_id = models.CharField(max_length=100, blank=True)
+    sams_password = models.CharField(max_length=100, blank=True)
+    pen_number = models.CharField(max_length=100, blank=True)
+    apaar_id = models.CharField(max_length=100, blank=True)
+
+    def __str__(self):
+        return f"Credentials of {self.admission_id}"
+
+
+def _detail_property(accessor, name):
+    def getter(admission):
+        return getattr(admission.get_detail(accessor), name)
+
+    def setter(admission, value):
+        setattr(admission.get_detail(accessor), name, value)
+        admission.dirty_details.add(accessor)
+
+    return property(getter, setter)
+
+
+# Detail columns read and write like regular Admission attributes
+# (admission.father_name, Admission(address=...)); save() writes the
+# detail records that were changed.
+Admission.DETAIL_MODELS = {
+    'personal': AdmissionPersonal,
+    'visitors': AdmissionVisitor,
+    'credentials': AdmissionCredential,
+}
+Admission.DETAIL_FIELDS = {}
+for _accessor, _model in Admission.DETAIL_MODELS.items():
+    for _field in _model._meta.concrete_fields:
+        if not _field.primary_key:
+            Admission.DETAIL_FIELDS[_field.name] = _accessor
+            setattr(Admission, _field.name, _detail_property(_accessor, _field.name))
+    
     
     
 class Expense(models.Model):
@@ -144,9 +295,14 @@ class Expense(models.Model):
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     added_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"{self.admission.admission_id} - {self.category} - ₹{self.amount}"
+    
+    class Meta:
+        # Change feed cursor (institute.changes)
+        indexes = [models.Index(fields=['updated_at', 'id'])]
 
 
 class Payment(models.Model):
@@ -171,6 +327,7 @@ class Payment(models.Model):
     receipt_number = models.CharField(max_length=50, unique=True, blank=True, null=True)
     received_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     def save(self, *args, **kwargs):
         # Generate receipt number if not provided
@@ -195,6 +352,10 @@ class Payment(models.Model):
     def __str__(self):
         return f"{self.admission.admission_id} - ₹{self.amount} - {self.payment_type}"
     
+    class Meta:
+        # Change feed cursor (institute.changes)
+        indexes = [models.Index(fields=['updated_at', 'id'])]
+    
 class Organization(models.Model):
     name = models.CharField(max_length=200, unique=True, verbose_name="Organization Name") 
     logo = models.ImageField(upload_to='organization_logos/', null=True, blank=True, verbose_name="Logo")
@@ -313,6 +474,81 @@ class Exam(models.Model):
     
     class Meta:
         ordering = ['-exam_date']
+        # Change feed cursor (institute.changes)
+        indexes = [models.Index(fields=['updated_at', 'id'])]
+
+
+def grade_for(percentage):
+    if percentage >= 90:
+        return "A+"
+    elif percentage >= 80:
+        return "A"
+    elif percentage >= 70:
+        return "B+"
+    elif percentage >= 60:
+        return "B"
+    elif percentage >= 50:
+        return "C"
+    elif percentage >= 33:
+        return "D"
+    else:
+        return "F"
+
+
+class Percentile(CumeDist):
+    """``CUME_DIST()`` as a percentage. Scaled inside the window expression,
+    as a product around a window ends up in the GROUP BY of aggregate queries."""
+    template = '100 * %(function)s()'
+
+
+class StudentResultQuerySet(models.QuerySet):
+    """Rank, dense rank and percentile of exam results.
+
+    A window sees the rows left after WHERE, so filter by exam and not by
+    student; ``standing()`` answers for one student. Term and year ranks
+    are stored in ``TermResult`` (institute.terms).
+    """
+
+    def with_rank(self):
+        """Annotate ``rank``, ``dense_rank``, ``percentile`` and ``appeared`` within each exam.
+
+        Absent results form their own partition, so present students are
+        ranked among themselves; the figures on absent rows mean nothing.
+        ``percentile`` is the share of the exam's present students scoring
+        at most as much (100 for the topper).
+        """
+        partition = [models.F('exam_id'), models.F('is_absent')]
+        # Ordering a window by a DecimalField breaks the SQL on SQLite, a float does not
+        marks = Cast('marks_obtained', models.FloatField())
+        return self.annotate(
+            rank=models.Window(Rank(), partition_by=partition, order_by=marks.desc()),
+            dense_rank=models.Window(DenseRank(), partition_by=partition, order_by=marks.desc()),
+            percentile=models.Window(Percentile(), partition_by=partition, order_by=marks.asc()),
+            appeared=models.Window(models.Count('id'), partition_by=partition),
+        )
+
+    def standing(self, exam, student_id):
+        """``{rank, dense_rank, percentile, appeared}`` of a student's present result in ``exam``, or None.
+
+        Counted with aggregates against the student's marks, so a report card
+        reads two rows whatever the size of the exam; the figures match ``with_rank()``.
+        """
+        present = self.filter(exam=exam, is_absent=False).order_by()
+        marks = present.filter(student_id=student_id).values_list('marks_obtained', flat=True).first()
+        if marks is None:
+            return None
+        counts = present.aggregate(
+            above=models.Count('id', filter=models.Q(marks_obtained__gt=marks)),
+            distinct_above=models.Count('marks_obtained', distinct=True, filter=models.Q(marks_obtained__gt=marks)),
+            at_most=models.Count('id', filter=models.Q(marks_obtained__lte=marks)),
+            appeared=models.Count('id'),
+        )
+        return {
+            'rank': counts['above'] + 1,
+            'dense_rank': counts['distinct_above'] + 1,
+            'percentile': 100 * counts['at_most'] / counts['appeared'],
+            'appeared': counts['appeared'],
+        }
 
 
 class StudentResult(models.Model):
@@ -325,10 +561,14 @@ class StudentResult(models.Model):
     entered_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True)
     entered_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    objects = StudentResultQuerySet.as_manager()
     
     class Meta:
         unique_together = ['exam', 'student']
         ordering = ['exam__exam_date', 'student__student_name']
+        # Change feed cursor (institute.changes)
+        indexes = [models.Index(fields=['updated_at', 'id'])]
     
     def __str__(self):
         status = "Absent" if self.is_absent else f"Marks: {self.marks_obtained}"
@@ -344,21 +584,30 @@ class StudentResult(models.Model):
     def grade(self):
         if self.is_absent:
             return "AB"
-        percentage = self.percentage
-        if percentage >= 90:
-            return "A+"
-        elif percentage >= 80:
-            return "A"
-        elif percentage >= 70:
-            return "B+"
-        elif percentage >= 60:
-            return "B"
-        elif percentage >= 50:
-            return "C"
-        elif percentage >= 33:
-            return "D"
-        else:
-            return "F"
+        return grade_for(self.percentage)
+
+
+class TermResult(models.Model):
+    """A student's results in a batch added up over one exam type, or over the
+    whole academic year when ``exam_type`` is blank. Kept current by institute.terms"""
+    student = models.ForeignKey(Admission, on_delete=models.CASCADE, related_name='term_results')
+    batch = models.CharField(max_length=50)
+    exam_type = models.CharField(max_length=20, choices=Exam.EXAM_TYPE_CHOICES, blank=True)
+    exams = models.PositiveIntegerField(default=0)
+    total = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    out_of = models.PositiveIntegerField(default=0)
+    percentage = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    grade = models.CharField(max_length=2)
+    rank = models.PositiveIntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['student', 'batch', 'exam_type']
+        ordering = ['batch', 'exam_type', 'rank']
+        indexes = [models.Index(fields=['batch', 'exam_type', 'rank'])]
+    
+    def __str__(self):
+        return f"{self.student.student_name} - {self.batch} {self.get_exam_type_display() or 'Year'} - {self.percentage}%"
 
 
 class ExamAttendance(models.Model):
@@ -374,4 +623,35 @@ class ExamAttendance(models.Model):
     
     def __str__(self):
         status = "Present" if self.is_present else "Absent"
-        return f"{self.student.student_name} - {self.exam.name} - {status}"
\ No newline at end of file
+        return f"{self.student.student_name} - {self.exam.name} - {status}"
+
+class SlowQuery(models.Model):
+    """Ring-buffered log of SQL statements slower than INSTITUTE_SLOW_QUERY_MS"""
+    shape = models.TextField()
+    sql = models.TextField()
+    params_sample = models.TextField(blank=True)
+    duration_ms = models.FloatField()
+    view_name = models.CharField(max_length=100, blank=True)
+    query_plan = models.TextField(blank=True)
+    recorded_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-recorded_at']
+        verbose_name = "Slow Query"
+        verbose_name_plural = "Slow Queries"
+    
+    def __str__(self):
+        return f"{self.view_name or '-'} - {self.duration_ms:.1f} ms - {self.shape[:60]}"
+
+
+class Tombstone(models.Model):
+    """A deleted Admission, Payment, Expense, StudentResult or Exam, for the change feed"""
+    model = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [models.Index(fields=['model', 'id'])]
+    
+    def __str__(self):
+        return f"{self.model} {self.object_id} deleted {self.deleted_at:%Y-%m-%d %H:%M}"
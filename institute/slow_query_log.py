@@ -0,0 +1,114 @@
+"""Capture slow SQL statements with their EXPLAIN QUERY PLAN.
+
+SlowQueryRecorder is installed as a connection execute_wrapper by
+QueryInstrumentationMiddleware. Statements over ``INSTITUTE_SLOW_QUERY_MS``
+are buffered during the request and written to the SlowQuery table once the
+response is ready, so the log never runs inside a view's transaction.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+from .middleware import normalize_sql
+from .stats import percentile
+
+logger = logging.getLogger('institute.performance')
+
+PARAMS_SAMPLE_LENGTH = 500
+
+
+def get_slow_query_ms():
+    return getattr(settings, 'INSTITUTE_SLOW_QUERY_MS', 100)
+
+
+def get_slow_query_log_size():
+    return getattr(settings, 'INSTITUTE_SLOW_QUERY_LOG_SIZE', 1000)
+
+
+class SlowQueryRecorder:
+    """Execute wrapper collecting statements slower than the threshold"""
+
+    def __init__(self, alias, threshold_ms=None):
+        self.alias = alias
+        self.threshold_ms = get_slow_query_ms() if threshold_ms is None else threshold_ms
+        self.captured = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            if duration_ms >= self.threshold_ms:
+                self.captured.append((sql, None if many else params, duration_ms))
+
+    def flush(self, view_name=''):
+        """Store captured statements with their query plans, trimming the ring buffer."""
+        if not self.captured:
+            return
+        from .models import SlowQuery
+
+        entries = [
+            SlowQuery(
+                shape=normalize_sql(sql),
+                sql=sql,
+                params_sample=repr(params)[:PARAMS_SAMPLE_LENGTH] if params is not None else '',
+                duration_ms=duration_ms,
+                view_name=view_name or '',
+                query_plan=self.explain(sql, params),
+            )
+            for sql, params, duration_ms in self.captured
+        ]
+        self.captured = []
+        try:
+            SlowQuery.objects.bulk_create(entries)
+            latest_id = SlowQuery.objects.order_by('-id').values_list('id', flat=True).first()
+            if latest_id:
+                SlowQuery.objects.filter(id__lte=latest_id - get_slow_query_log_size()).delete()
+        except DatabaseError:
+            logger.exception('Could not store slow query log entries')
+
+    def explain(self, sql, params):
+        connection = connections[self.alias]
+        if connection.vendor != 'sqlite' or params is None:
+            return ''
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                return '\n'.join(row[-1] for row in cursor.fetchall())
+        except DatabaseError:
+            return ''
+
+
+def aggregate_by_shape(entries):
+    """Group SlowQuery rows by shape with count, p50, p95 and max durations."""
+    groups = {}
+    for entry in entries:
+        group = groups.setdefault(entry.shape, {
+            'shape': entry.shape,
+            'durations': [],
+            'views': set(),
+            'latest': entry,
+        })
+        group['durations'].append(entry.duration_ms)
+        if entry.view_name:
+            group['views'].add(entry.view_name)
+        if entry.recorded_at > group['latest'].recorded_at:
+            group['latest'] = entry
+
+    rows = []
+    for group in groups.values():
+        durations = group['durations']
+        rows.append({
+            'shape': group['shape'],
+            'count': len(durations),
+            'p50': percentile(durations, 50),
+            'p95': percentile(durations, 95),
+            'max': max(durations),
+            'views': sorted(group['views']),
+            'latest': group['latest'],
+        })
+    rows.sort(key=lambda row: row['p95'], reverse=True)
+    return rows
@@ -0,0 +1,165 @@
+"""Serve collected static files and media from the app process in production.
+
+``StaticMediaMiddleware`` answers GET/HEAD requests under ``STATIC_URL`` and
+``MEDIA_URL`` before sessions, auth or views run:
+
+* static files get the ``.br``/``.gz`` variant written by
+  ``institute.storage.CompressedManifestStaticFilesStorage`` that the client
+  accepts, and a year of ``immutable`` caching when the name is one of the
+  manifest's hashed names;
+* media files support single byte ranges; content-addressed photos
+  (``institute.images``) are immutable too;
+* everything else is revalidated with ETag / Last-Modified and answered
+  with 304 when unchanged.
+"""
+import json
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'public, no-cache'
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+HASHED_MEDIA_NAME = re.compile(r'(^|/)[0-9a-f]{32}(-\d+)?\.\w+$')
+RANGE = re.compile(r'bytes=(\d*)-(\d*)$')
+
+
+def manifest_names(static_root):
+    """Hashed names listed in ``staticfiles.json``, or an empty set before collectstatic."""
+    try:
+        with open(os.path.join(static_root, 'staticfiles.json')) as fh:
+            return set(json.load(fh).get('paths', {}).values())
+    except (OSError, ValueError):
+        return set()
+
+
+def accepted_encodings(request):
+    header = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    accepted = set()
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        if params.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def byte_range(request, size, etag, last_modified):
+    """``(start, end)`` of a satisfiable single range, ``False`` if unsatisfiable, else None."""
+    header = request.META.get('HTTP_RANGE', '').replace(' ', '')
+    match = RANGE.match(header)
+    if not match or not any(match.groups()):
+        return None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range and if_range not in (etag, last_modified):
+        return None
+    first, last = match.groups()
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def iter_range(path, start, length, block_size=64 * 1024):
+    with open(path, 'rb') as fh:
+        fh.seek(start)
+        while length > 0:
+            chunk = fh.read(min(block_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+class StaticMediaMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.roots = []
+        if settings.STATIC_ROOT:
+            hashed = manifest_names(settings.STATIC_ROOT)
+            self.roots.append((settings.STATIC_URL, str(settings.STATIC_ROOT), True, hashed.__contains__))
+        if settings.MEDIA_ROOT:
+            self.roots.append((settings.MEDIA_URL, str(settings.MEDIA_ROOT), False,
+                               lambda name: HASHED_MEDIA_NAME.search(name) is not None))
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD'):
+            for prefix, root, precompressed, is_immutable in self.roots:
+                if prefix and request.path.startswith(prefix):
+                    response = self.serve(request, root, request.path[len(prefix):], precompressed, is_immutable)
+                    if response is not None:
+                        return response
+        return self.get_response(request)
+
+    def serve(self, request, root, name, precompressed, is_immutable):
+        try:
+            path = safe_join(root, name)
+        except (SuspiciousFileOperation, ValueError):
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        served, encoding, vary = path, None, False
+        if precompressed:
+            accepted = accepted_encodings(request)
+            for coding, suffix in ENCODINGS:
+                if os.path.isfile(path + suffix):
+                    vary = True
+                    if encoding is None and coding in accepted:
+                        served, encoding = path + suffix, coding
+
+        stat = os.stat(served)
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}{"-" + encoding if encoding else ""}"'
+        last_modified = http_date(stat.st_mtime)
+        headers = {
+            'ETag': etag,
+            'Last-Modified': last_modified,
+            'Cache-Control': IMMUTABLE if is_immutable(name) else REVALIDATE,
+        }
+        if vary:
+            headers['Vary'] = 'Accept-Encoding'
+
+        conditional = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+        if conditional is not None:
+            for header, value in headers.items():
+                conditional[header] = value
+            return conditional
+
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        status, start, length = 200, 0, stat.st_size
+        if encoding:
+            headers['Content-Encoding'] = encoding
+        else:
+            headers['Accept-Ranges'] = 'bytes'
+            requested = byte_range(request, stat.st_size, etag, last_modified)
+            if requested is False:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f'bytes */{stat.st_size}'
+                return response
+            if requested:
+                status, start = 206, requested[0]
+                length = requested[1] - start + 1
+                headers['Content-Range'] = f'bytes {start}-{requested[1]}/{stat.st_size}'
+
+        if request.method == 'HEAD':
+            response = HttpResponse(content_type=content_type, status=status)
+        elif status == 206:
+            response = StreamingHttpResponse(iter_range(served, start, length), content_type=content_type, status=206)
+        else:
+            response = FileResponse(open(served, 'rb'), content_type=content_type)
+            del response['Content-Disposition']
+        for header, value in headers.items():
+            response[header] = value
+        response['Content-Length'] = str(length)
+        return response
@@ -0,0 +1,25 @@
+"""Small statistics helpers shared by the performance tooling."""
+
+
+def percentile(values, pct):
+    """Return the ``pct`` percentile (0-100) of ``values`` using linear interpolation."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return float(ordered[0])
+    rank = (len(ordered) - 1) * pct / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return float(ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower))
+
+
+def summarize(values):
+    """Count, p50, p95, p99 and max of a list of numbers."""
+    return {
+        'count': len(values),
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+        'max': float(max(values)) if values else 0.0,
+    }
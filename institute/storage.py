@@ -0,0 +1,49 @@
+"""Static files storage writing precompressed variants next to hashed files."""
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # Brotli variants are optional; gzip is always written
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.map', '.svg', '.json', '.txt', '.html', '.xml', '.ttf', '.otf', '.eot', '.ico')
+# Keep a variant only when it saves at least this fraction of the original
+MIN_SAVING = 0.05
+
+
+def compress(data):
+    """``{'gz': bytes, 'br': bytes}`` for the encodings worth storing."""
+    variants = {'gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(data, quality=11)
+    return {ext: body for ext, body in variants.items() if len(body) < len(data) * (1 - MIN_SAVING)}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage that also writes ``.gz`` (and ``.br``) files.
+
+    ``institute.static_serving.StaticMediaMiddleware`` picks the variant
+    matching the request's Accept-Encoding.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        names = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            # Templates only link hashed names, so only those get variants
+            if not isinstance(processed, Exception):
+                names.add(hashed_name)
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for name in sorted(names):
+            if name and name.lower().endswith(COMPRESSIBLE_EXTENSIONS) and self.exists(name):
+                with self.open(name) as fh:
+                    data = fh.read()
+                for ext, body in compress(data).items():
+                    variant = f'{name}.{ext}'
+                    if self.exists(variant):
+                        self.delete(variant)
+                    self._save(variant, ContentFile(body))
@@ -1,6 +1,8 @@
 # institute/templatetags/custom_filters.py
 from django import template
 
+from institute.images import thumbnail_url
+
 register = template.Library()
 
 @register.filter
@@ -27,4 +29,10 @@ def div(value, arg):
             return float(value) / float(arg)
         return 0
     except (ValueError, TypeError):
-        return 0
\ No newline at end of file
+        return 0
+
+@register.filter
+def thumbnail(image_file, spec):
+    """Student photo derivative URL, e.g. {{ s.student_image|thumbnail:'64' }} or '64:jpeg'"""
+    size, _, fmt = str(spec).partition(':')
+    return thumbnail_url(image_file, int(size), fmt or 'webp')
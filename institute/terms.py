@@ -0,0 +1,219 @@
+"""Term and year results per student, kept in ``TermResult``.
+
+Every saved or deleted ``StudentResult`` marks its student's
+``(batch, exam_type)`` partition and the ``(batch, '')`` year partition
+dirty; they are recomputed once, when the transaction commits. A request
+saving a whole exam's marks inside ``write_transaction`` therefore costs
+one aggregate, one upsert, one delete and one re-rank per partition, not
+one per row. An exam whose batch, type or total marks change re-marks all
+of its students.
+
+``bulk_create`` and ``QuerySet.update()`` send no signals: run
+``rebuild_term_results`` (or ``python manage.py rebuild_term_results``)
+after writing results that way. Until then, the next signalled write to a
+partition missing some of its students recomputes that whole partition.
+"""
+import functools
+import logging
+import threading
+from decimal import Decimal
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+
+from .db import write_transaction
+from .models import Exam, StudentResult, TermResult, grade_for
+
+TERM_FIELDS = ['exams', 'total', 'out_of', 'percentage', 'grade', 'updated_at']
+YEAR = ''
+
+logger = logging.getLogger('institute.performance')
+_state = threading.local()
+
+
+def _local(name):
+    value = getattr(_state, name, None)
+    if value is None:
+        value = {}
+        setattr(_state, name, value)
+    return value
+
+
+def partition_results(batch, exam_type, results=StudentResult.objects):
+    """Results of a ``(batch, exam_type)`` partition; ``exam_type`` '' spans the year."""
+    results = results.filter(exam__batch=batch)
+    return results.filter(exam__exam_type=exam_type) if exam_type else results
+
+
+def term_totals(batch, exam_type, student_ids=None, results=StudentResult.objects):
+    """``(student_id, total, out_of, exams, appeared)`` per student of the partition."""
+    results = partition_results(batch, exam_type, results)
+    if student_ids is not None:
+        results = results.filter(student_id__in=student_ids)
+    return results.order_by().values('student_id').annotate(
+        total=Sum('marks_obtained', filter=Q(is_absent=False)),
+        out_of=Sum('exam__total_marks'),
+        exams=Count('id'),
+        appeared=Count('id', filter=Q(is_absent=False)),
+    ).values_list('student_id', 'total', 'out_of', 'exams', 'appeared')
+
+
+def term_result(batch, exam_type, student_id, total, out_of, exams, appeared, model=TermResult):
+    total = total or Decimal('0')
+    percentage = (total * 100 / out_of).quantize(Decimal('0.01')) if out_of else Decimal('0')
+    return model(
+        student_id=student_id, batch=batch, exam_type=exam_type, exams=exams, total=total,
+        out_of=out_of or 0, percentage=percentage, grade=grade_for(percentage) if appeared else 'AB',
+    )
+
+
+def rank_partition(batch, exam_type, terms=TermResult.objects):
+    """Competition ranks (1, 2, 2, 4) by percentage; only changed ranks are written."""
+    rows = terms.filter(batch=batch, exam_type=exam_type).order_by(
+        '-percentage', 'id'
+    ).values_list('id', 'percentage', 'rank')
+    changed = []
+    previous = rank = None
+    for position, (pk, percentage, old_rank) in enumerate(rows, 1):
+        if percentage != previous:
+            rank, previous = position, percentage
+        if rank != old_rank:
+            changed.append(terms.model(id=pk, rank=rank))
+    terms.bulk_update(changed, ['rank'], batch_size=500)
+    return len(changed)
+
+
+def refresh_partition(batch, exam_type, student_ids):
+    partition = TermResult.objects.filter(batch=batch, exam_type=exam_type)
+    # Students with results but no row (written by bulk_create or update()) would be
+    # left out of the ranking: redo the whole partition then
+    if partition_results(batch, exam_type).exclude(student_id__in=student_ids).exclude(
+        student_id__in=partition.values('student_id')
+    ).exists():
+        student_ids = None
+    rows = [term_result(batch, exam_type, *totals) for totals in term_totals(batch, exam_type, student_ids)]
+    TermResult.objects.bulk_create(
+        rows, batch_size=500, update_conflicts=True,
+        unique_fields=['student', 'batch', 'exam_type'], update_fields=TERM_FIELDS,
+    )
+    # Students whose last result in the partition went away
+    stale = partition if student_ids is None else partition.filter(student_id__in=student_ids)
+    stale.exclude(student_id__in=[row.student_id for row in rows]).delete()
+    rank_partition(batch, exam_type)
+
+
+@write_transaction
+def refresh_term_results(partitions):
+    """Recompute ``{(batch, exam_type): student_ids}`` and re-rank each partition."""
+    for (batch, exam_type), student_ids in partitions.items():
+        refresh_partition(batch, exam_type, sorted(student_ids))
+
+
+def fill_term_results(batch=None, exams=Exam.objects, results=StudentResult.objects, terms=TermResult.objects):
+    """Create the ranked rows of every partition (of one batch) with results. Returns the row count.
+
+    The managers are parameters so migrations can pass their historical ones.
+    """
+    exams = exams.filter(results__isnull=False)
+    if batch is not None:
+        exams = exams.filter(batch=batch)
+    partitions = set()
+    for exam_batch, exam_type in exams.order_by().values_list('batch', 'exam_type').distinct():
+        partitions.update([(exam_batch, exam_type), (exam_batch, YEAR)])
+
+    created = 0
+    for exam_batch, exam_type in sorted(partitions):
+        rows = [
+            term_result(exam_batch, exam_type, *totals, model=terms.model)
+            for totals in term_totals(exam_batch, exam_type, results=results)
+        ]
+        terms.bulk_create(rows, batch_size=500)
+        rank_partition(exam_batch, exam_type, terms)
+        created += len(rows)
+    return created
+
+
+@write_transaction
+def rebuild_term_results(batch=None):
+    """Recreate every ``TermResult`` (of one batch) from the results. Returns the row count."""
+    stale = TermResult.objects.all() if batch is None else TermResult.objects.filter(batch=batch)
+    stale.delete()
+    return fill_term_results(batch)
+
+
+def flush_term_results():
+    partitions, _state.pending = _local('pending'), None
+    _state.exam_keys = _state.flush = None
+    if not partitions:
+        return
+    try:
+        refresh_term_results(partitions)
+    except Exception:
+        # The results are already committed; leave the stale rows to a rebuild
+        logger.exception('Refreshing term results of %s failed; run rebuild_term_results', sorted(partitions))
+
+
+def mark_dirty(batch, exam_type, student_ids):
+    pending = _local('pending')
+    for scope in (exam_type, YEAR):
+        pending.setdefault((batch, scope), set()).update(student_ids)
+    # One callback per transaction; a rollback drops it, so check it is still queued.
+    # Outside a transaction on_commit runs the flush at once.
+    flush = getattr(_state, 'flush', None)
+    if flush is None or not any(func is flush for _, func, _ in transaction.get_connection().run_on_commit):
+        _state.flush = functools.partial(flush_term_results)
+        transaction.on_commit(_state.flush, robust=True)
+
+
+def exam_key(result):
+    """``(batch, exam_type)`` of a result's exam, looked up once per exam until the next flush."""
+    if StudentResult.exam.is_cached(result):
+        return result.exam.batch, result.exam.exam_type
+    keys = _local('exam_keys')
+    if result.exam_id not in keys:
+        key = Exam.objects.filter(pk=result.exam_id).values_list('batch', 'exam_type').first()
+        if key is None:
+            return None
+        keys[result.exam_id] = key
+    return keys[result.exam_id]
+
+
+def result_changed(sender, instance, using, raw=False, **kwargs):
+    if raw or using != DEFAULT_DB_ALIAS or not instance.exam_id:
+        return
+    key = exam_key(instance)
+    if key:
+        mark_dirty(*key, [instance.student_id])
+
+
+def exam_pre_delete(sender, instance, using, **kwargs):
+    # The cascade may delete the exam row before its results send post_delete
+    if using == DEFAULT_DB_ALIAS:
+        _local('exam_keys')[instance.pk] = (instance.batch, instance.exam_type)
+
+
+def exam_pre_save(sender, instance, raw, using, **kwargs):
+    if raw or using != DEFAULT_DB_ALIAS or instance.pk is None:
+        return
+    instance._term_key = Exam.objects.filter(pk=instance.pk).values_list('batch', 'exam_type', 'total_marks').first()
+
+
+def exam_saved(sender, instance, created, raw, using, **kwargs):
+    old = instance.__dict__.pop('_term_key', None)
+    if raw or created or old is None or old == (instance.batch, instance.exam_type, instance.total_marks):
+        return
+    _local('exam_keys').pop(instance.pk, None)
+    student_ids = list(instance.results.values_list('student_id', flat=True))
+    if student_ids:
+        mark_dirty(old[0], old[1], student_ids)
+        mark_dirty(instance.batch, instance.exam_type, student_ids)
+
+
+def connect_term_results():
+    """Keep ``TermResult`` in step with result and exam writes, including cascades."""
+    post_save.connect(result_changed, sender=StudentResult, dispatch_uid='institute_term_result_saved')
+    post_delete.connect(result_changed, sender=StudentResult, dispatch_uid='institute_term_result_deleted')
+    pre_save.connect(exam_pre_save, sender=Exam, dispatch_uid='institute_term_exam_pre_save')
+    post_save.connect(exam_saved, sender=Exam, dispatch_uid='institute_term_exam_saved')
+    pre_delete.connect(exam_pre_delete, sender=Exam, dispatch_uid='institute_term_exam_pre_delete')
@@ -0,0 +1,49 @@
+"""Test helpers: admin sessions and per-view query budgets."""
+from django.urls import reverse
+
+from .middleware import get_n_plus_one_threshold
+from .models import CustomUser
+
+
+class AdminLoginMixin:
+    """TestCase mixin logging the test client in as an admin user."""
+
+    def login_admin(self):
+        admin = CustomUser.objects.create_user(username='admin', password='pw', user_type='admin')
+        self.client.force_login(admin)
+        return admin
+
+
+class QueryBudgetMixin:
+    """TestCase mixin that checks responses against per-view query budgets.
+
+    Set ``query_budgets`` to a mapping of URL names (from ``institute.urls``)
+    to the maximum number of queries the view may run, e.g.
+    ``{'account_section': 6}``. Relies on QueryInstrumentationMiddleware
+    attaching ``query_metrics`` to each response.
+    """
+    query_budgets = {}
+    n_plus_one_threshold = None
+
+    def assertQueryBudget(self, response, budget=None):
+        metrics = getattr(response, 'query_metrics', None)
+        if metrics is None:
+            self.fail('Response has no query_metrics; is QueryInstrumentationMiddleware enabled?')
+
+        view_name = response.resolver_match.url_name if response.resolver_match else None
+        if budget is None:
+            budget = self.query_budgets.get(view_name)
+        if budget is not None and metrics.query_count > budget:
+            self.fail(f'{view_name} ran {metrics.query_count} queries, budget is {budget}')
+
+        threshold = self.n_plus_one_threshold or get_n_plus_one_threshold()
+        repeated = metrics.repeated_shapes(threshold)
+        if repeated:
+            details = '\n'.join(f'  {count} x {shape}' for shape, count in repeated)
+            self.fail(f'{view_name} repeats SQL shapes (N+1):\n{details}')
+
+    def get_within_budget(self, url_name, args=None, kwargs=None, data=None, budget=None):
+        """GET a named URL and assert it stays within its query budget."""
+        response = self.client.get(reverse(url_name, args=args, kwargs=kwargs), data or {})
+        self.assertQueryBudget(response, budget=budget)
+        return response
@@ -1,20 +1,1185 @@
-from django.test import TestCase
+import csv
+import gzip
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import zipfile
+from datetime import date
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from .models import Admission
+from .backup import backup_sqlite, integrity_check, rotate_snapshots, sync_media
+from .db import apply_sqlite_pragmas, write_transaction
+from .images import THUMBNAIL_SIZES, thumbnail_name, thumbnail_url
+from .forms import AdmissionForm
+from .loadtest import MIXES, LoadTest, parse_weights
+from .marks import MarksMatrix
+from .middleware import normalize_sql
+from .models import (
+    Admission, AdmissionPersonal, CustomUser, Exam, ExamAttendance, Expense, Organization, Payment, SlowQuery,
+    StudentResult, TermResult, Tombstone,
+)
+from .terms import logger as terms_logger, rebuild_term_results
+from .testing import AdminLoginMixin, QueryBudgetMixin
+from .views.accounts import save_new_payment
+from .views.core import NAV_EXACT_PATHS, NAV_PATH_MARKERS
+
+
+def make_admission(**overrides):
+    fields = dict(
+        student_name="Test Student", father_name="Father", mother_name="Mother",
+        date_of_birth=date(2008, 1, 1), mobile_number="9000000000", address="Jajpur",
+        adhaar_number="1234", whatsapp_number="9000000000", blood_group="O+",
+        category="General", college_name="College", board_name="CHSE",
+        college_roll_no="R1", batch="2024-2025", eleventh_year="2024",
+        twelfth_year="2025", course="Science", is_admitted=True,
+    )
+    fields.update(overrides)
+    return Admission.objects.create(**fields)
+
+
+def admission_form_data(**overrides):
+    data = {
+        'student_name': 'Form Student', 'father_name': 'Form Father', 'mother_name': 'Form Mother',
+        'date_of_birth': '2008-05-01', 'mobile_number': '9111111111', 'address': 'Jajpur Road',
+        'adhaar_number': '5678', 'whatsapp_number': '9111111111', 'blood_group': 'B+',
+        'category': 'OBC', 'college_name': 'NC College', 'board_name': 'CHSE',
+        'college_roll_no': 'R9', 'batch': '2024-2025', 'eleventh_year': '2024',
+        'twelfth_year': '2025', 'course': 'Science', 'visitor1_name': 'Uncle',
+        'sams_login_id': 'sams-1', 'subject6': 'Biology',
+    }
+    data.update(overrides)
+    return data
+
 
 class AdmissionModelTest(TestCase):
     def test_admission_creation(self):
-        admission = Admission.objects.create(
-            student_name="Test Student",
-            email="test@example.com",
-            phone="1234567890",
-            course="Test Course",
-            admission_id="TEST001"
-        )
+        admission = make_admission(admission_id="TEST001")
         self.assertEqual(admission.student_name, "Test Student")
         self.assertEqual(admission.admission_id, "TEST001")
 
+    def test_admission_id_is_generated(self):
+        first = make_admission()
+        second = make_admission()
+        self.assertEqual(first.admission_id, "TMIS0001")
+        self.assertEqual(second.admission_id, "TMIS0002")
+
 class ViewTest(TestCase):
     def test_home_view(self):
         response = self.client.get(reverse('home'))
         self.assertEqual(response.status_code, 200)
+        # Assets are served from our own static files
+        self.assertNotContains(response, 'https://')
+
+    def test_urlconf_does_not_import_reportlab(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, 'imports.json')
+            call_command('benchmark_imports', runs=1, output=output, stdout=StringIO())
+            with open(output) as fh:
+                report = json.load(fh)
+        self.assertFalse(report['reportlab_loaded'])
+        self.assertIn('institute', report['packages'])
+
+
+class QueryInstrumentationTest(AdminLoginMixin, QueryBudgetMixin, TestCase):
+    query_budgets = {'account_section': 6}
+
+    def setUp(self):
+        self.admin = self.login_admin()
+        for i in range(6):
+            admission = make_admission(student_name=f"Student {i}")
+            Payment.objects.create(admission=admission, date=date.today(), payment_method='cash',
+                                   payment_type='tuition', description='Fee', amount=100)
+            Expense.objects.create(admission=admission, date=date.today(), category='food',
+                                   description='Lunch', amount=40)
+
+    def test_account_section_within_budget(self):
+        response = self.get_within_budget('account_section')
+        self.assertEqual(len(response.context['admission_data']), 6)
+        self.assertEqual(response.context['total_payments_sum'], 600)
+        self.assertEqual(response.context['admission_data'][0]['payments_count'], 1)
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('account_section'))
+        timing = response['Server-Timing']
+        for metric in ('db;dur=', 'template;dur=', 'total;dur='):
+            self.assertIn(metric, timing)
+
+    def test_lock_errors_flagged_without_debug(self):
+        self.client.raise_request_exception = False
+        admission = Admission.objects.first()
+        with mock.patch('institute.views.api.thumbnail_url', side_effect=OperationalError('database is locked')):
+            response = self.client.get(reverse('get_student_details'), {'id': admission.pk})
+        self.assertEqual((response.status_code, response['X-Database-Locked']), (500, '1'))
+        self.assertNotIn(b'database is locked', response.content)
+
+    @override_settings(INSTITUTE_SLOW_QUERY_MS=0)
+    def test_streaming_response_measured_until_consumed(self):
+        response = self.client.get(reverse('export_admissions'))
+        self.assertNotIn('Server-Timing', response)
+        before = response.query_metrics.query_count
+        self.assertFalse(SlowQuery.objects.filter(view_name='export_admissions').exists())
+        self.assertIn(b'Student 5', b''.join(response.streaming_content))
+        self.assertGreater(response.query_metrics.query_count, before)
+        self.assertTrue(SlowQuery.objects.filter(view_name='export_admissions', shape__contains='institute_admission').exists())
+
+    def test_normalize_sql_collapses_literals(self):
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'x' LIMIT 21"),
+            "SELECT * FROM t WHERE id IN (...) AND name = ? LIMIT ?",
+        )
+
+
+class AdmissionProjectionTest(AdminLoginMixin, QueryBudgetMixin, TestCase):
+    # A template reading a field outside the projection shows up as a repeated shape
+    query_budgets = {
+        'view_registrations': 6,
+        'admissions_list': 5,
+        'search_students': 3,
+        'result_list': 7,  # includes the ETag validator
+        'result_entry': 7,  # includes the attendance register
+    }
+
+    def setUp(self):
+        self.admin = self.login_admin()
+        self.exam = Exam.objects.create(name='Unit Test', subject='physics_11', batch='2024-2025')
+        for i in range(6):
+            admission = make_admission(student_name=f"Student {i}", admission_date=date.today())
+            Payment.objects.create(admission=admission, date=date.today(), payment_method='cash',
+                                   payment_type='tuition', description='Fee', amount=100)
+            StudentResult.objects.create(exam=self.exam, student=admission, marks_obtained=50 + i)
+        make_admission(student_name="Student Registration", is_admitted=False)
+
+    def test_projections_defer_wide_columns(self):
+        admission = Admission.objects.for_list().get(student_name="Student 0")
+        self.assertIn('tms_fees', admission.get_deferred_fields())
+        self.assertNotIn('course', admission.get_deferred_fields())
+        self.assertIn('tms_fees', Admission.objects.for_roster().first().get_deferred_fields())
+
+    def test_list_views_within_budget(self):
+        response = self.get_within_budget('view_registrations')
+        flags = {a.student_name: a.has_transactions for a in response.context['admissions']}
+        self.assertTrue(flags['Student 0'])
+        self.assertFalse(flags['Student Registration'])
+        self.get_within_budget('admissions_list')
+
+    def test_search_students_totals(self):
+        response = self.get_within_budget('search_students', data={'q': 'Student'})
+        results = response.json()['results']
+        self.assertEqual(len(results), 6)
+        self.assertEqual(results[0]['total_payments'], 100.0)
+
+    def test_result_views_within_budget(self):
+        response = self.get_within_budget('result_list', args=[self.exam.id])
+        self.assertEqual(response.context['total_students'], 6)
+        self.assertEqual(response.context['passed_students'], 6)
+        self.get_within_budget('result_entry', args=[self.exam.id])
+
+
+class AdmissionDetailTest(AdminLoginMixin, TestCase):
+    def setUp(self):
+        self.admin = self.login_admin()
+
+    def test_create_stores_detail_records(self):
+        admission = make_admission(father_name="Core Father", visitor2_name="Aunt", apaar_id="AP1")
+        self.assertEqual(admission.personal.father_name, "Core Father")
+        self.assertEqual(admission.visitors.visitor2_name, "Aunt")
+        self.assertEqual(admission.credentials.apaar_id, "AP1")
+        admission = Admission.objects.with_details().get(pk=admission.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual((admission.address, admission.pen_number), ("Jajpur", ""))
+
+    def test_bulk_create_writes_details(self):
+        objs = [Admission(student_name=f"Bulk {i}", mobile_number="9000000000", batch="2024-2025",
+                          course="Science", father_name=f"Father {i}", date_of_birth=date(2008, 1, 1))
+                for i in range(3)]
+        Admission.objects.bulk_create(objs)
+        self.assertEqual(
+            sorted(AdmissionPersonal.objects.values_list('father_name', flat=True)),
+            ["Father 0", "Father 1", "Father 2"],
+        )
+
+    def test_admission_form_saves_and_edits_details(self):
+        response = self.client.post(reverse('admission_form'), admission_form_data())
+        self.assertEqual(response.status_code, 302)
+        admission = Admission.objects.get(student_name='Form Student')
+        self.assertEqual((admission.father_name, admission.visitor1_name, admission.sams_login_id),
+                         ('Form Father', 'Uncle', 'sams-1'))
+
+        self.assertEqual(AdmissionForm(instance=admission).initial['address'], 'Jajpur Road')
+        data = admission_form_data(admission_id=admission.pk, father_name='New Father')
+        self.client.post(reverse('search_admission'), data)
+        admission.refresh_from_db()
+        self.assertEqual(admission.father_name, 'New Father')
+
+    def test_complete_admission_details_in_one_query(self):
+        admission = make_admission(sams_login_id="sams-2", visitor1_contact="9222222222")
+        response = self.client.get(reverse('get_complete_admission_details', args=[admission.pk]))
+        data = response.json()['admission']
+        self.assertEqual((data['father_name'], data['sams_login_id']), ("Father", "sams-2"))
+        # Session, user, the ETag validator and one joined admission query
+        self.assertEqual(response.query_metrics.query_count, 4)
+
+
+class SlowQueryLogTest(AdminLoginMixin, TestCase):
+    def setUp(self):
+        self.admin = self.login_admin()
+        make_admission()
+
+    @override_settings(INSTITUTE_SLOW_QUERY_MS=0)
+    def test_records_statements_with_plan(self):
+        self.client.get(reverse('account_section'))
+        entry = SlowQuery.objects.filter(view_name='account_section', shape__contains='institute_admission').first()
+        self.assertIsNotNone(entry)
+        self.assertIn('SCAN', entry.query_plan.upper())
+
+    @override_settings(INSTITUTE_SLOW_QUERY_MS=0, INSTITUTE_SLOW_QUERY_LOG_SIZE=5)
+    def test_log_is_ring_buffered(self):
+        for _ in range(3):
+            self.client.get(reverse('account_section'))
+        self.assertLessEqual(SlowQuery.objects.count(), 5)
+
+    def test_page_aggregates_by_shape(self):
+        for duration in (120, 150, 400):
+            SlowQuery.objects.create(shape='SELECT ?', sql='SELECT 1', duration_ms=duration, view_name='result_list')
+        response = self.client.get(reverse('slow_query_log'))
+        row = response.context['shape_rows'][0]
+        self.assertEqual((row['count'], row['p50'], row['max']), (3, 150, 400))
+        self.assertEqual(row['views'], ['result_list'])
+
+
+class SyntheticDataTest(TestCase):
+    def test_generate_and_benchmark(self):
+        out = StringIO()
+        call_command('generate_synthetic_data', admissions=40, payments=60, expenses=60,
+                     exams=4, results=40, batch_size=25, stdout=out)
+        self.assertEqual(Admission.objects.count(), 40)
+        self.assertEqual(Payment.objects.count(), 60)
+        self.assertTrue(0 < StudentResult.objects.count() <= 40)
+        self.assertEqual(Payment.objects.values('receipt_number').distinct().count(), 60)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, 'bench.json')
+            call_command('benchmark_views', iterations=1, warmup=0, output=output, host='testserver',
+                         only='account_section,student_account,generate_receipt', stdout=out, stderr=out)
+            with open(output) as fh:
+                report = json.load(fh)
+        self.assertEqual(set(report['results']), {'account_section', 'student_account', 'generate_receipt'})
+        self.assertEqual(report['results']['generate_receipt']['status'], 200)
+        self.assertIn('p95', report['results']['account_section']['latency_ms'])
+
+
+class LoadTestHarnessTest(TestCase):
+    def test_parse_weights_overrides_and_drops(self):
+        mix = parse_weights(MIXES['admission_week'], 'add_payment_general=40, report_card_pdf=0')
+        weights = {spec.name: spec.weight for spec in mix}
+        self.assertEqual(weights['add_payment_general'], 40)
+        self.assertNotIn('report_card_pdf', weights)
+
+    def test_report_counts_locked_errors(self):
+        harness = LoadTest('http://127.0.0.1:8000', MIXES['writes'], 'session', workers=2, duration=0)
+        harness.samples = [
+            {'name': 'add_payment_general', 'latency_ms': 10.0, 'status': 302, 'locked': False},
+            {'name': 'add_payment_general', 'latency_ms': 30.0, 'status': 500, 'locked': True},
+        ]
+        report = harness.report(elapsed=2.0)
+        endpoint = report['endpoints']['add_payment_general']
+        self.assertEqual(endpoint['errors'], 1)
+        self.assertEqual(endpoint['locked_error_rate'], 0.5)
+        self.assertEqual(report['throughput_rps'], 1.0)
+        self.assertEqual(endpoint['latency_ms']['p50'], 20.0)
+
+
+class SqliteProfileTest(TestCase):
+    # TestCase runs inside a transaction, where journal/temp-store pragmas cannot change
+    @override_settings(SQLITE_PRAGMAS={'cache_size': -4321, 'busy_timeout': 1234})
+    def test_pragmas_applied_to_connection(self):
+        apply_sqlite_pragmas(sender=None, connection=connection)
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], -4321)
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 1234)
+
+    def test_write_transaction_retries_locked_errors(self):
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise OperationalError('database is locked')
+            return 'saved'
+
+        # TestCase wraps each test in a transaction, so emulate an outermost block
+        with mock.patch.object(connection, 'in_atomic_block', False), \
+                mock.patch('institute.db.transaction.atomic'):
+            self.assertEqual(write_transaction(flaky, attempts=5, backoff=0)(), 'saved')
+        self.assertEqual(len(calls), 3)
+
+    @override_settings(SQLITE_WRITE_BACKOFF=0)
+    def test_payment_retry_takes_a_fresh_receipt_number(self):
+        admission = make_admission()
+        payment = Payment(admission=admission, date=date.today(), payment_method='cash',
+                          payment_type='tuition', description='Fee', amount=100)
+        original_save = Payment.save
+
+        def locked_once(instance, *args, **kwargs):
+            if instance is payment and not hasattr(self, 'failed'):
+                self.failed = True
+                instance.receipt_number = 'RECPT0001'
+                # Another writer commits that number before the retry
+                Payment.objects.create(admission=admission, date=date.today(), payment_method='cash',
+                                       payment_type='tuition', description='Fee', amount=50)
+                raise OperationalError('database is locked')
+            return original_save(instance, *args, **kwargs)
+
+        with mock.patch.object(connection, 'in_atomic_block', False), \
+                mock.patch('institute.db.transaction.atomic'), \
+                mock.patch.object(Payment, 'save', locked_once):
+            save_new_payment(payment)
+        self.assertEqual(payment.receipt_number, 'RECPT0002')
+
+    def test_write_transaction_does_not_retry_other_errors(self):
+        calls = []
+
+        def broken():
+            calls.append(1)
+            raise OperationalError('no such table: missing')
+
+        with mock.patch.object(connection, 'in_atomic_block', False), \
+                mock.patch('institute.db.transaction.atomic'):
+            with self.assertRaises(OperationalError):
+                write_transaction(broken, attempts=5, backoff=0)()
+        self.assertEqual(len(calls), 1)
+
+
+class ArchiveBatchTest(AdminLoginMixin, TestCase):
+    databases = {'default', 'archive'}
+
+    def setUp(self):
+        self.admin = self.login_admin()
+        self.old = make_admission(student_name="Old Student", batch="2020-2022", father_name="Old Father",
+                                  submitted_by=self.admin)
+        self.exam = Exam.objects.create(name='Final', subject='physics_12', batch='2020-2022',
+                                        status='completed', created_by=self.admin)
+        Payment.objects.create(admission=self.old, date=date.today(), payment_method='cash',
+                               payment_type='tuition', description='Fee', amount=700, received_by=self.admin)
+        Expense.objects.create(admission=self.old, date=date.today(), category='food',
+                               description='Lunch', amount=40)
+        StudentResult.objects.create(exam=self.exam, student=self.old, marks_obtained=71, entered_by=self.admin)
+        current = make_admission(student_name="Current Student")
+        Payment.objects.create(admission=current, date=date.today(), payment_method='cash',
+                               payment_type='tuition', description='Fee', amount=100)
+
+    def test_archive_moves_batch_and_pages_read_from_archive(self):
+        call_command('archive_batch', '2020-2022', stdout=StringIO())
+
+        self.assertFalse(Admission.objects.filter(batch='2020-2022').exists())
+        self.assertFalse(Exam.objects.filter(pk=self.exam.pk).exists())
+        self.assertEqual(Payment.objects.count(), 1)
+        archived = Admission.objects.using('archive').get(pk=self.old.pk)
+        self.assertEqual(archived.father_name, "Old Father")
+        self.assertEqual(archived.payments.get().amount, 700)
+        self.assertFalse(CustomUser.objects.using('archive').get().has_usable_password())
+
+        response = self.client.get(reverse('student_account', args=[self.old.pk]))
+        self.assertContains(response, '700')
+        response = self.client.get(reverse('view_report_card', args=[self.exam.pk, self.old.pk]))
+        self.assertContains(response, 'Old Student')
+        response = self.client.get(reverse('report_card'), {'search': 'Old', 'archived': '1'})
+        self.assertContains(response, 'Old Student')
+
+    def test_refuses_current_batch(self):
+        with self.assertRaises(CommandError):
+            call_command('archive_batch', '2024-2025', force=True, stdout=StringIO())
+        self.assertEqual(Admission.objects.filter(batch='2024-2025').count(), 1)
+
+
+class BackupTest(TestCase):
+    def test_backup_verify_rotate_and_media_sync(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, 'live.sqlite3')
+            db = sqlite3.connect(source)
+            db.execute('PRAGMA journal_mode = WAL')
+            db.execute('CREATE TABLE t (v TEXT)')
+            db.executemany('INSERT INTO t VALUES (?)', [('x' * 500,)] * 200)
+            db.commit()
+            db.close()
+
+            for stamp in ('1', '2', '3'):
+                stats = backup_sqlite(source, os.path.join(tmp, f'default-{stamp}.sqlite3'), pages=8, sleep=0)
+            self.assertGreater(stats['steps'], 1)
+            self.assertEqual(integrity_check(os.path.join(tmp, 'default-3.sqlite3')), ['ok'])
+            rotated = rotate_snapshots(tmp, 'default', keep=2)
+            self.assertEqual([path.name for path in rotated], ['default-1.sqlite3'])
+
+            media = os.path.join(tmp, 'media')
+            os.makedirs(os.path.join(media, 'student_images'))
+            for name in ('a.jpg', 'b.jpg'):
+                with open(os.path.join(media, 'student_images', name), 'wb') as fh:
+                    fh.write(b'img')
+            self.assertEqual(sync_media(media, os.path.join(tmp, 'copy'))['copied'], 2)
+            with open(os.path.join(media, 'student_images', 'b.jpg'), 'wb') as fh:
+                fh.write(b'changed')
+            self.assertEqual(sync_media(media, os.path.join(tmp, 'copy'))['copied'], 1)
+
+
+def make_jpeg(width=300, height=200, orientation=None):
+    from PIL import Image
+
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), 'red').save(buffer, 'JPEG', exif=exif)
+    return buffer.getvalue()
+
+
+class StudentPhotoTest(AdminLoginMixin, TestCase):
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        override = override_settings(MEDIA_ROOT=self.media.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def upload(self, data, **overrides):
+        form = AdmissionForm(
+            admission_form_data(**overrides),
+            {'student_image': SimpleUploadedFile('phone.jpg', data, content_type='image/jpeg')},
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        return form.save()
+
+    def test_upload_is_rotated_stripped_and_stored_once(self):
+        from PIL import Image
+
+        data = make_jpeg(orientation=6)
+        first = self.upload(data)
+        second = self.upload(data, mobile_number='9222222222')
+        self.assertEqual(first.student_image.name, second.student_image.name)
+        self.assertEqual(len(os.listdir(os.path.join(self.media.name, 'student_images'))), 2)  # photo + thumbs/
+
+        with Image.open(first.student_image.path) as stored:
+            self.assertEqual(stored.size, (200, 300))
+            self.assertNotIn(0x0112, stored.getexif())
+        digest = os.path.basename(first.student_image.name)[:-4]
+        for size in THUMBNAIL_SIZES:
+            with default_storage.open(thumbnail_name(digest, size)) as fh, Image.open(fh) as thumb:
+                self.assertEqual((thumb.format, max(thumb.size)), ('WEBP', min(size, 300)))
+        self.assertTrue(thumbnail_url(first.student_image, 64).endswith(f'{digest}-64.webp'))
+
+        self.login_admin()
+        details = self.client.get(reverse('get_student_details'), {'id': first.pk}).json()['results'][0]
+        self.assertEqual(details['image_url'], thumbnail_url(first.student_image, 160, 'jpeg'))
+        self.assertNotEqual(details['image_url'], first.student_image.url)
+
+    def test_backfill_processes_legacy_photos(self):
+        name = default_storage.save('student_images/legacy.jpg', BytesIO(make_jpeg()))
+        admission = make_admission(student_image=name)
+        self.assertEqual(thumbnail_url(admission.student_image, 64), admission.student_image.url)
+
+        call_command('process_student_images', workers=1, delete_originals=True, stdout=StringIO())
+        admission.refresh_from_db()
+        self.assertNotEqual(admission.student_image.name, name)
+        self.assertFalse(default_storage.exists(name))
+        self.assertTrue(default_storage.exists(admission.student_image.name))
+
+
+@override_settings(MIDDLEWARE=['institute.compression.NonHTMLGZipMiddleware', *settings.MIDDLEWARE])
+class CompressionTest(AdminLoginMixin, TestCase):
+    def setUp(self):
+        self.login_admin()
+        make_admission()
+
+    def test_pages_stay_uncompressed(self):
+        response = self.client.get(reverse('admissions_list'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Content-Encoding', response)
+        response = self.client.get(reverse('export_admissions'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn(b'Test Student', gzip.decompress(b''.join(response.streaming_content)))
+
+
+class StaticServingTest(TestCase):
+    def setUp(self):
+        self.static_root = tempfile.TemporaryDirectory()
+        self.media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.static_root.cleanup)
+        self.addCleanup(self.media_root.cleanup)
+        override = override_settings(
+            STATIC_ROOT=self.static_root.name, MEDIA_ROOT=self.media_root.name,
+            STORAGES={
+                'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+                'staticfiles': {'BACKEND': 'institute.storage.CompressedManifestStaticFilesStorage'},
+            },
+            MIDDLEWARE=['institute.static_serving.StaticMediaMiddleware'],
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_hashed_static_files_are_precompressed_and_immutable(self):
+        call_command('collectstatic', interactive=False, verbosity=0, ignore_patterns=['admin', 'vendor'])
+        with open(os.path.join(self.static_root.name, 'staticfiles.json')) as fh:
+            hashed = json.load(fh)['paths']['institute/css/base.css']
+        url = '/static/' + hashed
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        with open(os.path.join(self.static_root.name, hashed), 'rb') as fh:
+            self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), fh.read())
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertNotIn('Content-Encoding', self.client.get(url))
+
+    def test_media_ranges_and_revalidation(self):
+        with open(os.path.join(self.media_root.name, 'logo.png'), 'wb') as fh:
+            fh.write(b'0123456789')
+
+        response = self.client.get('/media/logo.png', HTTP_RANGE='bytes=2-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), b'2345')
+        self.assertEqual(response['Content-Range'], 'bytes 2-5/10')
+        self.assertEqual(self.client.get('/media/logo.png', HTTP_RANGE='bytes=20-').status_code, 416)
+
+        response = self.client.get('/media/logo.png')
+        self.assertEqual(response['Cache-Control'], 'public, no-cache')
+        response = self.client.get('/media/logo.png', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.client.get('/media/../settings.py').status_code, 404)
+
+
+class NavigationCacheTest(AdminLoginMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.login_admin()
+        self.organization = Organization.objects.create(
+            name='First Name', address='Jajpur', mobile='9000000000', email='org@example.com',
+            registration_number='REG-1',
+        )
+
+    def test_cache_key_covers_every_path_test_in_base_html(self):
+        with open(os.path.join(settings.BASE_DIR, 'templates', 'institute', 'base.html')) as fh:
+            template = fh.read()
+        self.assertLessEqual(set(re.findall(r"'([^']+)' in request\.path", template)), set(NAV_PATH_MARKERS))
+        self.assertLessEqual(set(re.findall(r"request\.path [!=]= '([^']+)'", template)), set(NAV_EXACT_PATHS))
+
+    def test_active_link_and_organization_changes_are_not_served_stale(self):
+        active = r'nav-link active"\s*href="{}"'
+        response = self.client.get(reverse('admissions_list'))
+        self.assertRegex(response.content.decode(), active.format(reverse('admissions_list')))
+        response = self.client.get(reverse('view_registrations'))
+        self.assertRegex(response.content.decode(), active.format(reverse('view_registrations')))
+        self.assertNotRegex(response.content.decode(), active.format(reverse('admissions_list')))
+        self.assertContains(response, 'FIRST NAME')
+
+        self.organization.name = 'Second Name'
+        self.organization.save()
+        response = self.client.get(reverse('view_registrations'))
+        self.assertContains(response, 'SECOND NAME')
+        self.assertNotContains(response, 'FIRST NAME')
+
+
+class ConditionalGetTest(AdminLoginMixin, TestCase):
+    def setUp(self):
+        self.login_admin()
+        self.admission = make_admission()
+        self.payment = Payment.objects.create(admission=self.admission, date=date.today(), payment_method='cash',
+                                              payment_type='tuition', description='Fee', amount=100)
+
+    def assertRevalidates(self, url, change):
+        # The first page view sets the CSRF cookie, which is part of a page's ETag
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+        etag = response['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        change()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_student_account_changes_on_edit_and_delete(self):
+        url = reverse('student_account', args=[self.admission.id])
+
+        def edit():
+            self.payment.amount = 250
+            self.payment.save()
+        self.assertContains(self.assertRevalidates(url, edit), '250')
+        self.assertRevalidates(url, self.payment.delete)
+
+    def test_result_list_and_exam_stats_change_with_results(self):
+        exam = Exam.objects.create(name='Unit Test', subject='physics_11', exam_date=date.today(),
+                                   total_marks=100, passing_marks=33, batch=self.admission.batch)
+
+        def add_result():
+            StudentResult.objects.create(exam=exam, student=self.admission, marks_obtained=80)
+        self.assertRevalidates(reverse('result_list', args=[exam.id]), add_result)
+        self.assertRevalidates(reverse('api_get_exam_stats', args=[exam.id]),
+                               lambda: StudentResult.objects.filter(exam=exam).delete())
+
+    def test_only_admins_get_validators(self):
+        self.client.force_login(CustomUser.objects.create_user(username='student', password='pw'))
+        response = self.client.get(reverse('get_student_details_by_id', args=[self.admission.id]))
+        self.assertNotIn('ETag', response)
+
+
+class AdmissionBatchApiTest(AdminLoginMixin, TestCase):
+    def setUp(self):
+        self.login_admin()
+        self.admissions = [make_admission(student_name=f'Student {i}', sams_login_id=f'sams-{i}') for i in range(3)]
+        # No detail rows at all
+        self.admissions.append(Admission.objects.create(student_name='Bare', mobile_number='1', batch='2024-2025',
+                                                        course='Science'))
+
+    def single(self, admission):
+        return self.client.get(reverse('get_complete_admission_details', args=[admission.pk])).json()['admission']
+
+    def test_records_match_single_endpoint(self):
+        ids = ','.join(str(a.pk) for a in self.admissions) + ',999999'
+        url = reverse('get_admission_details_batch')
+        with self.assertNumQueries(3):
+            data = self.client.get(url, {'ids': ids}).json()
+        self.assertEqual(data['admissions'], [self.single(a) for a in self.admissions])
+        self.assertEqual(data['missing'], [999999])
+        self.assertEqual((data['admissions'][3]['father_name'], data['admissions'][3]['date_of_birth']), ('', None))
+
+        response = self.client.get(url, {'ids': ids, 'format': 'ndjson'}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        lines = gzip.decompress(b''.join(response.streaming_content)).decode().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], data['admissions'])
+
+    def test_sparse_fields_and_filters(self):
+        url = reverse('get_admission_details_batch')
+        data = self.client.get(url, {'fields': 'sams_login_id,student_name', 'is_admitted': '1'}).json()
+        self.assertEqual(data['admissions'][0], {
+            'id': self.admissions[0].pk, 'student_name': 'Student 0', 'sams_login_id': 'sams-0',
+        })
+        self.assertEqual(len(data['admissions']), 3)
+        self.assertEqual(self.client.get(url, {'fields': 'password'}).status_code, 400)
+
+
+@override_settings(INSTITUTE_CHANGE_FEED_SETTLE_SECONDS=0)
+class ChangeFeedTest(AdminLoginMixin, TestCase):
+    def setUp(self):
+        self.login_admin()
+        self.admission = make_admission()
+        self.payment = Payment.objects.create(admission=self.admission, date=date.today(), payment_method='cash',
+                                              payment_type='tuition', description='Fee', amount=100)
+        self.exam = Exam.objects.create(name='Unit Test', subject='physics_11', batch=self.admission.batch)
+        self.result = StudentResult.objects.create(exam=self.exam, student=self.admission, marks_obtained=50)
+
+    def sync(self, token=None, **params):
+        if token:
+            params['since'] = token
+        data = self.client.get(reverse('change_feed'), params).json()
+        return data['token'], data['changes']
+
+    def test_updates_and_deletes_after_token(self):
+        token, changes = self.sync()
+        self.assertEqual(changes['admission']['updated'], [
+            self.client.get(reverse('get_complete_admission_details', args=[self.admission.pk])).json()['admission']
+        ])
+        self.assertEqual(changes['payment']['updated'][0]['amount'], '100.00')
+        self.assertEqual(len(changes['studentresult']['updated']), 1)
+
+        token, changes = self.sync(token)
+        self.assertFalse(any(change['updated'] or change['deleted'] for change in changes.values()))
+
+        self.payment.amount = 150
+        self.payment.save()
+        self.client.post(reverse('delete_exam', args=[self.exam.pk]))
+        token, changes = self.sync(token)
+        self.assertEqual([p['amount'] for p in changes['payment']['updated']], ['150.00'])
+        self.assertEqual(changes['exam']['deleted'], [self.exam.pk])
+        # Cascaded deletes are reported too
+        self.assertEqual(changes['studentresult']['deleted'], [self.result.pk])
+
+        self.client.post(reverse('delete_payment', args=[self.payment.pk]))
+        token, changes = self.sync(token, models='payment')
+        self.assertEqual(changes, {'payment': {'updated': [], 'deleted': [self.payment.pk]}})
+
+    def test_paging_settling_and_bad_tokens(self):
+        Payment.objects.create(admission=self.admission, date=date.today(), payment_method='cash',
+                               payment_type='tuition', description='Fee', amount=200)
+        data = self.client.get(reverse('change_feed'), {'models': 'payment', 'limit': 1}).json()
+        self.assertTrue(data['more'])
+        token, changes = self.sync(data['token'], models='payment', limit=1)
+        self.assertEqual([p['amount'] for p in changes['payment']['updated']], ['200.00'])
+
+        with override_settings(INSTITUTE_CHANGE_FEED_SETTLE_SECONDS=60):
+            Payment.objects.create(admission=self.admission, date=date.today(), payment_method='cash',
+                                   payment_type='tuition', description='Fee', amount=300)
+            self.assertEqual(self.sync(token, models='payment')[1]['payment']['updated'], [])
+        self.assertEqual(self.client.get(reverse('change_feed'), {'since': 'forged'}).status_code, 400)
+
+
+class BulkRegistrationTest(AdminLoginMixin, TestCase):
+    def setUp(self):
+        self.login_admin()
+        self.pending = [make_admission(is_admitted=False) for _ in range(3)]
+        self.admitted = make_admission(admission_date=date(2024, 6, 1))
+        self.paying = make_admission()
+        Payment.objects.create(admission=self.paying, date=date.today(), payment_method='cash',
+                               payment_type='tuition', description='Fee', amount=100)
+
+    def bulk(self, action, admissions, *extra_ids):
+        ids = [a.pk for a in admissions] + list(extra_ids)
+        return self.client.post(reverse('bulk_registrations'), json.dumps({'action': action, 'ids': ids}),
+                                content_type='application/json')
+
+    def test_admit_and_unadmit_in_one_update(self):
+        with self.assertNumQueries(6):
+            data = self.bulk('admit', self.pending + [self.admitted], 999999).json()
+        self.assertEqual(data['applied'], [a.pk for a in self.pending])
+        self.assertEqual(data['unchanged'], [self.admitted.pk])
+        self.assertEqual(data['rejected'], {'999999': 'Registration not found'})
+        for admission in self.pending:
+            admission.refresh_from_db()
+            self.assertTrue(admission.is_admitted)
+            self.assertEqual(admission.admission_date, date.today())
+            self.assertEqual(admission.admitted_by.username, 'admin')
+
+        data = self.bulk('unadmit', [self.admitted, self.paying]).json()
+        self.assertEqual(data['applied'], [self.admitted.pk])
+        self.assertIn('transactions', data['rejected'][str(self.paying.pk)])
+        self.admitted.refresh_from_db()
+        self.assertEqual((self.admitted.is_admitted, self.admitted.admission_date), (False, None))
+
+    def test_delete_skips_admitted_and_records_tombstones(self):
+        data = self.bulk('delete', self.pending[:2] + [self.admitted]).json()
+        self.assertEqual(data['applied'], [a.pk for a in self.pending[:2]])
+        self.assertIn(str(self.admitted.pk), data['rejected'])
+        self.assertEqual(Admission.objects.filter(pk__in=data['applied']).count(), 0)
+        self.assertEqual(Tombstone.objects.filter(model='admission').count(), 2)
+        self.assertEqual(self.bulk('expel', self.pending).status_code, 400)
+
+
+class AdmissionImportTest(AdminLoginMixin, TestCase):
+    def setUp(self):
+        reports = tempfile.TemporaryDirectory()
+        self.addCleanup(reports.cleanup)
+        override = override_settings(IMPORT_REPORT_ROOT=reports.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.login_admin()
+        self.existing = make_admission()
+
+    def upload(self, rows, name='partner.csv'):
+        content = '\n'.join(','.join(row) for row in rows).encode()
+        return self.client.post(reverse('import_admissions'), {'file': SimpleUploadedFile(name, content)})
+
+    def test_imports_valid_rows_and_reports_the_rest(self):
+        data = admission_form_data()
+        header = list(data) + ['Remarks']
+        good = [data[name] for name in data] + ['ok']
+        bad = list(good)
+        bad[header.index('date_of_birth')] = '31/31/2008'
+        bad[header.index('father_name')] = ''
+        bad[header.index('Remarks')] = '=1+2'
+        response = self.upload([header, good, bad, good, [''] * len(header)])
+        summary = response.context['summary']
+        number = int(self.existing.admission_id[4:])
+        self.assertEqual((summary['rows'], summary['imported'], summary['rejected']), (3, 2, 1))
+        self.assertEqual((summary['first_id'], summary['last_id']),
+                         (f'TMIS{number + 1:04d}', f'TMIS{number + 2:04d}'))
+        self.assertEqual(summary['ignored_columns'], ['Remarks'])
+
+        imported = Admission.objects.get(admission_id=summary['last_id'])
+        self.assertEqual((imported.father_name, imported.sams_login_id, imported.subject1), ('Form Father', 'sams-1', 'Odia'))
+        self.assertEqual(imported.submitted_by.username, 'admin')
+        self.assertFalse(imported.is_admitted)
+
+        report = self.client.get(reverse('import_admissions_report', args=[summary['report']]))
+        lines = b''.join(report.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith('3,'))
+        self.assertIn('date_of_birth: Enter a valid date.', lines[1])
+        self.assertTrue(lines[1].endswith(",'=1+2"))
+        self.assertEqual(self.client.get(reverse('import_admissions_report', args=['db.sqlite3'])).status_code, 404)
+
+    def test_rejects_files_missing_required_columns(self):
+        response = self.upload([['student_name', 'mobile_number'], ['A', '1']])
+        self.assertIn('Missing required columns', response.context['form'].errors['file'][0])
+        with mock.patch('institute.imports.openpyxl', None):
+            response = self.upload([['student_name']], name='partner.xlsx')
+        self.assertIn('openpyxl', response.context['form'].errors['file'][0])
+        self.assertEqual(Admission.objects.count(), 1)
+
+
+class StreamingExportTest(AdminLoginMixin, TestCase):
+    def setUp(self):
+        self.login_admin()
+        self.student = make_admission(student_name='Asha Das', subject4='Physics')
+        make_admission(student_name='Bina Roy', subject4='Physics')
+        make_admission(student_name='Pending', is_admitted=False)
+        Payment.objects.create(admission=self.student, date=date(2024, 6, 2), payment_method='cash',
+                               payment_type='tuition', description='Fee', amount=500)
+        Expense.objects.create(admission=self.student, date=date(2024, 6, 1), category='food',
+                               description='Mess, June', amount=120)
+        Payment.objects.create(admission=self.student, date=date(2023, 1, 1), payment_method='cash',
+                               payment_type='tuition', description='Old', amount=1)
+        self.exam = Exam.objects.create(name='Unit', subject='physics_11', batch=self.student.batch, passing_marks=33)
+        StudentResult.objects.create(exam=self.exam, student=self.student, marks_obtained=72)
+
+    def csv_rows(self, url, params):
+        response = self.client.get(url, params)
+        self.assertTrue(response.streaming)
+        return list(csv.reader(b''.join(response.streaming_content).decode('utf-8-sig').splitlines()))
+
+    def test_csv_exports(self):
+        rows = self.csv_rows(reverse('export_admissions'), {'is_admitted': '0'})
+        self.assertEqual((rows[0][0], len(rows), rows[1][1]), ('Admission ID', 2, 'Pending'))
+
+        rows = self.csv_rows(reverse('export_ledger'), {'start': '2024-01-01'})
+        self.assertEqual([row[:2] + row[6:8] for row in rows[1:]],
+                         [['01/06/2024', 'Expense', 'Mess, June', '120.00'], ['02/06/2024', 'Payment', 'Fee', '500.00']])
+        self.assertEqual(self.client.get(reverse('export_ledger'), {'end': '2024-13-01'}).status_code, 400)
+
+        rows = self.csv_rows(reverse('export_exam_results', args=[self.exam.pk]), {})
+        self.assertEqual([row[2:7] for row in rows[1:]], [
+            ['Asha Das', '72.00', 'Pass', '72.00', 'B+'], ['Bina Roy', '', 'Not entered', '', 'N/A'],
+        ])
+
+    def test_csv_keeps_formula_like_text_as_text(self):
+        make_admission(student_name='=HYPERLINK("http://example.com","x")', is_admitted=False)
+        make_admission(student_name='@SUM(A1)', father_name='+cmd|calc', is_admitted=False)
+        rows = self.csv_rows(reverse('export_admissions'), {'is_admitted': '0'})
+        self.assertEqual(sorted(row[1] for row in rows[1:]), [
+            '\'=HYPERLINK("http://example.com","x")', "'@SUM(A1)", 'Pending',
+        ])
+        self.assertIn("'+cmd|calc", rows[1] + rows[2] + rows[3])
+
+    def test_xlsx_is_a_valid_workbook(self):
+        response = self.client.get(reverse('export_exam_results', args=[self.exam.pk]), {'format': 'xlsx'})
+        self.assertEqual(response['Content-Disposition'], f'attachment; filename="exam_{self.exam.pk}_results.xlsx"')
+        workbook = zipfile.ZipFile(BytesIO(b''.join(response.streaming_content)))
+        self.assertIsNone(workbook.testzip())
+        sheet = workbook.read('xl/worksheets/sheet1.xml').decode()
+        self.assertEqual(sheet.count('<row>'), 3)
+        self.assertIn('<t xml:space="preserve">Asha Das</t>', sheet)
+        self.assertIn('<c><v>72.00</v></c>', sheet)
+
+
+class PaymentBatchTest(AdminLoginMixin, TestCase):
+    def setUp(self):
+        self.login_admin()
+        self.students = [make_admission(student_name=name) for name in ('Asha Das', 'Bina Roy')]
+        self.pending = make_admission(is_admitted=False)
+        Payment.objects.create(admission=self.students[0], date=date(2024, 6, 1), payment_method='cash',
+                               payment_type='tuition', description='Fee', amount=100, receipt_number='RECPT0041')
+
+    def post(self, *rows):
+        payments = [dict(admission=student.pk, date='2024-06-02', payment_method='cash', payment_type='tuition',
+                         description='June fee', amount=amount) for student, amount in rows]
+        return self.client.post(reverse('add_payments_batch'), json.dumps({'payments': payments}),
+                                content_type='application/json')
+
+    def test_rows_get_contiguous_receipts_and_one_pdf(self):
+        self.assertContains(self.client.get(reverse('add_payments_batch')), 'paymentRowTemplate')
+        data = self.post((self.students[0], '500'), (self.students[1], '750.50')).json()
+        self.assertEqual([r['receipt_number'] for r in data['receipts']], ['RECPT0042', 'RECPT0043'])
+        self.assertEqual((data['total'], data['receipts'][1]['student_name']), ('1250.50', 'Bina Roy'))
+        self.assertEqual(Payment.objects.filter(received_by__username='admin').count(), 2)
+        # Single payments carry on after the batch
+        later = Payment.objects.create(admission=self.students[1], date=date(2024, 6, 3), payment_method='cash',
+                                       payment_type='tuition', description='Fee', amount=1)
+        self.assertEqual(later.receipt_number, 'RECPT0044')
+
+        response = self.client.get(data['receipts_pdf_url'])
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(response.content.startswith(b'%PDF'))
+        self.assertEqual(self.client.get(reverse('generate_receipts'), {'ids': '999999'}).status_code, 404)
+
+    def test_one_bad_row_saves_nothing(self):
+        response = self.post((self.students[0], '500'), (self.pending, '300'), (self.students[1], 'lots'))
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['errors']
+        self.assertEqual(sorted(errors), ['1', '2'])
+        self.assertIn('admission', errors['1'])
+        self.assertIn('amount', errors['2'])
+        self.assertEqual(Payment.objects.count(), 1)
+
+    def test_failed_insert_returns_json_error(self):
+        with mock.patch.object(Payment.objects, 'bulk_create', side_effect=OperationalError('disk I/O error')):
+            response = self.post((self.students[0], '500'))
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json(), {'success': False, 'error': 'disk I/O error'})
+        self.assertEqual(Payment.objects.count(), 1)
+
+
+class FormChoicesQueryTest(AdminLoginMixin, TestCase):
+    def setUp(self):
+        self.login_admin()
+
+    def test_forms_render_in_fixed_queries(self):
+        pages = ('admission_form', 'add_payment_general', 'add_expense_general')
+        counts = []
+        for n in (0, 25):
+            for i in range(n):
+                CustomUser.objects.create_user(username=f'student{i}', password='pw', user_type='student')
+                make_admission(student_name=f'Student {i}')
+            with self.assertNumQueries(0):
+                AdmissionForm().as_p()
+            counts.append([self.client.get(reverse(page)).query_metrics.query_count for page in pages])
+        self.assertEqual(counts[0], counts[1])
+
+    def test_server_managed_users_ignore_posted_values(self):
+        self.client.logout()
+        other = CustomUser.objects.create_user(username='other', password='pw', user_type='admin')
+        self.client.post(reverse('admission_form'), admission_form_data(submitted_by=other.pk, admitted_by=other.pk))
+        admission = Admission.objects.get(student_name='Form Student')
+        self.assertEqual((admission.submitted_by, admission.admitted_by), (None, None))
+
+
+class MarksMatrixTest(AdminLoginMixin, TestCase):
+    def setUp(self):
+        self.login_admin()
+        self.asha, self.bina, self.chitra = (make_admission(student_name=name) for name in ('Asha', 'Bina', 'Chitra'))
+        make_admission(student_name='Other batch', batch='2023-2024')
+        self.physics = Exam.objects.create(name='Unit 1', subject='physics_11', batch='2024-2025', status='completed',
+                                           exam_date=date(2024, 7, 1), total_marks=50)
+        self.maths = Exam.objects.create(name='Unit 2', subject='mathematics_11', batch='2024-2025',
+                                         status='completed', exam_date=date(2024, 8, 1))
+        Exam.objects.create(name='Upcoming', subject='physics_11', batch='2024-2025')
+        for exam, student, marks, absent in (
+            (self.physics, self.asha, 40, False), (self.maths, self.asha, 80, False),
+            (self.physics, self.bina, 0, True), (self.maths, self.bina, 96, False),
+            (self.physics, self.chitra, 45, False),
+        ):
+            StudentResult.objects.create(exam=exam, student=student, marks_obtained=marks, is_absent=absent)
+
+    def test_pivot_totals_and_ranks(self):
+        with self.assertNumQueries(3):
+            matrix = MarksMatrix.for_batch('2024-2025')
+        self.assertEqual([exam.name for exam in matrix.exams], ['Unit 1', 'Unit 2'])
+        rows = [matrix.row(i) for i in matrix.order('rank')]
+        self.assertEqual([(r['student_name'], r['marks'], r['rank']) for r in rows], [
+            ('Chitra', [45.0, None], 1), ('Asha', [40.0, 80.0], 2), ('Bina', ['AB', 96.0], 3),
+        ])
+        self.assertEqual((rows[1]['total'], rows[1]['maximum'], rows[1]['percentage']), (120.0, 150.0, 80.0))
+        self.assertEqual(matrix.exam_averages(), [42.5, 88.0])
+
+    def test_grid_and_export(self):
+        response = self.client.get(reverse('marks_matrix'), {'batch': '2024-2025', 'order': 'rank'})
+        self.assertEqual([row['student_name'] for row in response.context['rows']], ['Chitra', 'Asha', 'Bina'])
+        self.assertEqual(response.context['batches'], ['2024-2025'])
+
+        export = self.client.get(reverse('export_marks_matrix'), {'batch': '2024-2025'})
+        rows = list(csv.reader(b''.join(export.streaming_content).decode('utf-8-sig').splitlines()))
+        self.assertEqual(rows[0][3:5], ['Unit 1 - Physics (11th Science)', 'Unit 2 - Mathematics (11th Science)'])
+        self.assertEqual(rows[2], ['3', rows[2][1], 'Bina', 'AB', '96.0', '96.0', '150.0', '64.0'])
+        self.assertEqual(self.client.get(reverse('export_marks_matrix')).status_code, 400)
+
+
+class RankingTest(AdminLoginMixin, TestCase):
+    def setUp(self):
+        self.login_admin()
+        self.unit1 = Exam.objects.create(name='Unit 1', subject='physics_11', batch='2024-2025', exam_type='weekly')
+        self.unit2 = Exam.objects.create(name='Unit 2', subject='physics_11', batch='2024-2025', exam_type='weekly',
+                                         total_marks=50)
+        self.students = {}
+        for name, first, second in (('Asha', 90, 40), ('Bina', 80, 45), ('Chitra', 80, 30), ('Dev', 70, None),
+                                    ('Esha', None, 50)):
+            student = self.students[name] = make_admission(student_name=name)
+            StudentResult.objects.create(exam=self.unit1, student=student, marks_obtained=first or 0,
+                                         is_absent=first is None)
+            if second is not None:
+                StudentResult.objects.create(exam=self.unit2, student=student, marks_obtained=second)
+
+    def test_exam_and_term_ranks(self):
+        ranked = StudentResult.objects.filter(exam=self.unit1, is_absent=False).with_rank().order_by('rank', 'student_id')
+        self.assertEqual([(r.student.student_name, r.rank, r.dense_rank, r.appeared) for r in ranked], [
+            ('Asha', 1, 1, 4), ('Bina', 2, 2, 4), ('Chitra', 2, 2, 4), ('Dev', 4, 3, 4),
+        ])
+        self.assertEqual([r.percentile for r in ranked][::3], [100.0, 25.0])
+
+        rebuild_term_results('2024-2025')
+        rows = {term.student.student_name: term for term in TermResult.objects.filter(exam_type='weekly')}
+        self.assertEqual((rows['Asha'].total, rows['Asha'].out_of, rows['Asha'].rank), (130, 150, 1))
+        self.assertEqual((rows['Bina'].rank, rows['Esha'].percentage, rows['Esha'].rank), (2, Decimal('33.33'), 5))
+
+    def test_merit_list_and_report_card(self):
+        response = self.client.get(reverse('merit_list'), {'exam': self.unit1.pk})
+        self.assertEqual([(row['student__student_name'], row['rank']) for row in response.context['page']],
+                         [('Asha', 1), ('Bina', 2), ('Chitra', 2), ('Dev', 4)])
+        rebuild_term_results('2024-2025')
+        response = self.client.get(reverse('merit_list'))
+        self.assertEqual((response.context['batch'], response.context['exam_type']), ('2024-2025', 'weekly'))
+        self.assertEqual([(row['student__student_name'], row['rank'], row['percentile']) for row in response.context['page']][::4],
+                         [('Asha', 1, 100.0), ('Esha', 5, 20.0)])
+
+        chitra = self.students['Chitra']
+        response = self.client.get(reverse('view_report_card', args=[self.unit1.pk, chitra.pk]))
+        self.assertEqual(response.context['standing'], {'rank': 2, 'dense_rank': 2, 'percentile': 75.0, 'appeared': 4})
+        with self.assertNumQueries(2):
+            StudentResult.objects.standing(self.unit1, self.students['Dev'].pk)
+        self.assertContains(response, 'of 4')
+        response = self.client.get(reverse('view_report_card', args=[self.unit1.pk, self.students['Esha'].pk]))
+        self.assertIsNone(response.context['standing'])
+        response = self.client.get(reverse('result_list', args=[self.unit1.pk]))
+        self.assertEqual({d['student'].student_name: d['rank'] for d in response.context['student_results']}['Dev'], 4)
+
+
+class TermResultTest(AdminLoginMixin, TestCase):
+    def setUp(self):
+        self.login_admin()
+        self.unit = Exam.objects.create(name='Unit', subject='physics_11', batch='2024-2025', exam_type='weekly')
+        self.final = Exam.objects.create(name='Final', subject='physics_11', batch='2024-2025', exam_type='annual',
+                                         total_marks=50)
+        self.asha = make_admission(student_name='Asha')
+        self.bina = make_admission(student_name='Bina')
+
+    def enter(self, rows):
+        @write_transaction
+        def save():
+            for exam, student, marks in rows:
+                StudentResult.objects.update_or_create(exam=exam, student=student, defaults={
+                    'marks_obtained': marks or 0, 'is_absent': marks is None,
+                })
+        with self.captureOnCommitCallbacks(execute=True):
+            save()
+
+    def terms(self, exam_type):
+        return {
+            term.student.student_name: (term.total, term.out_of, term.percentage, term.grade, term.rank)
+            for term in TermResult.objects.filter(batch='2024-2025', exam_type=exam_type)
+        }
+
+    def test_refreshed_on_commit(self):
+        self.enter([(self.unit, self.asha, 60), (self.unit, self.bina, 80), (self.final, self.asha, 45)])
+        self.assertEqual(self.terms('weekly'), {
+            'Asha': (60, 100, Decimal('60.00'), 'B', 2), 'Bina': (80, 100, Decimal('80.00'), 'A', 1),
+        })
+        self.assertEqual(self.terms(''), {
+            'Asha': (105, 150, Decimal('70.00'), 'B+', 2), 'Bina': (80, 100, Decimal('80.00'), 'A', 1),
+        })
+
+        self.enter([(self.unit, self.bina, None), (self.final, self.bina, 50)])
+        self.assertEqual(self.terms('weekly')['Bina'], (0, 100, 0, 'AB', 2))
+        self.assertEqual(self.terms('')['Bina'][2:], (Decimal('33.33'), 'D', 2))
+        self.assertEqual(self.terms('')['Asha'][4], 1)
+
+        # Deleting the exam drops its partition; moving one re-files its students
+        with self.captureOnCommitCallbacks(execute=True):
+            self.unit.delete()
+        self.assertEqual(self.terms('weekly'), {})
+        self.assertEqual(self.terms('')['Bina'][:2], (50, 50))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.final.exam_type = 'half_yearly'
+            self.final.save()
+        self.assertEqual(set(self.terms('half_yearly')), {'Asha', 'Bina'})
+        self.assertEqual(self.terms('annual'), {})
+
+    def test_one_save_ranks_results_written_without_signals(self):
+        chitra = make_admission(student_name='Chitra')
+        StudentResult.objects.bulk_create([
+            StudentResult(exam=self.unit, student=student, marks_obtained=marks)
+            for student, marks in ((self.asha, 90), (self.bina, 80), (chitra, 70))
+        ])
+        self.enter([(self.unit, chitra, 75)])
+        self.assertEqual({name: row[2:] for name, row in self.terms('weekly').items()}, {
+            'Asha': (Decimal('90.00'), 'A+', 1), 'Bina': (Decimal('80.00'), 'A', 2),
+            'Chitra': (Decimal('75.00'), 'B+', 3),
+        })
+        self.assertEqual({name: row[4] for name, row in self.terms('').items()}, {'Asha': 1, 'Bina': 2, 'Chitra': 3})
+
+    def test_failed_refresh_keeps_the_saved_marks(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            with transaction.atomic():
+                StudentResult.objects.create(exam=self.unit, student=self.asha, marks_obtained=60)
+                StudentResult.objects.create(exam=self.unit, student=self.bina, marks_obtained=80)
+        self.assertEqual(len(callbacks), 1)
+        # The benchmark commands switch the logger off for their run
+        with mock.patch.object(terms_logger, 'disabled', False), \
+                mock.patch('institute.terms.refresh_term_results', side_effect=OperationalError('database is locked')) as refresh, \
+                self.assertLogs('institute.performance', 'ERROR'):
+            callbacks[0]()
+        self.assertEqual(refresh.call_count, 1)
+        self.assertEqual(StudentResult.objects.count(), 2)
+        self.assertEqual(TermResult.objects.count(), 0)
+
+    def test_rebuild_and_report_cards(self):
+        StudentResult.objects.bulk_create([
+            StudentResult(exam=self.unit, student=self.asha, marks_obtained=55),
+            StudentResult(exam=self.unit, student=self.bina, marks_obtained=55),
+        ])
+        self.assertEqual(TermResult.objects.count(), 0)
+        self.assertEqual(rebuild_term_results('2024-2025'), 4)
+        self.assertEqual({rank for *_, rank in self.terms('weekly').values()}, {1})
+
+        response = self.client.get(reverse('term_report_cards'), {'batch': '2024-2025', 'exam_type': 'weekly'})
+        self.assertEqual([row['student__student_name'] for row in response.context['page']], ['Asha', 'Bina'])
+        response = self.client.get(reverse('term_report_cards'), {
+            'batch': '2024-2025', 'exam_type': 'weekly', 'student': self.bina.pk, 'download': 'pdf',
+        })
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+
+
+class ExamAttendanceTest(AdminLoginMixin, TestCase):
+    def setUp(self):
+        self.login_admin()
+        self.exam = Exam.objects.create(name='Unit', subject='physics_11', batch='2024-2025', exam_date=date(2025, 1, 10),
+                                        room_number='A1')
+        self.students = [make_admission(student_name=f'Student {i}', subject1='Physics') for i in range(3)]
+        make_admission(student_name='Commerce', batch='2023-2024', subject1='Physics')
+
+    def save(self, present, absent):
+        return self.client.post(reverse('exam_attendance', args=[self.exam.pk]), json.dumps({
+            'present': [s.pk for s in present], 'absent': [s.pk for s in absent],
+        }), content_type='application/json')
+
+    def query_counts(self):
+        with CaptureQueriesContext(connection) as load:
+            response = self.client.get(reverse('exam_attendance', args=[self.exam.pk]))
+        with CaptureQueriesContext(connection) as save:
+            self.save(self.students[1:], self.students[:1])
+        return len(response.context['rows']), len(load), len(save)
+
+    def test_room_upsert_and_result_prefill(self):
+        first, second, third = self.students
+        response = self.save([first, second], [third])
+        self.assertEqual(response.json()['absent'], 1)
+        self.save([third], [first])
+        self.assertEqual(dict(ExamAttendance.objects.values_list('student__student_name', 'is_present')), {
+            'Student 0': False, 'Student 1': True, 'Student 2': True,
+        })
+        response = self.client.post(reverse('exam_attendance', args=[self.exam.pk]), json.dumps({
+            'absent': [Admission.objects.get(student_name='Commerce').pk],
+        }), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        response = self.save([first, second], [second, third])
+        self.assertEqual((response.status_code, response.json()['conflicting']), (400, [second.pk]))
+        self.assertTrue(ExamAttendance.objects.get(student=second).is_present)
+
+        # Attendance pre-ticks absence until a result says otherwise
+        StudentResult.objects.create(exam=self.exam, student=third, marks_obtained=0, is_absent=True)
+        response = self.client.get(reverse('result_entry', args=[self.exam.pk]))
+        self.assertEqual(response.context['absent_ids'], {first.pk, third.pk})
+
+        response = self.client.get(reverse('attendance_sheets', args=[self.exam.pk]))
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+
+    def test_queries_do_not_grow_with_roster(self):
+        small = self.query_counts()
+        self.students += [make_admission(student_name=f'Student {i}', subject1='Physics') for i in range(3, 12)]
+        large = self.query_counts()
+        self.assertEqual((small[0], large[0]), (3, 12))
+        self.assertEqual(small[1:], large[1:])
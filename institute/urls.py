@@ -25,11 +25,13 @@ urlpatterns = [
     path('add-expense/', views.add_expense_general, name='add_expense_general'),
     path('add-payment/<int:admission_id>/', views.add_payment, name='add_payment'),
     path('add-payment/', views.add_payment_general, name='add_payment_general'),
+    path('add-payments/', views.add_payments_batch, name='add_payments_batch'),
     path('edit-expense/<int:expense_id>/', views.edit_expense, name='edit_expense'),
     path('edit-payment/<int:payment_id>/', views.edit_payment, name='edit_payment'),
     path('delete-expense/<int:expense_id>/', views.delete_expense, name='delete_expense'),
     path('delete-payment/<int:payment_id>/', views.delete_payment, name='delete_payment'),
     path('generate-receipt/<int:payment_id>/', views.generate_receipt, name='generate_receipt'),
+    path('generate-receipts/', views.generate_receipts, name='generate_receipts'),
     path('account-report/<int:admission_id>/', views.account_report, name='account_report'),
     
     # API endpoints
@@ -37,13 +39,21 @@ urlpatterns = [
     path('api/search-students/', views.search_students, name='search_students'),
     path('api/get-student-details/<int:student_id>/', views.get_student_details_by_id, name='get_student_details_by_id'),
     path('api/get-complete-admission-details/<int:student_id>/', views.get_complete_admission_details, name='get_complete_admission_details'),
+    path('api/admission-details/', views.get_admission_details_batch, name='get_admission_details_batch'),
+    path('api/changes/', views.change_feed, name='change_feed'),
     
     # Organization Settings
     path('organization-settings/', views.organization_settings, name='organization_settings'),
     
+    # Performance
+    path('performance/slow-queries/', views.slow_query_log, name='slow_query_log'),
+    
     # View Registrations
     path('view-registrations/', views.view_registrations, name='view_registrations'),
     path('toggle-admit/<int:admission_id>/', views.toggle_admit, name='toggle_admit'),
+    path('bulk-registrations/', views.bulk_registrations, name='bulk_registrations'),
+    path('import-admissions/', views.import_admissions, name='import_admissions'),
+    path('import-admissions/report/<str:name>/', views.import_admissions_report, name='import_admissions_report'),
     
     # EXAM MANAGEMENT URLS - SIMPLIFIED VERSION
     path('exam-dashboard/', views.exam_dashboard, name='exam_dashboard'),
@@ -51,13 +61,24 @@ urlpatterns = [
     path('exams/add/', views.add_exam, name='add_exam'),
     path('exams/edit/<int:exam_id>/', views.edit_exam, name='edit_exam'),
     path('exams/delete/<int:exam_id>/', views.delete_exam, name='delete_exam'),
+    path('exams/attendance/<int:exam_id>/', views.exam_attendance, name='exam_attendance'),
+    path('exams/attendance/<int:exam_id>/sheets/', views.attendance_sheets, name='attendance_sheets'),
     path('results/entry/<int:exam_id>/', views.result_entry, name='result_entry'),
     path('results/<int:exam_id>/', views.result_list, name='result_list'),
+    path('results/matrix/', views.marks_matrix, name='marks_matrix'),
+    path('results/merit/', views.merit_list, name='merit_list'),
     path('report-card/', views.report_card, name='report_card'),
+    path('report-card/term/', views.term_report_cards, name='term_report_cards'),
     path('report-card/<int:exam_id>/<int:student_id>/', views.view_report_card, name='view_report_card'),
     path('api/get-exam-stats/<int:exam_id>/', views.api_get_exam_stats, name='api_get_exam_stats'),
     
     # path('results/edit/<int:exam_id>/<int:student_id>/', views.edit_student_result, name='edit_student_result'),
     # path('results/update/<int:exam_id>/<int:student_id>/', views.update_student_result, name='update_student_result'),
     path('results/bulk-update/<int:exam_id>/', views.bulk_update_results, name='bulk_update_results'),
+    
+    # Streaming CSV/XLSX exports (?format=csv|xlsx)
+    path('export/registrations/', views.export_admissions, name='export_admissions'),
+    path('export/ledger/', views.export_ledger, name='export_ledger'),
+    path('export/results/<int:exam_id>/', views.export_exam_results, name='export_exam_results'),
+    path('export/marks-matrix/', views.export_marks_matrix, name='export_marks_matrix'),
 ]
\ No newline at end of file
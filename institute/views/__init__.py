@@ -0,0 +1,91 @@
+"""Views for the institute app, split by area.
+
+Everything is re-exported here so ``institute.urls`` and the
+``organization_context`` context processor keep referring to
+``institute.views.<name>``.
+"""
+from .core import (
+    home,
+    user_login,
+    forgot_password,
+    user_logout,
+    register_user,
+    register_organization,
+    admin_dashboard,
+    manage_users,
+    edit_user,
+    delete_user,
+    get_active_organization,
+    organization_settings,
+    organization_context,
+    slow_query_log,
+)
+from .admissions import (
+    admission_form,
+    search_admission,
+    view_registrations,
+    toggle_admit,
+    delete_registration,
+    bulk_registrations,
+    import_admissions,
+    import_admissions_report,
+    admissions_list,
+)
+from .accounts import (
+    account_section,
+    account_search_view,
+    student_account,
+    add_expense,
+    add_payment,
+    add_expense_general,
+    add_payment_general,
+    add_payments_batch,
+    edit_expense,
+    edit_payment,
+    delete_expense,
+    delete_payment,
+)
+from .api import (
+    get_student_details,
+    search_students,
+    get_student_details_by_id,
+    get_complete_admission_details,
+    get_admission_details_batch,
+    change_feed,
+    api_get_students_for_exam,
+    api_get_exam_stats,
+)
+from .exams import (
+    exam_dashboard,
+    exam_list,
+    add_exam,
+    edit_exam,
+    delete_exam,
+)
+from .results import (
+    result_list,
+    marks_matrix,
+    merit_list,
+    result_entry,
+    bulk_update_results,
+    report_card,
+    view_report_card,
+    term_report_cards,
+)
+from .attendance import (
+    exam_attendance,
+    attendance_sheets,
+)
+from .exports import (
+    export_admissions,
+    export_ledger,
+    export_exam_results,
+    export_marks_matrix,
+)
+from .pdf import (
+    generate_receipt,
+    generate_receipts,
+    account_report,
+    generate_report_card_pdf,
+    generate_term_report_cards_pdf,
+)
@@ -0,0 +1,558 @@
+"""Student accounts: expenses, payments and account summaries."""
+import json
+from datetime import datetime
+
+from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.http import JsonResponse
+from django.urls import reverse
+from django.db.models import Q, Count, Sum
+
+from ..models import *
+from ..forms import *
+from ..archive import get_live_or_archived
+from ..conditional import revalidated, student_account_etag
+from ..db import write_transaction
+
+
+@login_required
+def account_section(request):
+    if request.user.user_type != 'admin':
+        return redirect('home')
+    
+    search_query = request.GET.get('search', '')
+    
+    # IMPORTANT FIX: Only show admitted students (is_admitted = True)
+    admissions = Admission.objects.for_ledger().filter(is_admitted=True)
+    
+    if search_query:
+        admissions = admissions.filter(
+            Q(student_name__icontains=search_query) |
+            Q(admission_id__icontains=search_query) |
+            Q(mobile_number__icontains=search_query)
+        )
+    
+    # Totals per admission, fetched in one grouped query each instead of per student
+    expense_totals = {
+        row['admission']: row
+        for row in Expense.objects.filter(admission__in=admissions).values('admission').annotate(
+            total=Sum('amount'), count=Count('id')
+        )
+    }
+    payment_totals = {
+        row['admission']: row
+        for row in Payment.objects.filter(admission__in=admissions).values('admission').annotate(
+            total=Sum('amount'), count=Count('id')
+        )
+    }
+    
+    # Calculate totals for each admission
+    admission_data = []
+    total_payments_sum = 0
+    total_expenses_sum = 0
+    
+    for admission in admissions:
+        expense_row = expense_totals.get(admission.id, {})
+        payment_row = payment_totals.get(admission.id, {})
+        total_expenses = expense_row.get('total') or 0
+        total_payments = payment_row.get('total') or 0
+        balance = total_payments - total_expenses
+
+        # Total fee calculation (tms fees + college fees + hostel fees)
+        total_fee = (admission.tms_fees or 0) + (admission.admitted_college_fees or 0) + (admission.hostel_fees or 0)
+        due_amount = total_fee - total_payments
+        
+        total_payments_sum += total_payments
+        total_expenses_sum += total_expenses
+        
+        admission_data.append({
+            'admission': admission,
+            'total_expenses': total_expenses,
+            'total_payments': total_payments,
+            'balance': balance,
+            'total_fee': total_fee,
+            'due_amount': due_amount,
+            'expenses_count': expense_row.get('count', 0),
+            'payments_count': payment_row.get('count', 0),
+        })
+    
+    net_balance = total_payments_sum - total_expenses_sum
+    
+    # Add count of admitted students
+    admitted_count = len(admission_data)
+    
+    context = {
+        'admission_data': admission_data,
+        'search_query': search_query,
+        'total_payments_sum': total_payments_sum,
+        'total_expenses_sum': total_expenses_sum,
+        'net_balance': net_balance,
+        'admitted_count': admitted_count,  # Add this to template
+    }
+    return render(request, 'institute/account_section.html', context)
+
+
+@login_required
+def account_search_view(request):
+    if request.user.user_type != 'admin':
+        return redirect('home')
+    
+    search_query = request.GET.get('search', '')
+    date_from = request.GET.get('date_from', '')
+    date_to = request.GET.get('date_to', '')
+    category = request.GET.get('category', '')
+    
+    # IMPORTANT FIX: Only show admitted students
+    admissions = Admission.objects.select_related('personal').filter(is_admitted=True)
+    
+    if search_query:
+        admissions = admissions.filter(
+            Q(student_name__icontains=search_query) |
+            Q(admission_id__icontains=search_query) |
+            Q(mobile_number__icontains=search_query)
+        )
+    
+    # Calculate totals for each admission with filters
+    admission_data = []
+    total_payments_sum = 0
+    total_expenses_sum = 0
+    
+    for admission in admissions:
+        expenses = Expense.objects.filter(admission=admission)
+        payments = Payment.objects.filter(admission=admission)
+        
+        # Apply date filters if provided
+        if date_from:
+            try:
+                from_date = datetime.strptime(date_from, '%Y-%m-%d').date()
+                expenses = expenses.filter(date__gte=from_date)
+                payments = payments.filter(date__gte=from_date)
+            except:
+                pass
+        
+        if date_to:
+            try:
+                to_date = datetime.strptime(date_to, '%Y-%m-%d').date()
+                expenses = expenses.filter(date__lte=to_date)
+                payments = payments.filter(date__lte=to_date)
+            except:
+                pass
+        
+        # Apply category filter if provided
+        if category:
+            if category.startswith('expense_'):
+                expense_category = category.replace('expense_', '')
+                expenses = expenses.filter(category=expense_category)
+            elif category.startswith('payment_'):
+                payment_category = category.replace('payment_', '')
+                payments = payments.filter(payment_type=payment_category)
+        
+        total_expenses = expenses.aggregate(Sum('amount'))['amount__sum'] or 0
+        total_payments = payments.aggregate(Sum('amount'))['amount__sum'] or 0
+        balance = total_payments - total_expenses
+        
+        total_payments_sum += total_payments
+        total_expenses_sum += total_expenses
+        
+        admission_data.append({
+            'admission': admission,
+            'total_expenses': total_expenses,
+            'total_payments': total_payments,
+            'balance': balance,
+            'expenses_count': expenses.count(),
+            'payments_count': payments.count()
+        })
+    
+    net_balance = total_payments_sum - total_expenses_sum
+    
+    context = {
+        'admission_data': admission_data,
+        'search_query': search_query,
+        'date_from': date_from,
+        'date_to': date_to,
+        'category': category,
+        'total_payments_sum': total_payments_sum,
+        'total_expenses_sum': total_expenses_sum,
+        'total_balance': net_balance, 
+        'net_balance': net_balance,
+        'total_admissions': Admission.objects.filter(is_admitted=True).count(),  # Total admitted count
+        'expense_categories': Expense._meta.get_field('category').choices,
+        'payment_categories': Payment._meta.get_field('payment_type').choices,
+    }
+    return render(request, 'institute/account_search.html', context)
+
+
+@login_required
+@revalidated(student_account_etag)
+def student_account(request, admission_id):
+    if request.user.user_type != 'admin':
+        return redirect('home')
+    
+    admission = get_live_or_archived(Admission, id=admission_id)
+    expenses = admission.expenses.order_by('-date')
+    payments = admission.payments.order_by('-date')
+    
+    # Calculate totals
+    total_expenses = expenses.aggregate(Sum('amount'))['amount__sum'] or 0
+    total_payments = payments.aggregate(Sum('amount'))['amount__sum'] or 0
+    balance = total_payments - total_expenses
+
+    # Total fee and due amount for this student
+    total_fee = (admission.tms_fees or 0) + (admission.admitted_college_fees or 0) + (admission.hostel_fees or 0)
+    due_amount = total_fee - total_payments
+    
+    # Expenses by category
+    expenses_by_category = expenses.values('category').annotate(
+        total=Sum('amount')
+    ).order_by('-total')
+    
+    context = {
+        'admission': admission,
+        'expenses': expenses,
+        'payments': payments,
+        'total_expenses': total_expenses,
+        'total_payments': total_payments,
+        'balance': balance,
+        'total_fee': total_fee,
+        'due_amount': due_amount,
+        'expenses_by_category': expenses_by_category,
+    }
+    return render(request, 'institute/student_account.html', context)
+
+
+@login_required
+def add_expense(request, admission_id):
+    if request.user.user_type != 'admin':
+        return redirect('home')
+    
+    admission = get_object_or_404(Admission, id=admission_id)
+    
+    if request.method == 'POST':
+        form = ExpenseForm(request.POST)
+        if form.is_valid():
+            expense = form.save(commit=False)
+            expense.admission = admission
+            expense.added_by = request.user
+            expense.save()
+            messages.success(request, f'Expense of ₹{expense.amount} added successfully!')
+            return redirect('student_account', admission_id=admission_id)
+    else:
+        form = ExpenseForm()
+    
+    return render(request, 'institute/add_expense.html', {
+        'form': form,
+        'admission': admission
+    })
+
+
+@write_transaction
+def save_new_payment(payment):
+    """Insert a new payment, numbering its receipt inside the retried transaction."""
+    # A retry after a lock error must not keep the number picked by the failed attempt
+    payment.receipt_number = None
+    payment.save()
+
+
+@login_required
+def add_payment(request, admission_id):
+    if request.user.user_type != 'admin':
+        return redirect('home')
+    
+    admission = get_object_or_404(Admission, id=admission_id)
+    
+    if request.method == 'POST':
+        form = PaymentForm(request.POST)
+        if form.is_valid():
+            payment = form.save(commit=False)
+            payment.admission = admission
+            payment.received_by = request.user
+            # Receipt number lookup and insert happen under one write lock
+            save_new_payment(payment)
+            messages.success(request, f'Payment of ₹{payment.amount} recorded successfully! Receipt: {payment.receipt_number}')
+            return redirect('student_account', admission_id=admission_id)
+    else:
+        form = PaymentForm()
+    
+    return render(request, 'institute/add_payment.html', {
+        'form': form,
+        'admission': admission
+    })
+
+
+@login_required
+def add_expense_general(request):
+    """Add expense with student selection - ONLY SHOW ADMITTED STUDENTS"""
+    if request.user.user_type != 'admin':
+        messages.error(request, 'Access denied. Admin only.')
+        return redirect('home')
+    
+    admission = None
+    selected_admission_id = request.GET.get('admission_id') or request.POST.get('admission_id')
+    
+    if selected_admission_id:
+        try:
+            admission = Admission.objects.get(id=selected_admission_id, is_admitted=True)  # Only admitted
+        except Admission.DoesNotExist:
+            messages.error(request, 'Admitted student not found.')
+    
+    if request.method == 'POST':
+        form = ExpenseForm(request.POST)
+        if form.is_valid():
+            if not admission:
+                messages.error(request, 'Please select an admitted student first.')
+                return render(request, 'institute/add_expense_general.html', {
+                    'form': form,
+                    'title': 'Add Expense'
+                })
+            
+            expense = form.save(commit=False)
+            expense.admission = admission
+            expense.added_by = request.user
+            
+            try:
+                expense.save()
+                messages.success(request, f'Expense of ₹{expense.amount} added successfully!')
+                return redirect('student_account', admission_id=admission.id)
+            except Exception as e:
+                messages.error(request, f'Error saving expense: {str(e)}')
+        else:
+            messages.error(request, 'Please correct the errors in the form.')
+    else:
+        form = ExpenseForm()
+    
+    # Students are picked through /api/search-students/, which only finds admitted ones
+    context = {
+        'form': form,
+        'admission': admission,
+        'title': 'Add Expense',
+    }
+    return render(request, 'institute/add_expense_general.html', context)
+
+
+@login_required
+def add_payment_general(request):
+    """Add payment with student selection - ONLY SHOW ADMITTED STUDENTS"""
+    if request.user.user_type != 'admin':
+        messages.error(request, 'Access denied. Admin only.')
+        return redirect('home')
+    
+    admission = None
+    selected_admission_id = request.GET.get('admission_id') or request.POST.get('admission_id')
+    
+    if selected_admission_id:
+        try:
+            admission = Admission.objects.get(id=selected_admission_id, is_admitted=True)  # Only admitted
+        except Admission.DoesNotExist:
+            messages.error(request, 'Admitted student not found.')
+    
+    if request.method == 'POST':
+        form = PaymentForm(request.POST)
+        if form.is_valid():
+            if not admission:
+                messages.error(request, 'Please select an admitted student first.')
+                return render(request, 'institute/add_payment_general.html', {
+                    'form': form,
+                    'title': 'Add Payment'
+                })
+            
+            payment = form.save(commit=False)
+            payment.admission = admission
+            payment.received_by = request.user
+            
+            try:
+                # Receipt number lookup and insert happen under one write lock
+                save_new_payment(payment)
+                messages.success(request, f'Payment of ₹{payment.amount} recorded successfully! Receipt: {payment.receipt_number}')
+                return redirect('student_account', admission_id=admission.id)
+            except Exception as e:
+                messages.error(request, f'Error saving payment: {str(e)}')
+        else:
+            messages.error(request, 'Please correct the errors in the form.')
+    else:
+        form = PaymentForm()
+    
+    # Students are picked through /api/search-students/, which only finds admitted ones
+    context = {
+        'form': form,
+        'admission': admission,
+        'title': 'Add Payment',
+    }
+    return render(request, 'institute/add_payment_general.html', context)
+
+
+# Rows accepted by one add_payments_batch call
+PAYMENT_BATCH_MAX_ROWS = 200
+
+
+def next_receipt_number():
+    """Number after the newest payment's ``RECPT`` receipt, as ``Payment.save`` counts."""
+    last = Payment.objects.exclude(receipt_number__isnull=True).order_by('-id').values_list('receipt_number', flat=True).first()
+    try:
+        return int(last[5:]) + 1
+    except (TypeError, ValueError):
+        return 1
+
+
+@login_required
+def add_payments_batch(request):
+    """Fee counter: record many payments at once.
+
+    GET renders the entry grid. POST takes JSON ``{"payments": [{"admission",
+    "date", "payment_method", "payment_type", "description", "amount"}, ...]}``.
+    Every row is validated with PaymentForm before anything is written; if
+    any row fails, nothing is saved and ``errors`` maps row index to field
+    errors. Otherwise the rows get one contiguous block of receipt numbers
+    and are inserted with a single bulk_create.
+    """
+    if request.user.user_type != 'admin':
+        if request.method == 'POST':
+            return JsonResponse({'success': False, 'error': 'Permission denied'}, status=403)
+        messages.error(request, 'Access denied. Admin only.')
+        return redirect('home')
+
+    if request.method != 'POST':
+        return render(request, 'institute/add_payments_batch.html', {
+            'form': PaymentForm(),
+            'max_rows': PAYMENT_BATCH_MAX_ROWS,
+            'title': 'Fee Counter',
+        })
+
+    try:
+        rows = json.loads(request.body.decode('utf-8')).get('payments')
+    except (ValueError, AttributeError):
+        rows = None
+    if not isinstance(rows, list) or not rows:
+        return JsonResponse({'success': False, 'error': 'No payments given'}, status=400)
+    if len(rows) > PAYMENT_BATCH_MAX_ROWS:
+        return JsonResponse({'success': False, 'error': f'At most {PAYMENT_BATCH_MAX_ROWS} payments per batch'}, status=400)
+
+    # One query for every student in the batch
+    admission_ids = {row.get('admission') for row in rows if isinstance(row, dict)}
+    admitted = dict(
+        Admission.objects.filter(
+            id__in=[pk for pk in admission_ids if str(pk).isdigit()], is_admitted=True
+        ).values_list('id', 'student_name')
+    )
+
+    payments, errors = [], {}
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors[index] = {'__all__': ['Each payment must be an object']}
+            continue
+        form = PaymentForm(row)
+        row_errors = {field: list(field_errors) for field, field_errors in form.errors.items()}
+        admission_id = int(row['admission']) if str(row.get('admission', '')).isdigit() else None
+        if admission_id not in admitted:
+            row_errors['admission'] = ['Select an admitted student']
+        if row_errors:
+            errors[index] = row_errors
+            continue
+        payment = form.save(commit=False)
+        payment.admission_id = admission_id
+        payment.received_by = request.user
+        payments.append(payment)
+
+    if errors:
+        return JsonResponse({'success': False, 'error': 'Please correct the highlighted rows', 'errors': errors}, status=400)
+
+    @write_transaction
+    def insert_payments():
+        number = next_receipt_number()
+        for offset, payment in enumerate(payments):
+            payment.receipt_number = f'RECPT{number + offset:04d}'
+        Payment.objects.bulk_create(payments)
+
+    try:
+        insert_payments()
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+    ids = [payment.id for payment in payments]
+    return JsonResponse({
+        'success': True,
+        'total': str(sum(payment.amount for payment in payments)),
+        'receipts': [{
+            'id': payment.id,
+            'receipt_number': payment.receipt_number,
+            'admission': payment.admission_id,
+            'student_name': admitted[payment.admission_id],
+            'amount': str(payment.amount),
+        } for payment in payments],
+        'receipts_pdf_url': reverse('generate_receipts') + '?ids=' + ','.join(map(str, ids)),
+    })
+
+
+@login_required
+def edit_expense(request, expense_id):
+    if request.user.user_type != 'admin':
+        return redirect('home')
+    
+    expense = get_object_or_404(Expense, id=expense_id)
+    
+    if request.method == 'POST':
+        form = ExpenseForm(request.POST, instance=expense)
+        if form.is_valid():
+            form.save()
+            messages.success(request, 'Expense updated successfully!')
+            return redirect('student_account', admission_id=expense.admission.id)
+    else:
+        form = ExpenseForm(instance=expense)
+    
+    return render(request, 'institute/edit_expense.html', {
+        'form': form,
+        'expense': expense
+    })
+
+
+@login_required
+def edit_payment(request, payment_id):
+    if request.user.user_type != 'admin':
+        return redirect('home')
+    
+    payment = get_object_or_404(Payment, id=payment_id)
+    
+    if request.method == 'POST':
+        form = PaymentForm(request.POST, instance=payment)
+        if form.is_valid():
+            form.save()
+            messages.success(request, 'Payment updated successfully!')
+            return redirect('student_account', admission_id=payment.admission.id)
+    else:
+        form = PaymentForm(instance=payment)
+    
+    return render(request, 'institute/edit_payment.html', {
+        'form': form,
+        'payment': payment
+    })
+
+
+@login_required
+def delete_expense(request, expense_id):
+    if request.user.user_type != 'admin':
+        messages.error(request, 'Only admins can delete expenses.')
+        return redirect('account_section')
+    
+    if request.method == 'POST':
+        expense = get_object_or_404(Expense, id=expense_id)
+        admission_id = expense.admission.id
+        expense.delete()
+        messages.success(request, 'Expense deleted successfully!')
+        return redirect('student_account', admission_id=admission_id)
+    
+    return redirect('account_section')
+
+
+@login_required
+def delete_payment(request, payment_id):
+    if request.user.user_type != 'admin':
+        messages.error(request, 'Only admins can delete payments.')
+        return redirect('account_section')
+    
+    if request.method == 'POST':
+        payment = get_object_or_404(Payment, id=payment_id)
+        admission_id = payment.admission.id
+        payment.delete()
+        messages.success(request, 'Payment deleted successfully!')
+        return redirect('student_account', admission_id=admission_id)
+    
+    return redirect('account_section')
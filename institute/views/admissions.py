@@ -0,0 +1,507 @@
+"""Registration and admission views."""
+import csv
+import json
+import os
+
+from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_POST
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
+from django.core.exceptions import ValidationError
+from django.contrib import messages
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce
+from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+from django.utils import timezone
+
+from ..models import *
+from ..forms import *
+from ..db import write_transaction
+from ..imports import import_fields, import_sheet, new_report_path, report_path
+
+
+def admission_form(request):
+    if request.method == 'POST':
+        form = AdmissionForm(request.POST, request.FILES)
+        if form.is_valid():
+            admission = form.save(commit=False)
+            # Link to user if they are logged in
+            if request.user.is_authenticated:
+                admission.submitted_by = request.user
+            admission.save()
+            messages.success(request, f'Registration form submitted successfully! Admission ID: {admission.admission_id}')
+            return redirect('admission_form')
+    else:
+        form = AdmissionForm()
+    
+    return render(request, 'institute/admission_form.html', {'form': form})
+
+
+@login_required
+def search_admission(request):
+    if request.user.user_type != 'admin': 
+        return redirect('home')
+    
+    search_query = request.GET.get('search', '')
+    admission = None
+    search_performed = False
+    edit_mode = False
+    
+    # Check if we're in edit mode (has admission_id parameter)
+    admission_id = request.GET.get('admission_id')
+    if admission_id:
+        edit_mode = True
+        try:
+            admission = get_object_or_404(Admission.objects.with_details(), id=admission_id)
+            search_query = admission.admission_id or admission.mobile_number
+        except:
+            pass
+    
+    # Handle search
+    if search_query and not edit_mode:
+        search_performed = True
+        
+        # Check if search is mobile number (10 digits)
+        if search_query.isdigit() and len(search_query) == 10:
+            admissions = Admission.objects.filter(mobile_number__icontains=search_query)
+        # Check if search is admission ID (TMIS followed by numbers)
+        elif search_query.upper().startswith('TMIS'):
+            admissions = Admission.objects.filter(admission_id__iexact=search_query.upper())
+        else:
+            # General search
+            admissions = Admission.objects.filter(
+                Q(student_name__icontains=search_query) |
+                Q(personal__father_name__icontains=search_query) |
+                Q(mobile_number__icontains=search_query) |
+                Q(personal__adhaar_number__icontains=search_query) |
+                Q(admission_id__icontains=search_query.upper())
+            )
+        
+        if admissions.exists():
+            admission = admissions.with_details().first()
+            edit_mode = True  # Automatically go to edit mode when found
+        else:
+            messages.warning(request, f"No admission found for: {search_query}")
+    
+    # Get recent admissions for the table
+    recent_admissions = Admission.objects.for_list().order_by('-created_at')[:10]
+    
+    # Handle POST request (both create and update)
+    if request.method == 'POST':
+        admission_id = request.POST.get('admission_id')
+        
+        if admission_id:
+            # UPDATE EXISTING ADMISSION
+            try:
+                admission = get_object_or_404(Admission.objects.with_details(), id=admission_id)
+                # Store the original values to protect them
+                original_admission_id = admission.admission_id
+                original_is_admitted = admission.is_admitted
+                original_admission_date = admission.admission_date
+                original_admitted_by = admission.admitted_by
+                
+                form = AdmissionForm(request.POST, request.FILES, instance=admission)
+                
+                if form.is_valid():
+                    admission = form.save(commit=False)
+                    # Restore protected fields
+                    admission.admission_id = original_admission_id
+                    
+                    # CRITICAL: Check if is_admitted is in the form data
+                    # If not present, restore the original value
+                    if 'is_admitted' not in request.POST:
+                        admission.is_admitted = original_is_admitted
+                        admission.admission_date = original_admission_date
+                        admission.admitted_by = original_admitted_by
+                    
+                    admission.submitted_by = request.user
+                    admission.save()
+                    
+                    messages.success(request, f'Admission {admission.admission_id} for {admission.student_name} updated successfully!')
+                    return redirect('search_admission')
+                else:
+                    # Form has errors - display them
+                    error_messages = []
+                    for field, errors in form.errors.items():
+                        if field == '__all__':
+                            for error in errors:
+                                error_messages.append(f"Form Error: {error}")
+                        else:
+                            for error in errors:
+                                error_messages.append(f"{field}: {error}")
+                    
+                    if error_messages:
+                        for msg in error_messages:
+                            messages.error(request, msg)
+                    else:
+                        messages.error(request, 'Please correct the errors in the form.')
+                    
+                    # Don't redirect - re-render with form errors visible
+                    edit_mode = True
+                    
+            except Exception as e:
+                messages.error(request, f'Error updating admission: {str(e)}')
+                print(f"Update error: {e}")
+        else:
+            # CREATE NEW ADMISSION
+            try:
+                form = AdmissionForm(request.POST, request.FILES)
+                
+                if form.is_valid():
+                    admission = form.save(commit=False)
+                    admission.submitted_by = request.user
+                    admission.save()
+                    
+                    messages.success(request, f'New admission created successfully! Admission ID: {admission.admission_id}')
+                    return redirect('search_admission')
+                else:
+                    # Form has errors - display them
+                    error_messages = []
+                    for field, errors in form.errors.items():
+                        if field == '__all__':
+                            for error in errors:
+                                error_messages.append(f"Form Error: {error}")
+                        else:
+                            for error in errors:
+                                error_messages.append(f"{field}: {error}")
+                    
+                    if error_messages:
+                        for msg in error_messages:
+                            messages.error(request, msg)
+                    else:
+                        messages.error(request, 'Please correct the errors in the form.')
+                    
+                    # Don't redirect - re-render with form errors visible
+                    edit_mode = False
+                    
+            except Exception as e:
+                messages.error(request, f'Error creating admission: {str(e)}')
+                print(f"Create error: {e}")
+    
+    # For GET requests, prepare the form
+    if admission:
+        # If we found an admission, pre-fill the form
+        form = AdmissionForm(instance=admission)
+    else:
+        # Otherwise, show empty form
+        form = AdmissionForm()
+    
+    context = {
+        'form': form,
+        'admission': admission,
+        'search_query': search_query,
+        'search_performed': search_performed,
+        'recent_admissions': recent_admissions,
+        'edit_mode': edit_mode,
+    }
+    return render(request, 'institute/search_admission.html', context)
+
+
+def search_registrations(queryset, search_query):
+    """Registrations matching a name, father's name, mobile, Aadhaar or admission ID search"""
+    return queryset.filter(
+        Q(student_name__icontains=search_query) |
+        Q(personal__father_name__icontains=search_query) |
+        Q(mobile_number__icontains=search_query) |
+        Q(personal__adhaar_number__icontains=search_query) |
+        Q(admission_id__icontains=search_query.upper())
+    )
+
+
+# Larger pages let the bulk actions cover a whole intake at once
+REGISTRATION_PAGE_SIZES = (10, 50, 100)
+
+
+@login_required
+def view_registrations(request):
+    """View-only page for registrations (no edit form)"""
+    if request.user.user_type != 'admin':
+        return redirect('home')
+    
+    search_query = request.GET.get('search', '')
+    admissions_list = Admission.objects.for_list('personal__father_name').order_by('-created_at')
+    
+    if search_query:
+        admissions_list = search_registrations(admissions_list, search_query)
+    
+    # Transaction check as a subquery, evaluated only for the rows on the page
+    admissions_list = admissions_list.with_transaction_flag()
+    
+    # Pagination
+    page = request.GET.get('page', 1)
+    per_page = request.GET.get('per_page', '')
+    per_page = int(per_page) if per_page.isdigit() and int(per_page) in REGISTRATION_PAGE_SIZES else REGISTRATION_PAGE_SIZES[0]
+    paginator = Paginator(admissions_list, per_page)
+    
+    try:
+        admissions = paginator.page(page)
+    except PageNotAnInteger:
+        admissions = paginator.page(1)
+    except EmptyPage:
+        admissions = paginator.page(paginator.num_pages)
+    
+    context = {
+        'admissions': admissions,
+        'search_query': search_query,
+        'per_page': per_page,
+        'page_sizes': REGISTRATION_PAGE_SIZES,
+    }
+    return render(request, 'institute/view_registrations.html', context)
+
+
+@login_required
+def toggle_admit(request, admission_id):
+    """Toggle or set admission.is_admitted via AJAX POST.
+    Prevent changing to 'No' if student has transactions.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Invalid method'}, status=405)
+
+    # Permission: allow admin user_type or staff flag
+    user = request.user
+    if not (getattr(user, 'user_type', None) == 'admin' or getattr(user, 'is_staff', False)):
+        return JsonResponse({'success': False, 'error': 'Permission denied'}, status=403)
+
+    try:
+        admission = get_object_or_404(Admission, id=admission_id)
+
+        # parse JSON body
+        try:
+            payload = json.loads(request.body.decode('utf-8')) if request.body else {}
+        except Exception:
+            payload = {}
+
+        @write_transaction
+        def apply_admit():
+            # Re-read inside the write transaction so the checks see committed state
+            admission.refresh_from_db()
+
+            # determine desired state
+            if 'is_admitted' in payload:
+                desired = bool(payload.get('is_admitted'))
+            else:
+                
+                desired = not admission.is_admitted
+
+            # CRITICAL CHECK: If trying to set to False (No) and student has transactions, block it
+            if not desired and admission.is_admitted:
+                # Check if student has any payments, expenses, or exam results
+                has_payments = Payment.objects.filter(admission=admission).exists()
+                has_expenses = Expense.objects.filter(admission=admission).exists()
+                has_exam_results = StudentResult.objects.filter(student=admission).exists()
+                
+                if has_payments or has_expenses or has_exam_results:
+                    return JsonResponse({
+                        'success': False, 
+                        'error': 'Cannot remove admission status. Student has existing transactions (payments, expenses, or exam results).'
+                    }, status=400)
+
+            admission.is_admitted = desired
+            if desired:
+                admission.admitted_by = request.user
+                # set admission_date if not already
+                if not admission.admission_date:
+                    admission.admission_date = timezone.now().date()
+            else:
+                admission.admitted_by = None
+                admission.admission_date = None
+
+            admission.save()
+
+            return JsonResponse({'success': True, 'is_admitted': admission.is_admitted, 'admission_id': admission.id})
+
+        return apply_admit()
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+@require_POST
+@login_required
+def delete_registration(request, admission_id):
+    """
+    Delete a registration only if the student is not admitted and has no transactions
+    """
+    try:
+        admission = Admission.objects.get(id=admission_id)
+        
+        # Check if student is admitted
+        if admission.is_admitted:
+            return JsonResponse({
+                'success': False, 
+                'error': 'Cannot delete admitted students'
+            }, status=400)
+        
+        # Check if student has any transactions
+        has_payments = Payment.objects.filter(admission=admission).exists()
+        has_expenses = Expense.objects.filter(admission=admission).exists()
+        has_exam_results = StudentResult.objects.filter(student=admission).exists()
+        
+        if has_payments or has_expenses or has_exam_results:
+            return JsonResponse({
+                'success': False, 
+                'error': 'Cannot delete student with existing transactions (payments, expenses, or exam results)'
+            }, status=400)
+        
+        # Store student name for response message
+        student_name = admission.student_name
+        
+        # Delete the registration
+        admission.delete()
+        
+        return JsonResponse({
+            'success': True,
+            'message': f'Registration for {student_name} has been deleted successfully'
+        })
+        
+    except Admission.DoesNotExist:
+        return JsonResponse({
+            'success': False, 
+            'error': 'Registration not found'
+        }, status=404)
+    except Exception as e:
+        return JsonResponse({
+            'success': False, 
+            'error': str(e)
+        }, status=500)
+
+
+# Upper bound on ids per bulk request; the page's select-all never gets near it
+BULK_MAX_IDS = 500
+BULK_ACTIONS = ('admit', 'unadmit', 'delete')
+
+
+@require_POST
+@login_required
+def bulk_registrations(request):
+    """Admit, un-admit or delete many registrations in one transaction.
+
+    JSON body ``{"action": "admit" | "unadmit" | "delete", "ids": [...]}``.
+    All ids are checked in one query and the accepted ones are changed with a
+    single UPDATE (or DELETE). Ids already in the requested state are listed
+    in ``unchanged``, refused ones in ``rejected`` with the reason.
+    """
+    user = request.user
+    if not (getattr(user, 'user_type', None) == 'admin' or getattr(user, 'is_staff', False)):
+        return JsonResponse({'success': False, 'error': 'Permission denied'}, status=403)
+
+    try:
+        payload = json.loads(request.body.decode('utf-8')) if request.body else {}
+        action = payload.get('action')
+        ids = list(dict.fromkeys(int(pk) for pk in payload.get('ids') or []))
+    except (ValueError, TypeError, AttributeError):
+        return JsonResponse({'success': False, 'error': 'Invalid request body'}, status=400)
+    if action not in BULK_ACTIONS:
+        return JsonResponse({'success': False, 'error': f'action must be one of {", ".join(BULK_ACTIONS)}'}, status=400)
+    if not ids:
+        return JsonResponse({'success': False, 'error': 'No registrations selected'}, status=400)
+    if len(ids) > BULK_MAX_IDS:
+        return JsonResponse({'success': False, 'error': f'At most {BULK_MAX_IDS} registrations per request'}, status=400)
+
+    @write_transaction
+    def apply_bulk():
+        found = {
+            pk: (is_admitted, has_transactions)
+            for pk, is_admitted, has_transactions in Admission.objects.filter(id__in=ids)
+            .with_transaction_flag().values_list('id', 'is_admitted', 'has_transactions')
+        }
+        applied, unchanged, rejected = [], [], {}
+        for pk in ids:
+            if pk not in found:
+                rejected[pk] = 'Registration not found'
+                continue
+            is_admitted, has_transactions = found[pk]
+            if (action == 'admit' and is_admitted) or (action == 'unadmit' and not is_admitted):
+                unchanged.append(pk)
+            elif action == 'delete' and is_admitted:
+                rejected[pk] = 'Cannot delete admitted students'
+            elif action != 'admit' and has_transactions:
+                rejected[pk] = 'Student has existing transactions (payments, expenses, or exam results)'
+            else:
+                applied.append(pk)
+
+        if applied:
+            targets = Admission.objects.filter(id__in=applied)
+            # update() skips auto_now; the change feed and ETags rely on updated_at
+            if action == 'admit':
+                targets.update(
+                    is_admitted=True, admitted_by=user, updated_at=timezone.now(),
+                    admission_date=Coalesce(F('admission_date'), Value(timezone.now().date())),
+                )
+            elif action == 'unadmit':
+                targets.update(is_admitted=False, admitted_by=None, admission_date=None, updated_at=timezone.now())
+            else:
+                targets.delete()
+        return applied, unchanged, rejected
+
+    try:
+        applied, unchanged, rejected = apply_bulk()
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+    return JsonResponse({
+        'success': True,
+        'action': action,
+        'applied': applied,
+        'unchanged': unchanged,
+        'rejected': rejected,
+    })
+
+
+@login_required
+def import_admissions(request):
+    """Register students from a partner school's CSV/XLSX sheet"""
+    if request.user.user_type != 'admin':
+        return redirect('home')
+
+    if request.GET.get('template'):
+        response = HttpResponse(content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="admissions_template.csv"'
+        csv.writer(response).writerow(import_fields())
+        return response
+
+    summary = None
+    if request.method == 'POST':
+        form = AdmissionImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            path = new_report_path()
+            try:
+                with open(path, 'w', newline='', encoding='utf-8') as report:
+                    summary = import_sheet(upload, upload.name, user=request.user, report=report)
+            except ValidationError as e:
+                form.add_error('file', e)
+            if summary and summary['rejected']:
+                summary['report'] = os.path.basename(path)
+            else:
+                os.remove(path)
+    else:
+        form = AdmissionImportForm()
+
+    return render(request, 'institute/import_admissions.html', {'form': form, 'summary': summary})
+
+
+@login_required
+def import_admissions_report(request, name):
+    """Download the rejected rows of an import"""
+    if request.user.user_type != 'admin':
+        return redirect('home')
+    path = report_path(name)
+    if path is None:
+        raise Http404('Import report not found')
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename='admission_import_errors.csv')
+
+
+@login_required
+def admissions_list(request):
+    # Admin-only view to list admitted students
+    if request.user.user_type != 'admin':
+        return redirect('home')
+
+    admitted_students = Admission.objects.for_list().filter(is_admitted=True).order_by('-admission_date')
+    admitted_count = admitted_students.count()
+
+    context = {
+        'admitted_students': admitted_students,
+        'admitted_count': admitted_count,
+    }
+    return render(request, 'institute/admissions_list.html', context)
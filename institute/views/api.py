@@ -0,0 +1,421 @@
+"""JSON endpoints used by the admission, account and exam pages."""
+
+import json
+
+from django.shortcuts import get_object_or_404
+from django.contrib.auth.decorators import login_required
+from django.core import signing
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.db.models import Q, Sum
+from django.views.decorators.gzip import gzip_page
+
+from ..models import *
+from ..forms import *
+from ..changes import FEED_MODELS, changed_rows, deleted_rows, make_token, read_token, settled_cutoff
+from ..conditional import admission_details_etag, exam_stats_etag, revalidated, student_details_etag
+from ..images import thumbnail_url
+
+
+@login_required
+def get_student_details(request):
+    """API endpoint to get student details by ID - for AJAX requests"""
+    if request.user.user_type != 'admin':
+        return JsonResponse({'error': 'Unauthorized'}, status=403)
+    
+    student_id = request.GET.get('id')
+    search_term = request.GET.get('search')
+    
+    students_query = Admission.objects.select_related('personal')
+    
+    # Search by admission ID
+    if student_id:
+        try:
+            students_query = students_query.filter(id=student_id)
+        except:
+            pass
+    
+    # Search by various fields
+    if search_term:
+        students_query = Admission.objects.select_related('personal').filter(
+            Q(admission_id__icontains=search_term) |
+            Q(student_name__icontains=search_term) |
+            Q(mobile_number__icontains=search_term)
+        )[:5]
+    
+    results = []
+    for student in students_query:
+        # Calculate totals
+        total_expenses = Expense.objects.filter(admission=student).aggregate(Sum('amount'))['amount__sum'] or 0
+        total_payments = Payment.objects.filter(admission=student).aggregate(Sum('amount'))['amount__sum'] or 0
+        total_fee = (student.tms_fees or 0) + (student.admitted_college_fees or 0) + (student.hostel_fees or 0)
+        due = total_fee - total_payments
+        
+        results.append({
+            'id': student.id,
+            'admission_id': student.admission_id or 'N/A',
+            'student_name': student.student_name,
+            'father_name': student.father_name,
+            'mobile': student.mobile_number,
+            'course': student.course,
+            # Card-sized JPEG: callers drop it straight into an <img>
+            'image_url': thumbnail_url(student.student_image, 160, 'jpeg') or None,
+            'total_fee': float(total_fee),
+            'total_payments': float(total_payments),
+            'total_expenses': float(total_expenses),
+            'due': float(due),
+        })
+    
+    return JsonResponse({'results': results})
+
+
+@login_required
+def search_students(request):
+    """API endpoint for searching students - ONLY RETURN ADMITTED STUDENTS"""
+    if request.user.user_type != 'admin':
+        return JsonResponse({'results': []})
+
+    query = request.GET.get('q', '')
+    if len(query) < 2:
+        return JsonResponse({'results': []})
+    
+    # CRITICAL FIX: Only search among ADMITTED students
+    students_query = Admission.objects.for_ledger().filter(
+        is_admitted=True,  # Only admitted students
+    ).filter(
+        Q(student_name__icontains=query) |
+        Q(admission_id__icontains=query) |
+        Q(mobile_number__icontains=query)
+    ).annotate(payments_total=Sum('payments__amount'))[:10]
+    
+    results = []
+    for s in students_query:
+        # Calculate totals
+        total_payments = s.payments_total or 0
+        
+        total_fee = (s.tms_fees or 0) + (s.admitted_college_fees or 0) + (s.hostel_fees or 0)
+        due = total_fee - total_payments
+
+        results.append({
+            'id': s.id,
+            'admission_id': s.admission_id,
+            'student_name': s.student_name,
+            'mobile': s.mobile_number,
+            'course': s.course,
+            'total_fee': float(total_fee),
+            'total_payments': float(total_payments),
+            'due': float(due)
+        })
+    
+    return JsonResponse({'results': results})
+
+
+@login_required
+@revalidated(student_details_etag)
+def get_student_details_by_id(request, student_id):
+    """API endpoint to get student details by ID - ONLY FOR ADMITTED STUDENTS"""
+    if request.user.user_type != 'admin':
+        return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=403)
+
+    try:
+        # CRITICAL FIX: Only get if student is admitted
+        student = Admission.objects.get(id=student_id, is_admitted=True)
+        
+        # Calculate total payments
+        total_payments = Payment.objects.filter(admission=student).aggregate(
+            total=Sum('amount')
+        )['total'] or 0
+        
+        # Calculate total fee
+        total_fee = (student.tms_fees or 0) + (student.admitted_college_fees or 0) + (student.hostel_fees or 0)
+        
+        data = {
+            'id': student.id,
+            'admission_id': student.admission_id,
+            'student_name': student.student_name,
+            'mobile': student.mobile_number,
+            'course': student.course,
+            'total_fee': float(total_fee),
+            'total_payments': float(total_payments),
+        }
+        
+        return JsonResponse({'success': True, 'data': data})
+    except Admission.DoesNotExist:
+        return JsonResponse({'success': False, 'error': 'Admitted student not found'})
+
+
+def _date(value):
+    return value.strftime('%Y-%m-%d') if value else None
+
+
+def _datetime(value):
+    return value.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _money(value):
+    return float(value) if value else 0.0
+
+
+def _text(value):
+    return value or ''
+
+
+# Key in the JSON record -> (Admission field, converter), in response order
+ADMISSION_RECORD_FIELDS = {
+    'id': ('id', None),
+    'admission_id': ('admission_id', None),
+    'student_name': ('student_name', None),
+    'father_name': ('father_name', None),
+    'mother_name': ('mother_name', None),
+    'date_of_birth': ('date_of_birth', _date),
+    'mobile_number': ('mobile_number', None),
+    'whatsapp_number': ('whatsapp_number', None),
+    'blood_group': ('blood_group', None),
+    'category': ('category', None),
+    'adhaar_number': ('adhaar_number', None),
+    'address': ('address', None),
+    'course': ('course', None),
+    'college_name': ('college_name', None),
+    'board_name': ('board_name', None),
+    'college_roll_no': ('college_roll_no', None),
+    'batch': ('batch', None),
+    'eleventh_year': ('eleventh_year', None),
+    'twelfth_year': ('twelfth_year', None),
+    'enrolled_for': ('enrolled_for', None),
+    'sams_login_id': ('sams_login_id', None),
+    'sams_password': ('sams_password', None),
+    'apaar_id': ('apaar_id', None),
+    'hostel_fees': ('hostel_fees', _money),
+    'tms_fees': ('tms_fees', _money),
+    'admitted_college_fees': ('admitted_college_fees', _money),
+    'college_transportation': ('college_transportation', None),
+    'is_admitted': ('is_admitted', None),
+    'created_at': ('created_at', _datetime),
+    'visitor1_name': ('visitor1_name', None),
+    'visitor1_relation': ('visitor1_relation', None),
+    'visitor1_contact': ('visitor1_contact', None),
+    'visitor2_name': ('visitor2_name', None),
+    'visitor2_relation': ('visitor2_relation', None),
+    'visitor2_contact': ('visitor2_contact', None),
+    'academics_accommodation': ('academics_accommodation', None),
+    'subject1': ('subject1', _text),
+    'subject2': ('subject2', _text),
+    'subject3': ('subject3', _text),
+    'subject4': ('subject4', _text),
+    'subject5': ('subject5', _text),
+    'subject6': ('subject6', _text),
+    'college_dress': ('college_dress', None),
+    'books': ('books', None),
+    'tms_dress': ('tms_dress', None),
+    'guardian_signature': ('guardian_signature', None),
+    'student_signature': ('student_signature', None),
+    'tms_signature': ('tms_signature', None),
+}
+BATCH_MAX_IDS = 500
+CHANGE_FEED_MAX_LIMIT = 1000
+
+
+def _detail_value(convert, default):
+    def detail_value(value):
+        value = default if value is None else value
+        return convert(value) if convert else value
+    return detail_value
+
+
+def _record_columns(keys):
+    """``[(key, values() lookup, converter)]`` for the requested record keys.
+
+    Detail fields are read through their one-to-one join. A missing detail
+    row comes back as None and is replaced by the field default, which is
+    what the unsaved record ``Admission.get_detail`` creates would hold.
+    """
+    columns = []
+    for key in keys:
+        name, convert = ADMISSION_RECORD_FIELDS[key]
+        accessor = Admission.DETAIL_FIELDS.get(name)
+        if accessor:
+            default = Admission.DETAIL_MODELS[accessor]._meta.get_field(name).get_default()
+            convert = _detail_value(convert, default)
+            name = f'{accessor}__{name}'
+        columns.append((key, name, convert))
+    return columns
+
+
+def admission_records(queryset, keys=ADMISSION_RECORD_FIELDS):
+    """Yield JSON-ready admission records from one ``values()`` query."""
+    columns = _record_columns(keys)
+    rows = queryset.order_by('id').values_list(*[lookup for _, lookup, _ in columns])
+    for row in rows.iterator(chunk_size=500):
+        yield {
+            key: convert(value) if convert else value
+            for (key, _, convert), value in zip(columns, row)
+        }
+
+
+@login_required
+@revalidated(admission_details_etag)
+def get_complete_admission_details(request, student_id):
+    """API endpoint to get complete admission details by ID"""
+    if request.user.user_type != 'admin':
+        return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=403)
+
+    try:
+        admission_data = next(admission_records(Admission.objects.filter(id=student_id)), None)
+        if admission_data is None:
+            return JsonResponse({'success': False, 'error': 'Student not found'})
+        return JsonResponse({'success': True, 'admission': admission_data})
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)})
+
+
+@login_required
+@gzip_page
+def get_admission_details_batch(request):
+    """Complete admission records for many students in one call.
+
+    Students are chosen with ``ids`` (comma-separated, at most
+    ``BATCH_MAX_IDS``) and/or the ``batch``, ``course`` and ``is_admitted``
+    filters; ``fields`` limits each record to the listed keys (``id`` is
+    always included). ``format=ndjson`` streams one record per line instead
+    of a single JSON document. Records are identical to
+    ``get_complete_admission_details``.
+    """
+    if request.user.user_type != 'admin':
+        return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=403)
+
+    queryset = Admission.objects.all()
+    ids = None
+    if request.GET.get('ids'):
+        try:
+            ids = sorted({int(value) for value in request.GET['ids'].split(',') if value.strip()})
+        except ValueError:
+            return JsonResponse({'success': False, 'error': 'ids must be comma-separated integers'}, status=400)
+        if len(ids) > BATCH_MAX_IDS:
+            return JsonResponse({'success': False, 'error': f'At most {BATCH_MAX_IDS} ids per request'}, status=400)
+        queryset = queryset.filter(id__in=ids)
+    for name in ('batch', 'course'):
+        if request.GET.get(name):
+            queryset = queryset.filter(**{name: request.GET[name]})
+    if request.GET.get('is_admitted') in ('0', '1'):
+        queryset = queryset.filter(is_admitted=request.GET['is_admitted'] == '1')
+
+    keys = list(ADMISSION_RECORD_FIELDS)
+    if request.GET.get('fields'):
+        requested = [key.strip() for key in request.GET['fields'].split(',') if key.strip()]
+        unknown = sorted(set(requested) - set(ADMISSION_RECORD_FIELDS))
+        if unknown:
+            return JsonResponse({'success': False, 'error': f"Unknown fields: {', '.join(unknown)}"}, status=400)
+        keys = [key for key in ADMISSION_RECORD_FIELDS if key == 'id' or key in requested]
+
+    records = admission_records(queryset, keys)
+    if request.GET.get('format') == 'ndjson':
+        return StreamingHttpResponse(
+            (json.dumps(record, cls=DjangoJSONEncoder) + '\n' for record in records),
+            content_type='application/x-ndjson',
+        )
+    records = list(records)
+    data = {'success': True, 'admissions': records}
+    if ids is not None:
+        found = {record['id'] for record in records}
+        data['missing'] = [pk for pk in ids if pk not in found]
+    return JsonResponse(data)
+
+
+def _feed_records(name, ids):
+    if name == 'admission':
+        return list(admission_records(Admission.objects.filter(id__in=ids)))
+    model = FEED_MODELS[name]
+    columns = [field.attname for field in model._meta.concrete_fields]
+    return list(model.objects.filter(id__in=ids).order_by('id').values(*columns))
+
+
+@login_required
+@gzip_page
+def change_feed(request):
+    """Rows created, updated or deleted since the ``since`` token.
+
+    Without ``since`` every row is sent. ``models`` limits the feed to some of
+    admission, payment, expense, studentresult and exam; ``limit`` caps the
+    rows per model and list (at most ``CHANGE_FEED_MAX_LIMIT``). While
+    ``more`` is true, call again with the returned token. Apply each model's
+    ``updated`` records before its ``deleted`` ids.
+    """
+    if request.user.user_type != 'admin':
+        return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=403)
+
+    try:
+        state = read_token(request.GET.get('since'))
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        return JsonResponse({'success': False, 'error': 'Invalid since token'}, status=400)
+    names = list(FEED_MODELS)
+    if request.GET.get('models'):
+        names = [name.strip() for name in request.GET['models'].split(',') if name.strip()]
+        unknown = sorted(set(names) - set(FEED_MODELS))
+        if unknown:
+            return JsonResponse({'success': False, 'error': f"Unknown models: {', '.join(unknown)}"}, status=400)
+    try:
+        limit = min(max(int(request.GET.get('limit', 500)), 1), CHANGE_FEED_MAX_LIMIT)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'limit must be an integer'}, status=400)
+
+    cutoff = settled_cutoff()
+    changes = {}
+    more = False
+    for name in names:
+        changed = changed_rows(FEED_MODELS[name], state['changed'].get(name), cutoff, limit)
+        more = more or len(changed) == limit
+        if changed:
+            pk, updated_at = changed[-1]
+            state['changed'][name] = (updated_at, pk)
+        changes[name] = {'updated': _feed_records(name, [pk for pk, _ in changed]), 'deleted': []}
+
+    deleted = deleted_rows(state['deleted'], names, limit)
+    more = more or len(deleted) == limit
+    for tombstone_id, name, object_id in deleted:
+        changes[name]['deleted'].append(object_id)
+        state['deleted'][name] = tombstone_id
+    return JsonResponse({'success': True, 'token': make_token(state), 'more': more, 'changes': changes})
+
+
+@login_required
+def api_get_students_for_exam(request, exam_id):
+    """API to get students eligible for an exam"""
+    if request.user.user_type != 'admin':
+        return JsonResponse({'error': 'Unauthorized'}, status=403)
+    
+    exam = get_object_or_404(Exam, id=exam_id)
+    
+    students = Admission.objects.filter(
+        is_admitted=True,
+        course__icontains=exam.stream,
+        batch=exam.batch
+    ).values('id', 'student_name', 'admission_id', 'mobile_number').order_by('student_name')
+    
+    return JsonResponse({'students': list(students)})
+
+
+@login_required
+@revalidated(exam_stats_etag)
+def api_get_exam_stats(request, exam_id):
+    """API to get statistics for an exam"""
+    if request.user.user_type != 'admin':
+        return JsonResponse({'error': 'Unauthorized'}, status=403)
+    
+    exam = get_object_or_404(Exam, id=exam_id)
+    
+    total_students = Admission.objects.filter(
+        is_admitted=True,
+        course__icontains=exam.stream,
+        batch=exam.batch
+    ).count()
+    
+    # Count students who have results
+    results = StudentResult.objects.filter(exam=exam)
+    appeared_students = results.filter(is_absent=False).count()
+    completed_students = results.count()
+    
+    return JsonResponse({
+        'total_students': total_students,
+        'appeared_students': appeared_students,
+        'completed_students': completed_students,
+    })
@@ -0,0 +1,165 @@
+"""Exam attendance: the roster register and per-room attendance sheets."""
+import io
+import json
+from xml.sax.saxutils import escape
+
+from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.http import HttpResponse, JsonResponse
+
+from ..models import *
+from ..db import write_transaction
+from .results import exam_roster
+
+
+@login_required
+def exam_attendance(request, exam_id):
+    """Attendance register of one exam's roster.
+
+    GET renders the register. POST takes JSON ``{"present": [student ids],
+    "absent": [student ids]}`` for a whole room and writes it with one bulk
+    upsert on ``(exam, student)``; ids outside the roster, or in both lists,
+    reject the lot.
+    Both run a fixed number of queries whatever the roster size.
+    """
+    if request.user.user_type != 'admin':
+        if request.method == 'POST':
+            return JsonResponse({'success': False, 'error': 'Permission denied'}, status=403)
+        messages.error(request, 'Access denied. Admin only.')
+        return redirect('home')
+
+    exam = get_object_or_404(Exam, id=exam_id)
+    students = exam_roster(exam)
+
+    if request.method != 'POST':
+        attendance = dict(ExamAttendance.objects.filter(exam=exam).values_list('student_id', 'is_present'))
+        rows = [{'student': student, 'is_present': attendance.get(student.id)} for student in students]
+        return render(request, 'institute/exam_attendance.html', {
+            'exam': exam,
+            'rows': rows,
+            'marked': len(attendance),
+            'absent': sum(1 for is_present in attendance.values() if not is_present),
+        })
+
+    try:
+        data = json.loads(request.body.decode('utf-8'))
+        present = {int(pk) for pk in data.get('present', [])}
+        absent = {int(pk) for pk in data.get('absent', [])}
+    except (ValueError, TypeError, AttributeError):
+        return JsonResponse({'success': False, 'error': 'Expected {"present": [...], "absent": [...]}'}, status=400)
+    if present & absent:
+        return JsonResponse({
+            'success': False, 'error': 'Some students are marked both present and absent',
+            'conflicting': sorted(present & absent),
+        }, status=400)
+    marks = {**dict.fromkeys(present, True), **dict.fromkeys(absent, False)}
+    if not marks:
+        return JsonResponse({'success': False, 'error': 'No students given'}, status=400)
+    unknown = set(marks) - {student.id for student in students}
+    if unknown:
+        return JsonResponse({
+            'success': False, 'error': 'Some students are not on this exam\'s roster', 'unknown': sorted(unknown),
+        }, status=400)
+
+    # marked_at (auto_now_add) is stamped on every row, so a re-mark updates it too
+    rows = [
+        ExamAttendance(exam=exam, student_id=student_id, is_present=is_present, marked_by=request.user)
+        for student_id, is_present in marks.items()
+    ]
+
+    @write_transaction
+    def save_attendance():
+        ExamAttendance.objects.bulk_create(
+            rows, update_conflicts=True, unique_fields=['exam', 'student'],
+            update_fields=['is_present', 'marked_by', 'marked_at'],
+        )
+
+    save_attendance()
+    absent = sum(1 for is_present in marks.values() if not is_present)
+    return JsonResponse({'success': True, 'marked': len(rows), 'present': len(rows) - absent, 'absent': absent})
+
+
+@login_required
+def attendance_sheets(request, exam_id):
+    """PDF attendance sheets for the sitting of an exam, one section per room.
+
+    The sitting is every exam on the same date and session (just this exam
+    when it has no date). Rooms come from ``Exam.room_number``; marks already
+    in the register are printed, the rest are left blank for the invigilator.
+    """
+    if request.user.user_type != 'admin':
+        return redirect('home')
+
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+
+    exam = get_object_or_404(Exam, id=exam_id)
+    if exam.exam_date:
+        sitting = list(Exam.objects.filter(exam_date=exam.exam_date, session=exam.session).exclude(
+            status='cancelled'
+        ).order_by('room_number', 'name', 'id'))
+    else:
+        sitting = [exam]
+
+    # One query for the rosters of every batch sitting, one for the register
+    students = list(Admission.objects.for_roster().filter(
+        is_admitted=True, batch__in={sat.batch for sat in sitting}
+    ).order_by('student_name'))
+    attendance = {
+        (sat_id, student_id): is_present for sat_id, student_id, is_present in
+        ExamAttendance.objects.filter(exam__in=sitting).values_list('exam_id', 'student_id', 'is_present')
+    }
+    rooms = {}
+    for sat in sitting:
+        rooms.setdefault(sat.room_number.strip() or 'Unassigned', []).append(sat)
+
+    styles = getSampleStyleSheet()
+    when = f"{exam.exam_date.strftime('%d/%m/%Y')}, {exam.get_session_display()}" if exam.exam_date else exam.name
+    elements = []
+    for room, exams in rooms.items():
+        if elements:
+            elements.append(PageBreak())
+        elements += [
+            Paragraph("THE MOTHER INSTITUTE OF SCIENCE", styles['Title']),
+            Paragraph(escape(f"ATTENDANCE SHEET - ROOM {room.upper()}"), styles['Heading2']),
+            Paragraph(escape(when), styles['Normal']),
+        ]
+        for sat in exams:
+            roster = exam_roster(sat, students)
+            elements += [
+                Spacer(1, 14),
+                Paragraph(escape(f"{sat.name} - {sat.get_subject_display()} ({sat.batch}) | "
+                                 f"Invigilator: {sat.invigilator or '________________'}"), styles['Heading4']),
+            ]
+            data = [["#", "Admission ID", "Student Name", "P / A", "Signature"]]
+            for number, student in enumerate(roster, 1):
+                is_present = attendance.get((sat.id, student.id))
+                data.append([
+                    number, student.admission_id, student.student_name,
+                    '' if is_present is None else 'P' if is_present else 'A', '',
+                ])
+            table = Table(data, colWidths=[30, 90, 200, 45, 120], repeatRows=1)
+            table.setStyle(TableStyle([
+                ('FONTSIZE', (0, 0), (-1, -1), 9),
+                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+                ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('ALIGN', (3, 0), (3, -1), 'CENTER'),
+                ('TOPPADDING', (0, 1), (-1, -1), 7),
+                ('BOTTOMPADDING', (0, 1), (-1, -1), 7),
+            ]))
+            elements += [table, Spacer(1, 6), Paragraph(
+                f"Students: {len(roster)} &nbsp;&nbsp; Present: ______ &nbsp;&nbsp; Absent: ______ "
+                f"&nbsp;&nbsp; Invigilator's signature: ________________", styles['Normal'],
+            )]
+
+    buffer = io.BytesIO()
+    SimpleDocTemplate(buffer, pagesize=A4, topMargin=40, bottomMargin=40).build(elements)
+    buffer.seek(0)
+    response = HttpResponse(buffer, content_type='application/pdf')
+    name = exam.exam_date.strftime('%Y%m%d') + f'_{exam.session}' if exam.exam_date else f'exam_{exam.id}'
+    response['Content-Disposition'] = f'attachment; filename="attendance_{name}.pdf"'
+    return response
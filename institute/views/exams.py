@@ -0,0 +1,144 @@
+"""Exam management views."""
+from datetime import date
+
+from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.db.models import Q
+from django.core.paginator import Paginator
+
+from ..models import *
+from ..forms import *
+
+
+@login_required
+def exam_dashboard(request):
+    """Main exam dashboard showing overview"""
+    if request.user.user_type != 'admin':
+        return redirect('home')
+    
+    # Statistics
+    total_exams = Exam.objects.count()
+    scheduled_exams = Exam.objects.filter(status='scheduled').count()
+    completed_exams = Exam.objects.filter(status='completed').count()
+    ongoing_exams = Exam.objects.filter(status='ongoing').count()
+    
+    # Today's exams
+    today_exams = Exam.objects.filter(exam_date=date.today()).order_by('start_time')[:5]
+    
+    # Upcoming exams
+    upcoming_exams = Exam.objects.filter(
+        exam_date__gt=date.today()
+    ).order_by('exam_date')[:10]
+    
+    context = {
+        'total_exams': total_exams,
+        'scheduled_exams': scheduled_exams,
+        'completed_exams': completed_exams,
+        'ongoing_exams': ongoing_exams,
+        'today_exams': today_exams,
+        'upcoming_exams': upcoming_exams,
+    }
+    return render(request, 'institute/exam_dashboard.html', context)
+
+
+@login_required
+def exam_list(request):
+    """List all exams"""
+    if request.user.user_type != 'admin':
+        return redirect('home')
+    
+    exams = Exam.objects.all().order_by('-exam_date')
+    
+    # Filter by status
+    status = request.GET.get('status', '')
+    if status:
+        exams = exams.filter(status=status)
+    
+    # Search
+    search_query = request.GET.get('search', '')
+    if search_query:
+        exams = exams.filter(
+            Q(name__icontains=search_query) |
+            Q(batch__icontains=search_query) |
+            Q(subject__icontains=search_query)
+        )
+    
+    paginator = Paginator(exams, 10)
+    page = request.GET.get('page', 1)
+    
+    try:
+        exams_page = paginator.page(page)
+    except:
+        exams_page = paginator.page(1)
+    
+    context = {
+        'exams': exams_page,
+        'status': status,
+        'search_query': search_query,
+    }
+    return render(request, 'institute/exam_list.html', context)
+
+
+@login_required
+def add_exam(request):
+    """Add a new exam"""
+    if request.user.user_type != 'admin':
+        return redirect('home')
+    
+    if request.method == 'POST':
+        form = ExamForm(request.POST)
+        if form.is_valid():
+            exam = form.save(commit=False)
+            exam.created_by = request.user
+            exam.save()
+            
+            messages.success(request, f'Exam "{exam.name}" created successfully!')
+            return redirect('exam_list')
+    else:
+        form = ExamForm()
+    
+    return render(request, 'institute/exam_form.html', {
+        'form': form,
+        'title': 'Create New Exam'
+    })
+
+
+@login_required
+def edit_exam(request, exam_id):
+    """Edit an exam"""
+    if request.user.user_type != 'admin':
+        return redirect('home')
+    
+    exam = get_object_or_404(Exam, id=exam_id)
+    
+    if request.method == 'POST':
+        form = ExamForm(request.POST, instance=exam)
+        if form.is_valid():
+            form.save()
+            messages.success(request, f'Exam "{exam.name}" updated successfully!')
+            return redirect('exam_list')
+    else:
+        form = ExamForm(instance=exam)
+    
+    return render(request, 'institute/exam_form.html', {
+        'form': form,
+        'exam': exam,
+        'title': 'Edit Exam'
+    })
+
+
+@login_required
+def delete_exam(request, exam_id):
+    """Delete an exam"""
+    if request.user.user_type != 'admin':
+        messages.error(request, 'Permission denied')
+        return redirect('exam_list')
+    
+    if request.method == 'POST':
+        exam = get_object_or_404(Exam, id=exam_id)
+        name = exam.name
+        exam.delete()
+        messages.success(request, f'Exam "{name}" deleted successfully!')
+    
+    return redirect('exam_list')
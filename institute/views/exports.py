@@ -0,0 +1,166 @@
+"""Streaming CSV/XLSX downloads of registrations, the ledger, exam results and marks matrices."""
+from django.shortcuts import redirect, get_object_or_404
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponseBadRequest
+from django.db.models import CharField, F, FilteredRelation, Q, Value
+from django.utils.dateparse import parse_date
+
+from ..models import *
+from ..exports import EXPORT_CHUNK_SIZE, export_response
+from ..marks import MarksMatrix
+from .admissions import search_registrations
+from .results import SUBJECT_FIELDS, exam_subject, takes_subject
+
+# (column header, values_list lookup)
+ADMISSION_EXPORT_COLUMNS = (
+    ('Admission ID', 'admission_id'),
+    ('Student Name', 'student_name'),
+    ("Father's Name", 'personal__father_name'),
+    ("Mother's Name", 'personal__mother_name'),
+    ('Date of Birth', 'personal__date_of_birth'),
+    ('Mobile', 'mobile_number'),
+    ('WhatsApp', 'personal__whatsapp_number'),
+    ('Category', 'personal__category'),
+    ('Batch', 'batch'),
+    ('Course', 'course'),
+    ('Enrolled For', 'enrolled_for'),
+    ('Previous College', 'personal__college_name'),
+    ('TMS Fees', 'tms_fees'),
+    ('College Fees', 'admitted_college_fees'),
+    ('Hostel Fees', 'hostel_fees'),
+    ('Admitted', 'is_admitted'),
+    ('Admission Date', 'admission_date'),
+    ('Registered On', 'created_at'),
+)
+LEDGER_EXPORT_HEADER = (
+    'Date', 'Entry', 'Admission ID', 'Student Name', 'Type / Category', 'Method',
+    'Description', 'Amount', 'Receipt No.', 'Recorded On',
+)
+RESULT_EXPORT_HEADER = (
+    'Sl. No.', 'Admission ID', 'Student Name', 'Marks Obtained', 'Status', 'Percentage', 'Grade', 'Absent', 'Remarks',
+)
+
+
+def parse_date_param(request, name):
+    """``(date or None, error)`` for an optional YYYY-MM-DD query parameter."""
+    value = request.GET.get(name, '')
+    if not value:
+        return None, None
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    return parsed, None if parsed else f'{name} must be a date (YYYY-MM-DD)'
+
+
+@login_required
+def export_admissions(request):
+    """Registrations, filtered like view_registrations plus batch/course/admitted"""
+    if request.user.user_type != 'admin':
+        return redirect('home')
+
+    admissions = Admission.objects.all()
+    search_query = request.GET.get('search', '')
+    if search_query:
+        admissions = search_registrations(admissions, search_query)
+    for param in ('batch', 'course'):
+        if request.GET.get(param):
+            admissions = admissions.filter(**{param: request.GET[param]})
+    if request.GET.get('is_admitted') in ('0', '1'):
+        admissions = admissions.filter(is_admitted=request.GET['is_admitted'] == '1')
+
+    rows = admissions.order_by('-created_at', '-id').values_list(
+        *(lookup for _, lookup in ADMISSION_EXPORT_COLUMNS)
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    header = [title for title, _ in ADMISSION_EXPORT_COLUMNS]
+    return export_response(request.GET.get('format'), 'registrations', header, rows, 'Registrations')
+
+
+@login_required
+def export_ledger(request):
+    """Every payment and expense between ``start`` and ``end``, oldest first"""
+    if request.user.user_type != 'admin':
+        return redirect('home')
+
+    start, start_error = parse_date_param(request, 'start')
+    end, end_error = parse_date_param(request, 'end')
+    if start_error or end_error:
+        return HttpResponseBadRequest(start_error or end_error)
+    dates = Q()
+    if start:
+        dates &= Q(date__gte=start)
+    if end:
+        dates &= Q(date__lte=end)
+
+    # Both sides annotate the columns they differ in, so the UNION lines up
+    text = CharField()
+    payments = Payment.objects.filter(dates).annotate(
+        entry=Value('Payment', output_field=text), heading=F('payment_type'),
+        method=F('payment_method'), receipt=F('receipt_number'),
+    )
+    expenses = Expense.objects.filter(dates).annotate(
+        entry=Value('Expense', output_field=text), heading=F('category'),
+        method=Value('', output_field=text), receipt=Value('', output_field=text),
+    )
+    columns = ('date', 'entry', 'admission__admission_id', 'admission__student_name', 'heading', 'method',
+               'description', 'amount', 'receipt', 'created_at')
+    rows = payments.values_list(*columns).union(expenses.values_list(*columns), all=True).order_by(
+        'date', 'created_at'
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    filename = 'ledger' + (f'_{start}' if start else '') + (f'_to_{end}' if end else '')
+    return export_response(request.GET.get('format'), filename, LEDGER_EXPORT_HEADER, rows, 'Ledger')
+
+
+@login_required
+def export_exam_results(request, exam_id):
+    """The result_list roster of an exam with marks, status and grade"""
+    if request.user.user_type != 'admin':
+        return redirect('home')
+
+    exam = get_object_or_404(Exam, id=exam_id)
+    search_terms = exam_subject(exam)[2]
+    # One LEFT JOIN picks up this exam's result, if any, for every student
+    roster = Admission.objects.filter(is_admitted=True, batch=exam.batch).annotate(
+        result=FilteredRelation('exam_results', condition=Q(exam_results__exam=exam)),
+    ).order_by('student_name', 'id').values_list(
+        'admission_id', 'student_name', *SUBJECT_FIELDS,
+        'result__id', 'result__marks_obtained', 'result__is_absent', 'result__remarks',
+    )
+
+    def rows():
+        number = 0
+        for admission_id, student_name, *subjects, result_id, marks, is_absent, remarks in roster.iterator(
+            chunk_size=EXPORT_CHUNK_SIZE
+        ):
+            if not takes_subject(subjects, search_terms):
+                continue
+            number += 1
+            if result_id is None:
+                yield [number, admission_id, student_name, None, 'Not entered', None, 'N/A', False, '']
+                continue
+            result = StudentResult(exam=exam, marks_obtained=marks, is_absent=is_absent)
+            if is_absent:
+                yield [number, admission_id, student_name, None, 'Absent', None, result.grade, True, remarks]
+                continue
+            status = 'Pass' if marks >= exam.passing_marks else 'Fail'
+            yield [number, admission_id, student_name, marks, status, round(result.percentage, 2),
+                   result.grade, False, remarks]
+
+    filename = f'exam_{exam.id}_results'
+    return export_response(request.GET.get('format'), filename, RESULT_EXPORT_HEADER, rows(), 'Results')
+
+
+@login_required
+def export_marks_matrix(request):
+    """The marks_matrix grid of a batch, all students, with totals and ranks"""
+    if request.user.user_type != 'admin':
+        return redirect('home')
+
+    batch = request.GET.get('batch', '')
+    if not batch:
+        return HttpResponseBadRequest('batch is required')
+    order = 'rank' if request.GET.get('order') == 'rank' else 'name'
+    matrix = MarksMatrix.for_batch(batch)
+    filename = 'marks_' + ''.join(c if c.isalnum() or c in '-_' else '_' for c in batch)
+    return export_response(request.GET.get('format'), filename, matrix.header(), matrix.export_rows(order), 'Marks')
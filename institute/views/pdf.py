@@ -0,0 +1,768 @@
+"""PDF receipts, account reports and report cards.
+
+ReportLab is imported inside each view so it is only loaded once a PDF
+is actually requested."""
+import io
+from datetime import datetime
+
+from django.shortcuts import redirect, get_object_or_404
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, HttpResponse
+from django.contrib import messages
+from django.db.models import Sum
+
+from ..models import *
+from ..forms import *
+from ..archive import get_live_or_archived
+
+
+def receipt_elements(payment, styles):
+    """Flowables of one payment receipt page."""
+    from reportlab.lib import colors
+    from reportlab.platypus import Table, TableStyle, Paragraph, Spacer
+
+    elements = []
+    
+    # Header
+    elements.append(Paragraph("THE MOTHER INSTITUTE OF SCIENCE", styles['Title']))
+    elements.append(Paragraph("Trilochanpada, Jajpur Town, Near Maa Biraja Temple", styles['Normal']))
+    elements.append(Paragraph("Contact: +91 9439387324", styles['Normal']))
+    elements.append(Spacer(1, 20))
+    
+    # Receipt title
+    elements.append(Paragraph("PAYMENT RECEIPT", styles['Heading1']))
+    elements.append(Spacer(1, 20))
+    
+    # Receipt details
+    receipt_data = [
+        ['Receipt Number:', payment.receipt_number],
+        ['Date:', payment.date.strftime('%d/%m/%Y')],
+        ['Student Name:', payment.admission.student_name],
+        ['Admission ID:', payment.admission.admission_id],
+        ['Payment Type:', payment.get_payment_type_display()],
+        ['Payment Method:', payment.get_payment_method_display()],
+        ['Amount:', f'₹{payment.amount}'],
+        ['Description:', payment.description],
+        ['Received By:', payment.received_by.username if payment.received_by else ''],
+    ]
+    
+    receipt_table = Table(receipt_data, colWidths=[150, 300])
+    receipt_table.setStyle(TableStyle([
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+        ('PADDING', (0, 0), (-1, -1), 10),
+    ]))
+    
+    elements.append(receipt_table)
+    elements.append(Spacer(1, 30))
+    
+    # Signature
+    elements.append(Paragraph("Authorized Signature", styles['Normal']))
+    elements.append(Spacer(1, 50))
+    elements.append(Paragraph("_________________________", styles['Normal']))
+    return elements
+
+
+@login_required
+def generate_receipt(request, payment_id):
+    if request.user.user_type != 'admin':
+        return redirect('home')
+
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate
+    from reportlab.lib.styles import getSampleStyleSheet
+    
+    payment = get_object_or_404(Payment, id=payment_id)
+    
+    # Create PDF receipt
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    doc.build(receipt_elements(payment, getSampleStyleSheet()))
+    
+    buffer.seek(0)
+    response = HttpResponse(buffer, content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="receipt_{payment.receipt_number}.pdf"'
+    
+    return response
+
+
+# Receipts per combined PDF, the size of one fee counter batch
+RECEIPTS_PDF_MAX = 200
+
+
+@login_required
+def generate_receipts(request):
+    """One PDF with a receipt page for each payment in ``?ids=1,2,3``"""
+    if request.user.user_type != 'admin':
+        return redirect('home')
+
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, PageBreak
+    from reportlab.lib.styles import getSampleStyleSheet
+
+    ids = [int(pk) for pk in request.GET.get('ids', '').split(',') if pk.strip().isdigit()][:RECEIPTS_PDF_MAX]
+    payments = list(Payment.objects.filter(id__in=ids).select_related('admission', 'received_by').order_by('id'))
+    if not payments:
+        raise Http404('No payments found')
+
+    styles = getSampleStyleSheet()
+    elements = []
+    for payment in payments:
+        if elements:
+            elements.append(PageBreak())
+        elements.extend(receipt_elements(payment, styles))
+
+    buffer = io.BytesIO()
+    SimpleDocTemplate(buffer, pagesize=letter).build(elements)
+    buffer.seek(0)
+    response = HttpResponse(buffer, content_type='application/pdf')
+    first, last = payments[0].receipt_number, payments[-1].receipt_number
+    name = first if first == last else f'{first}-{last}'
+    response['Content-Disposition'] = f'attachment; filename="receipts_{name}.pdf"'
+    return response
+
+
+@login_required
+def account_report(request, admission_id):
+    if request.user.user_type != 'admin':
+        return redirect('home')
+
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib import colors
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet
+    
+    admission = get_live_or_archived(Admission, id=admission_id)
+    expenses = admission.expenses.order_by('date')
+    payments = admission.payments.order_by('date')
+    
+    # Calculate totals
+    total_expenses = expenses.aggregate(Sum('amount'))['amount__sum'] or 0
+    total_payments = payments.aggregate(Sum('amount'))['amount__sum'] or 0
+    balance = total_payments - total_expenses
+    
+    # Create ledger data
+    ledger_data = []
+    running_balance = 0
+    
+    # Combine and sort all transactions by date
+    all_transactions = []
+    
+    for expense in expenses:
+        all_transactions.append({
+            'date': expense.date,
+            'type': 'Expense',
+            'category': expense.get_category_display(),
+            'amount': -expense.amount,
+            'description': expense.description
+        })
+    
+    for payment in payments:
+        all_transactions.append({
+            'date': payment.date,
+            'type': 'Payment',
+            'category': payment.get_payment_type_display(),
+            'amount': payment.amount,
+            'description': payment.description,
+            'receipt_no': payment.receipt_number,
+            'method': payment.get_payment_method_display()
+        })
+    
+    # Sort transactions by date
+    all_transactions.sort(key=lambda x: x['date'])
+    
+    # Calculate running balance
+    for transaction in all_transactions:
+        running_balance += transaction['amount']
+        ledger_data.append({
+            'date': transaction['date'],
+            'type': transaction['type'],
+            'category': transaction['category'],
+            'amount': abs(transaction['amount']),
+            'description': transaction['description'],
+            'balance': running_balance,
+            'receipt_no': transaction.get('receipt_no', ''),
+            'method': transaction.get('method', '')
+        })
+    
+    # Create PDF report with new design
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    elements = []
+    
+    styles = getSampleStyleSheet()
+    normal = styles["Normal"]
+    
+    # Header with logo and institute details
+    header_data = [
+        ["THE MOTHER INSTITUTE OF SCIENCE"],
+        ["Account Ledger Report"],
+        ["Generated on: " + datetime.now().strftime("%d/%m/%Y %H:%M:%S")]
+    ]
+    
+    header_table = Table(header_data)
+    header_table.setStyle(TableStyle([
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (0, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (0, 0), 16),
+        ('FONTSIZE', (0, 1), (0, 1), 14),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ('TOPPADDING', (0, 0), (-1, -1), 12),
+    ]))
+    
+    elements.append(header_table)
+    elements.append(Spacer(1, 10))
+    
+    # Student Information Section
+    student_info = [
+    ["Student Details", "Contact Information", "Academic Information"],
+    [
+        Paragraph(
+            f"""
+            <b>Name:</b> {admission.student_name}<br/>
+            <b>Father:</b> {admission.father_name}<br/>
+            <b>Admission ID:</b> {admission.admission_id}
+            """,
+            normal
+        ),
+
+        Paragraph(
+            f"""
+            <b>Mobile:</b> {admission.mobile_number}<br/>
+            <b>Address:</b> {admission.address}...
+            """,
+            normal
+        ),
+
+        Paragraph(
+            f"""
+            <b>Course:</b> {admission.course}
+            """,
+            normal
+        ),
+    ]
+]
+
+    
+    student_table = Table(student_info, colWidths=[180, 180, 180])
+    student_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('PADDING', (0, 0), (-1, -1), 6),
+    ]))
+    
+    elements.append(student_table)
+    elements.append(Spacer(1, 15))
+    
+    # Summary Section
+    summary_data = [
+        ["Total Payments", "Total Expenses", "Current Balance"],
+        [f"₹{total_payments:.2f}", f"₹{total_expenses:.2f}", f"₹{balance:.2f}"]
+    ]
+    
+    summary_table = Table(summary_data, colWidths=[180, 180, 180])
+    summary_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1e3a8a')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('FONTSIZE', (0, 1), (-1, 1), 14),
+        ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-Bold'),
+        ('PADDING', (0, 0), (-1, -1), 8),
+    ]))
+    
+    elements.append(summary_table)
+    elements.append(Spacer(1, 20))
+    
+    # Ledger Title
+    elements.append(Paragraph("Transaction Ledger", styles['Heading2']))
+    elements.append(Spacer(1, 10))
+    
+    # Ledger Table
+    if ledger_data:
+        ledger_table_data = [
+            ["Date", "Type", "Category", "Description", "Amount", "Balance", "Receipt/Method"]
+        ]
+        
+        for entry in ledger_data:
+            # Determine amount color and sign
+            if entry['type'] == 'Payment':
+                amount_display = f"₹{entry['amount']:.2f}"
+                amount_color = colors.green
+            else:
+                amount_display = f"-₹{entry['amount']:.2f}"
+                amount_color = colors.red
+            
+            # Determine balance color
+            if entry['balance'] >= 0:
+                balance_color = colors.green
+            else:
+                balance_color = colors.red
+            
+            # Add receipt info for payments
+            if entry['type'] == 'Payment':
+                receipt_info = f"Receipt: {entry['receipt_no']}\nMethod: {entry['method']}"
+            else:
+                receipt_info = "-"
+            
+            ledger_table_data.append([
+                entry['date'].strftime("%d/%m/%Y"),
+                entry['type'],
+                entry['category'],
+                entry['description'][:30],
+                amount_display,
+                f"₹{entry['balance']:.2f}",
+                receipt_info
+            ])
+        
+        # Create ledger table
+        ledger_table = Table(ledger_table_data, colWidths=[60, 60, 70, 120, 70, 80, 100])
+        ledger_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 9),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('FONTSIZE', (0, 1), (-1, -1), 8),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('PADDING', (0, 0), (-1, -1), 4),
+        ]))
+        
+        # Apply conditional formatting for amounts
+        row_index = 1
+        for entry in ledger_data:
+            if entry['type'] == 'Payment':
+                ledger_table.setStyle(TableStyle([
+                    ('TEXTCOLOR', (4, row_index), (4, row_index), colors.green),
+                ]))
+            else:
+                ledger_table.setStyle(TableStyle([
+                    ('TEXTCOLOR', (4, row_index), (4, row_index), colors.red),
+                ]))
+            
+            if entry['balance'] >= 0:
+                ledger_table.setStyle(TableStyle([
+                    ('TEXTCOLOR', (5, row_index), (5, row_index), colors.green),
+                ]))
+            else:
+                ledger_table.setStyle(TableStyle([
+                    ('TEXTCOLOR', (5, row_index), (5, row_index), colors.red),
+                ]))
+            
+            row_index += 1
+        
+        elements.append(ledger_table)
+    else:
+        elements.append(Paragraph("No transactions recorded.", styles['Normal']))
+    
+    elements.append(Spacer(1, 20))
+    
+    # Footer with signatures
+    footer_data = [
+        ["Prepared By:", "Checked By:", "Approved By:"],
+        ["_________________________", "_________________________", "_________________________"],
+        [request.user.username, "Accountant", "Director"]
+    ]
+    
+    footer_table = Table(footer_data, colWidths=[180, 180, 180])
+    footer_table.setStyle(TableStyle([
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('TOPPADDING', (0, 0), (-1, -1), 20),
+    ]))
+    
+    elements.append(footer_table)
+    
+    # Build PDF
+    doc.build(elements)
+    
+    buffer.seek(0)
+    response = HttpResponse(buffer, content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="account_ledger_{admission.admission_id}.pdf"'
+    
+    return response
+
+
+def generate_report_card_pdf(request, exam_id, student_id):
+    """Generate PDF report card for a student"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib import colors
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.enums import TA_CENTER
+
+    try:
+        student = get_live_or_archived(Admission, id=student_id, is_admitted=True)
+        exam = get_object_or_404(Exam.objects.using(student._state.db), id=exam_id)
+        
+        # Check if student actually takes this subject
+        exam_subject = exam.subject
+        if '_11' in exam_subject:
+            base_subject = exam_subject.replace('_11', '')
+        elif '_12' in exam_subject:
+            base_subject = exam_subject.replace('_12', '')
+        else:
+            base_subject = exam_subject
+        
+        # Get student's subjects
+        student_subjects = []
+        if student.subject1:
+            student_subjects.append(student.subject1.lower())
+        if student.subject2:
+            student_subjects.append(student.subject2.lower())
+        if student.subject3:
+            student_subjects.append(student.subject3.lower())
+        if student.subject4:
+            student_subjects.append(student.subject4.lower())
+        if student.subject5:
+            student_subjects.append(student.subject5.lower())
+        if student.subject6:
+            student_subjects.append(student.subject6.lower())
+        
+        # Map subject codes
+        subject_map = {
+            'odia': 'odia',
+            'english': 'english',
+            'physics': 'physics',
+            'chemistry': 'chemistry',
+            'mathematics': 'mathematics',
+            'biology': 'biology',
+            'it': 'information technology',
+            'electronics': 'electronics',
+        }
+        
+        compare_subject = subject_map.get(base_subject.lower(), base_subject.lower())
+        
+        # Verify student takes this subject
+        takes_subject = False
+        for student_subj in student_subjects:
+            if compare_subject in student_subj or student_subj in compare_subject:
+                takes_subject = True
+                break
+        
+        if not takes_subject:
+            messages.error(request, f'{student.student_name} does not take {exam.get_subject_display()}')
+            return redirect('report_card')
+        
+        # Get student result for this exam
+        try:
+            result = student.exam_results.get(exam=exam)
+        except StudentResult.DoesNotExist:
+            result = None
+        standing = None
+        if result and not result.is_absent:
+            standing = StudentResult.objects.using(student._state.db).standing(exam, student.id)
+        
+        # Create a file-like buffer to receive PDF data
+        buffer = io.BytesIO()
+        
+        # Create the PDF object
+        doc = SimpleDocTemplate(buffer, pagesize=A4, 
+                                rightMargin=72, leftMargin=72,
+                                topMargin=72, bottomMargin=72)
+        
+        # Container for the 'Flowable' objects
+        elements = []
+        
+        # Get styles
+        styles = getSampleStyleSheet()
+        title_style = styles['Title']
+        heading_style = styles['Heading2']
+        normal_style = styles['Normal']
+        
+        # Create custom styles
+        center_style = ParagraphStyle(
+            'CenterStyle',
+            parent=styles['Normal'],
+            alignment=TA_CENTER,
+            spaceAfter=12
+        )
+        
+        # Header with Institute Name
+        elements.append(Paragraph("THE MOTHER INSTITUTE OF SCIENCE", title_style))
+        elements.append(Paragraph("Excellence in Science Education", center_style))
+        elements.append(Paragraph("Trilochanpada, Jajpur Town, Near Maa Biraja Temple", center_style))
+        elements.append(Paragraph("Contact: +91 9439387324 | Email: contact@motherinstitute.edu", center_style))
+        elements.append(Spacer(1, 20))
+        
+        # Report Card Title
+        elements.append(Paragraph("STUDENT REPORT CARD", heading_style))
+        elements.append(Spacer(1, 10))
+        
+        # Exam Details
+        exam_details = [
+            ["Exam Name:", exam.name],
+            ["Subject:", exam.get_subject_display()],
+            ["Exam Date:", exam.exam_date.strftime('%d/%m/%Y') if exam.exam_date else 'N/A'],
+            ["Batch:", exam.batch],
+            ["Maximum Marks:", str(exam.total_marks)],
+            ["Passing Marks:", str(exam.passing_marks)],
+        ]
+        
+        exam_table = Table(exam_details, colWidths=[120, 300])
+        exam_table.setStyle(TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+            ('PADDING', (0, 0), (-1, -1), 6),
+        ]))
+        
+        elements.append(exam_table)
+        elements.append(Spacer(1, 20))
+        
+        # Student Details
+        student_details = [
+            ["Student Name:", student.student_name],
+            ["Admission ID:", student.admission_id],
+            ["Father's Name:", student.father_name],
+            ["Mother's Name:", student.mother_name],
+            ["Course:", student.course],
+            ["Mobile:", student.mobile_number],
+        ]
+        
+        student_table = Table(student_details, colWidths=[120, 300])
+        student_table.setStyle(TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+            ('PADDING', (0, 0), (-1, -1), 6),
+        ]))
+        
+        elements.append(student_table)
+        elements.append(Spacer(1, 20))
+        
+        # Result Details
+        if result:
+            marks_obtained = result.marks_obtained if not result.is_absent else 0
+            percentage = (marks_obtained / exam.total_marks * 100) if exam.total_marks > 0 and not result.is_absent else 0
+            status = "Absent" if result.is_absent else ("Pass" if marks_obtained >= exam.passing_marks else "Fail")
+            
+            # Determine grade
+            if result.is_absent:
+                grade = "AB"
+            elif percentage >= 90:
+                grade = "A+"
+            elif percentage >= 80:
+                grade = "A"
+            elif percentage >= 70:
+                grade = "B+"
+            elif percentage >= 60:
+                grade = "B"
+            elif percentage >= 50:
+                grade = "C"
+            elif percentage >= 33:
+                grade = "D"
+            else:
+                grade = "F"
+            
+            result_details = [
+                ["Marks Obtained:", f"{marks_obtained} / {exam.total_marks}"],
+                ["Percentage:", f"{percentage:.1f}%"],
+                ["Status:", status],
+                ["Grade:", grade],
+            ]
+            if standing:
+                result_details += [
+                    ["Class Rank:", f"{standing['rank']} of {standing['appeared']}"],
+                    ["Percentile:", f"{standing['percentile']:.1f}"],
+                ]
+            result_details.append(["Remarks:", result.remarks if result.remarks else "-"])
+        else:
+            result_details = [
+                ["Marks Obtained:", "Not Available"],
+                ["Percentage:", "Not Available"],
+                ["Status:", "Not Available"],
+                ["Grade:", "Not Available"],
+                ["Remarks:", "No result found"],
+            ]
+        
+        result_table = Table(result_details, colWidths=[120, 300])
+        result_table.setStyle(TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+            ('TEXTCOLOR', (1, 2), (1, 2), colors.green if status == 'Pass' else colors.red),
+            ('PADDING', (0, 0), (-1, -1), 6),
+        ]))
+        
+        elements.append(result_table)
+        elements.append(Spacer(1, 30))
+        
+        # Signatures
+        signature_data = [
+            ["_________________________", "_________________________", "_________________________"],
+            ["Class Teacher", "Principal", "Director"],
+            ["Date: " + datetime.now().strftime("%d/%m/%Y"), "", ""],
+        ]
+        
+        signature_table = Table(signature_data, colWidths=[200, 200, 200])
+        signature_table.setStyle(TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('TOPPADDING', (0, 1), (-1, 1), 5),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 0),
+        ]))
+        
+        elements.append(signature_table)
+        
+        # Build PDF
+        doc.build(elements)
+        
+        # Get the value of the buffer
+        pdf = buffer.getvalue()
+        buffer.close()
+        
+        # Create the HttpResponse
+        response = HttpResponse(content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="report_card_{student.admission_id}_{exam.name}.pdf"'
+        response['Content-Length'] = len(pdf)
+        response.write(pdf)
+        
+        return response
+        
+    except Exception as e:
+        messages.error(request, f'Error generating report card: {str(e)}')
+        return redirect('report_card')
+
+
+def term_card_elements(term, results, ranked, styles):
+    """Flowables of one consolidated report card: the exams taken, then the TermResult totals."""
+    from reportlab.lib import colors
+    from reportlab.platypus import Table, TableStyle, Paragraph, Spacer
+
+    subjects = dict(Exam.SUBJECT_CHOICES)
+    period = term.get_exam_type_display() or 'Academic Year'
+    elements = [
+        Paragraph("THE MOTHER INSTITUTE OF SCIENCE", styles['Title']),
+        Paragraph("Trilochanpada, Jajpur Town, Near Maa Biraja Temple", styles['Normal']),
+        Spacer(1, 20),
+        Paragraph(f"CONSOLIDATED REPORT CARD - {period.upper()}", styles['Heading2']),
+        Spacer(1, 10),
+    ]
+
+    student_table = Table([
+        ["Student Name:", term.student.student_name],
+        ["Admission ID:", term.student.admission_id],
+        ["Course:", term.student.course],
+        ["Batch:", term.batch],
+    ], colWidths=[120, 330])
+    student_table.setStyle(TableStyle([
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+        ('PADDING', (0, 0), (-1, -1), 6),
+    ]))
+    elements += [student_table, Spacer(1, 20)]
+
+    marks_data = [["Exam", "Subject", "Date", "Marks", "Out Of"]]
+    for name, subject, exam_date, out_of, marks, is_absent in results:
+        marks_data.append([
+            name, subjects.get(subject, subject), exam_date.strftime('%d/%m/%Y') if exam_date else '-',
+            "AB" if is_absent else f"{marks:g}", str(out_of),
+        ])
+    marks_data.append(["Total", "", "", f"{term.total:g}", str(term.out_of)])
+    marks_table = Table(marks_data, colWidths=[130, 150, 70, 50, 50], repeatRows=1)
+    marks_table.setStyle(TableStyle([
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+        ('ALIGN', (3, 0), (-1, -1), 'RIGHT'),
+        ('PADDING', (0, 0), (-1, -1), 5),
+    ]))
+    elements += [marks_table, Spacer(1, 20)]
+
+    summary_table = Table([
+        ["Exams:", str(term.exams)],
+        ["Percentage:", f"{term.percentage}%"],
+        ["Grade:", term.grade],
+        ["Class Rank:", f"{term.rank} of {ranked}" if term.rank else "-"],
+    ], colWidths=[120, 330])
+    summary_table.setStyle(TableStyle([
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+        ('PADDING', (0, 0), (-1, -1), 6),
+    ]))
+    elements += [summary_table, Spacer(1, 40)]
+
+    signature_table = Table([
+        ["_________________________", "_________________________", "_________________________"],
+        ["Class Teacher", "Principal", "Director"],
+    ], colWidths=[150, 150, 150])
+    signature_table.setStyle(TableStyle([
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ]))
+    elements.append(signature_table)
+    return elements
+
+
+def generate_term_report_cards_pdf(request, batch, exam_type, student_id=None):
+    """One consolidated report card page per TermResult of the partition, or of one student.
+
+    Totals, grade and rank come from the stored TermResult row; the exam list
+    under it is one query for all the cards.
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, PageBreak
+    from reportlab.lib.styles import getSampleStyleSheet
+
+    partition = TermResult.objects.filter(batch=batch, exam_type=exam_type)
+    terms = partition.select_related('student').only(
+        'student__student_name', 'student__admission_id', 'student__course', 'student__enrolled_for',
+        'batch', 'exam_type', 'exams', 'total', 'out_of', 'percentage', 'grade', 'rank',
+    ).order_by('rank', 'student__student_name')
+    if student_id is not None:
+        terms = terms.filter(student_id=student_id)
+    terms = list(terms)
+    if not terms:
+        raise Http404('No term results found')
+    ranked = partition.count()
+
+    results = StudentResult.objects.filter(exam__batch=batch, student_id__in=[term.student_id for term in terms])
+    if exam_type:
+        results = results.filter(exam__exam_type=exam_type)
+    results_by_student = {}
+    for student, *row in results.order_by('exam__exam_date', 'exam__name').values_list(
+        'student_id', 'exam__name', 'exam__subject', 'exam__exam_date', 'exam__total_marks',
+        'marks_obtained', 'is_absent',
+    ):
+        results_by_student.setdefault(student, []).append(row)
+
+    styles = getSampleStyleSheet()
+    elements = []
+    for term in terms:
+        if elements:
+            elements.append(PageBreak())
+        elements.extend(term_card_elements(term, results_by_student.get(term.student_id, []), ranked, styles))
+
+    buffer = io.BytesIO()
+    SimpleDocTemplate(buffer, pagesize=A4).build(elements)
+    buffer.seek(0)
+    response = HttpResponse(buffer, content_type='application/pdf')
+    name = terms[0].student.admission_id if student_id is not None else batch
+    response['Content-Disposition'] = f'attachment; filename="term_report_{name}_{exam_type or "year"}.pdf"'
+    return response
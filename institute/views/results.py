@@ -0,0 +1,702 @@
+"""Result entry, result lists and report cards."""
+
+from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_POST
+from django.contrib import messages
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.http import Http404
+from django.utils import timezone
+from django.utils.http import urlencode
+
+from ..models import *
+from ..forms import *
+from ..db import write_transaction
+from ..archive import ARCHIVE_DB, archive_configured, get_live_or_archived
+from ..conditional import report_card_etag, result_list_etag, revalidated
+from ..marks import MarksMatrix
+from ..terms import rebuild_term_results
+from .pdf import generate_report_card_pdf, generate_term_report_cards_pdf
+
+
+# Map subject codes to display names and search terms
+SUBJECT_SEARCH_TERMS = {
+    'odia': ['odia', 'odia'],
+    'english': ['english', 'english'],
+    'physics': ['physics', 'physics'],
+    'chemistry': ['chemistry', 'chemistry'],
+    'mathematics': ['mathematics', 'mathematics', 'math'],
+    'biology': ['biology', 'biology'],
+    'it': ['information technology', 'it', 'information'],
+    'electronics': ['electronics', 'electronics'],
+}
+SUBJECT_FIELDS = ('subject1', 'subject2', 'subject3', 'subject4', 'subject5', 'subject6')
+MATRIX_PAGE_SIZE = 50
+MERIT_PAGE_SIZE = 50
+TERM_CARDS_PAGE_SIZE = 50
+
+
+def exam_subject(exam):
+    """``(base subject, display name, search terms)`` of an exam's subject code (e.g. 'it_11')."""
+    # Remove the _11 or _12 suffix
+    base_subject = exam.subject.replace('_11', '').replace('_12', '')
+    search_terms = SUBJECT_SEARCH_TERMS.get(base_subject.lower(), [base_subject.lower()])
+    display_subject = SUBJECT_SEARCH_TERMS.get(base_subject.lower(), [base_subject])[0].title()
+    return base_subject, display_subject, search_terms
+
+
+def takes_subject(subjects, search_terms):
+    """Whether any search term appears in any of a student's subject fields."""
+    return any(term in (subject or '').lower() for subject in subjects for term in search_terms)
+
+
+def exam_roster(exam, students=None):
+    """Admitted students of the exam's batch who take its subject, by name.
+
+    ``students`` may be for_roster() admissions of several batches loaded
+    once for many exams; otherwise the exam's batch is read (one query).
+    """
+    if students is None:
+        students = Admission.objects.for_roster().filter(is_admitted=True, batch=exam.batch).order_by('student_name')
+    search_terms = exam_subject(exam)[2]
+    return [
+        student for student in students
+        if student.batch == exam.batch and takes_subject([getattr(student, field) for field in SUBJECT_FIELDS], search_terms)
+    ]
+
+
+@login_required
+@revalidated(result_list_etag)
+def result_list(request, exam_id):
+    """View results for an exam - Only show students who take that subject"""
+    if request.user.user_type != 'admin':
+        return redirect('home')
+    
+    exam = get_object_or_404(Exam, id=exam_id)
+    base_subject, display_subject, search_terms = exam_subject(exam)
+    
+    # Admitted students of the batch who have this subject in any of their subject fields
+    students = exam_roster(exam)
+    
+    # Get all results with their rank; percentage/grade read result.exam, so reuse the loaded exam
+    results = list(StudentResult.objects.filter(exam=exam).with_rank())
+    for r in results:
+        r.exam = exam
+    
+    # Create a dictionary of results by student ID for quick lookup
+    results_dict = {r.student_id: r for r in results}
+    
+    # Organize results by student
+    student_results = []
+    for student in students:
+        result = results_dict.get(student.id)
+        student_results.append({
+            'student': student,
+            'result': result,
+            'marks': result.marks_obtained if result and not result.is_absent else 0,
+            'is_absent': result.is_absent if result else False,
+            'percentage': result.percentage if result else 0,
+            'grade': result.grade if result else 'N/A',
+            'rank': result.rank if result and not result.is_absent else None,
+        })
+    
+    # Calculate statistics
+    total_students = len(students)
+    appeared_students = len([r for r in results if not r.is_absent])
+    passed_students = len([r for r in results if not r.is_absent and r.marks_obtained >= exam.passing_marks])
+    
+    # Calculate average marks
+    if appeared_students > 0:
+        total_marks = sum([r.marks_obtained for r in results if not r.is_absent])
+        avg_marks = total_marks / appeared_students
+    else:
+        avg_marks = 0
+    
+    context = {
+        'exam': exam,
+        'student_results': student_results,
+        'total_students': total_students,
+        'appeared_students': appeared_students,
+        'passed_students': passed_students,
+        'avg_marks': avg_marks,
+        'subject_display': display_subject,
+        'base_subject': base_subject,
+        'search_terms': search_terms,
+    }
+    return render(request, 'institute/result_list.html', context)
+
+
+@login_required
+def marks_matrix(request):
+    """Every admitted student of a batch against every completed exam of that batch"""
+    if request.user.user_type != 'admin':
+        return redirect('home')
+
+    batches = list(Exam.objects.filter(status='completed').order_by('-batch').values_list('batch', flat=True).distinct())
+    batch = request.GET.get('batch') or (batches[0] if batches else '')
+    order = 'rank' if request.GET.get('order') == 'rank' else 'name'
+    matrix = MarksMatrix.for_batch(batch)
+
+    # Totals and ranks cover the whole batch; only the page's rows are built
+    page = Paginator(matrix.order(order), MATRIX_PAGE_SIZE).get_page(request.GET.get('page'))
+    context = {
+        'batches': batches,
+        'batch': batch,
+        'order': order,
+        'exams': matrix.exams,
+        'exam_averages': matrix.exam_averages(),
+        'page': page,
+        'rows': [matrix.row(i) for i in page],
+        'total_students': len(matrix.students),
+    }
+    return render(request, 'institute/marks_matrix.html', context)
+
+
+@login_required
+def merit_list(request):
+    """Ranked students of one exam (``?exam=``) or of a batch's exams of one type"""
+    if request.user.user_type != 'admin':
+        return redirect('home')
+
+    exam = None
+    if request.GET.get('exam'):
+        exam = get_object_or_404(Exam, id=request.GET['exam'])
+        batch, exam_type = exam.batch, exam.exam_type
+        # Ranked, sorted and paged by the database
+        ranked = StudentResult.objects.filter(exam=exam, is_absent=False).with_rank().order_by(
+            'rank', 'student__student_name'
+        ).values('student__admission_id', 'student__student_name', 'marks_obtained', 'rank', 'dense_rank', 'percentile')
+    else:
+        batch = request.GET.get('batch') or Exam.objects.order_by('-batch').values_list('batch', flat=True).first() or ''
+        exam_type = request.GET.get('exam_type') or Exam.objects.filter(batch=batch).order_by(
+            'exam_type'
+        ).values_list('exam_type', flat=True).first() or ''
+        # The same stored ranks as the term report cards
+        ranked = TermResult.objects.filter(batch=batch, exam_type=exam_type).order_by(
+            'rank', 'student__student_name'
+        ).values('student__admission_id', 'student__student_name', 'exams', 'total', 'out_of', 'percentage', 'rank')
+
+    page = Paginator(ranked, MERIT_PAGE_SIZE).get_page(request.GET.get('page'))
+    for row in page:
+        if exam:
+            row['total'], row['out_of'] = row['marks_obtained'], exam.total_marks
+            row['percentage'] = row['marks_obtained'] / exam.total_marks * 100 if exam.total_marks else 0
+        else:
+            # Share of the class at or below this percentage, as CUME_DIST gives it
+            row['percentile'] = 100 * (page.paginator.count - row['rank'] + 1) / page.paginator.count
+
+    context = {
+        'exam': exam,
+        'batch': batch,
+        'exam_type': exam_type,
+        'batches': Exam.objects.order_by('-batch').values_list('batch', flat=True).distinct(),
+        'exam_types': Exam.EXAM_TYPE_CHOICES,
+        'page': page,
+    }
+    return render(request, 'institute/merit_list.html', context)
+
+
+@login_required
+def result_entry(request, exam_id):
+    """Enter results for an exam - Only show students who take that subject"""
+    if request.user.user_type != 'admin':
+        return redirect('home')
+    
+    exam = get_object_or_404(Exam, id=exam_id)
+    
+    # Get the subject from the exam
+    exam_subject = exam.subject
+    
+    # Extract the base subject name
+    if '_11' in exam_subject:
+        base_subject = exam_subject.replace('_11', '')
+    elif '_12' in exam_subject:
+        base_subject = exam_subject.replace('_12', '')
+    else:
+        base_subject = exam_subject
+    
+    # Map subject codes to search terms
+    subject_map = {
+        'odia': ['odia'],
+        'english': ['english'],
+        'physics': ['physics'],
+        'chemistry': ['chemistry'],
+        'mathematics': ['mathematics', 'math'],
+        'biology': ['biology'],
+        'it': ['information technology', 'it'],
+        'electronics': ['electronics'],
+    }
+    
+    search_terms = subject_map.get(base_subject.lower(), [base_subject.lower()])
+    display_subject = subject_map.get(base_subject.lower(), [base_subject])[0].title()
+    
+    # Get all admitted students with matching batch
+    all_students = Admission.objects.for_roster().filter(
+        is_admitted=True,
+        batch=exam.batch
+    ).order_by('student_name')
+    
+    # Filter students who have this subject
+    students = []
+    for student in all_students:
+        student_subjects = [
+            (student.subject1 or '').lower(),
+            (student.subject2 or '').lower(),
+            (student.subject3 or '').lower(),
+            (student.subject4 or '').lower(),
+            (student.subject5 or '').lower(),
+            (student.subject6 or '').lower(),
+        ]
+        
+        subject_found = False
+        for student_subj in student_subjects:
+            for term in search_terms:
+                if term in student_subj:
+                    subject_found = True
+                    break
+            if subject_found:
+                break
+        
+        if subject_found:
+            students.append(student)
+    
+    if request.method == 'POST':
+        # Process bulk result entry; one transaction, so term results are refreshed once
+        @write_transaction
+        def save_results():
+            updated_count = 0
+            for student in students:
+                marks_key = f'marks_{student.id}'
+                absent_key = f'absent_{student.id}'
+                remarks_key = f'remarks_{student.id}'
+                
+                marks = request.POST.get(marks_key)
+                is_absent = request.POST.get(absent_key) == 'on'
+                remarks = request.POST.get(remarks_key, '')
+                
+                # Only update if the field was present in the form
+                if marks_key in request.POST or absent_key in request.POST:
+                    StudentResult.objects.update_or_create(
+                        exam=exam,
+                        student=student,
+                        defaults={
+                            'marks_obtained': marks if marks and not is_absent else 0,
+                            'is_absent': is_absent,
+                            'remarks': remarks,
+                            'entered_by': request.user
+                        }
+                    )
+                    updated_count += 1
+            return updated_count
+        
+        updated_count = save_results()
+        messages.success(request, f'Successfully updated {updated_count} student results for {display_subject}!')
+        return redirect('result_list', exam_id=exam.id)
+    
+    # Get existing results
+    existing_results = {}
+    for result in StudentResult.objects.filter(exam=exam):
+        existing_results[result.student_id] = result
+    
+    # Absent ticks: the saved result, or the attendance register when no marks are in yet
+    attendance = dict(ExamAttendance.objects.filter(exam=exam).values_list('student_id', 'is_present'))
+    absent_ids = {
+        student.id for student in students
+        if (existing_results[student.id].is_absent if student.id in existing_results else attendance.get(student.id) is False)
+    }
+    
+    context = {
+        'exam': exam,
+        'students': students,
+        'existing_results': existing_results,
+        'absent_ids': absent_ids,
+        'attendance_taken': bool(attendance),
+        'subject_display': display_subject,
+        'total_students': len(students),
+    }
+    return render(request, 'institute/result_entry.html', context)
+
+
+@login_required
+@require_POST
+def bulk_update_results(request, exam_id):
+    """Bulk update multiple student results at once"""
+    if request.user.user_type != 'admin':
+        messages.error(request, 'Permission denied')
+        return redirect('result_list', exam_id=exam_id)
+    
+    exam = get_object_or_404(Exam, id=exam_id)
+    
+    # Get the subject from the exam
+    exam_subject = exam.subject
+    
+    # Extract the base subject name
+    if '_11' in exam_subject:
+        base_subject = exam_subject.replace('_11', '')
+    elif '_12' in exam_subject:
+        base_subject = exam_subject.replace('_12', '')
+    else:
+        base_subject = exam_subject
+    
+    # Map subject codes to search terms
+    subject_map = {
+        'odia': ['odia'],
+        'english': ['english'],
+        'physics': ['physics'],
+        'chemistry': ['chemistry'],
+        'mathematics': ['mathematics', 'math'],
+        'biology': ['biology'],
+        'it': ['information technology', 'it'],
+        'electronics': ['electronics'],
+    }
+    
+    search_terms = subject_map.get(base_subject.lower(), [base_subject.lower()])
+    
+    # Get all admitted students with matching batch
+    all_students = Admission.objects.for_roster().filter(
+        is_admitted=True,
+        batch=exam.batch
+    )
+    
+    # Filter students who have this subject
+    students = []
+    student_ids = []
+    for student in all_students:
+        student_subjects = [
+            (student.subject1 or '').lower(),
+            (student.subject2 or '').lower(),
+            (student.subject3 or '').lower(),
+            (student.subject4 or '').lower(),
+            (student.subject5 or '').lower(),
+            (student.subject6 or '').lower(),
+        ]
+        
+        subject_found = False
+        for student_subj in student_subjects:
+            for term in search_terms:
+                if term in student_subj:
+                    subject_found = True
+                    break
+            if subject_found:
+                break
+        
+        if subject_found:
+            students.append(student)
+            student_ids.append(student.id)
+    
+    # Debug: Print all POST data
+    print("=" * 50)
+    print(f"Processing bulk update for exam: {exam.name}")
+    print(f"Subject: {base_subject}")
+    print(f"Found {len(students)} students with this subject")
+    
+    # All rows are written in one immediate transaction: one lock, one commit
+    @write_transaction
+    def save_results():
+        updated_count = 0
+        errors = []
+        for student in students:
+            student_id = student.id
+            marks_key = f'marks_{student_id}'
+            absent_key = f'absent_{student_id}'
+            
+            # Check if this student's data was submitted
+            if marks_key in request.POST or absent_key in request.POST:
+                marks = request.POST.get(marks_key, '').strip()
+                is_absent = request.POST.get(absent_key) == 'on'
+                
+                print(f"Processing {student.student_name} (ID: {student_id}): marks='{marks}', absent={is_absent}")
+                
+                try:
+                    # Update or create result
+                    result, created = StudentResult.objects.update_or_create(
+                        exam=exam,
+                        student=student,
+                        defaults={
+                            'marks_obtained': marks if marks and not is_absent else 0,
+                            'is_absent': is_absent,
+                            'entered_by': request.user,
+                            'updated_at': timezone.now()
+                        }
+                    )
+                    
+                    updated_count += 1
+                    print(f"  → {'Created' if created else 'Updated'} result")
+                    
+                except Exception as e:
+                    errors.append(f"{student.student_name}: {str(e)}")
+                    print(f"  → ERROR: {str(e)}")
+        return updated_count, errors
+    
+    updated_count, errors = save_results()
+    
+    if errors:
+        for error in errors:
+            messages.error(request, error)
+    
+    if updated_count > 0:
+        messages.success(request, f'Successfully updated {updated_count} student results for {exam.get_subject_display()}!')
+    else:
+        messages.warning(request, 'No changes were saved. Please check the form data.')
+    
+    print(f"Total updated: {updated_count}")
+    print("=" * 50)
+    
+    return redirect('result_list', exam_id=exam.id)
+
+
+@login_required
+def report_card(request):
+    """Generate report card for students"""
+    if request.user.user_type != 'admin':
+        return redirect('home')
+    
+    search_query = request.GET.get('search', '')
+    exam_id = request.GET.get('exam', '')
+    student_id = request.GET.get('student', '')
+    download = request.GET.get('download', '')
+    include_archived = bool(request.GET.get('archived')) and archive_configured()
+    
+    students = []
+    exams = []
+    selected_exam = None
+    selected_student = None
+    
+    # If download parameter is present, generate PDF
+    if download == 'pdf' and student_id and exam_id:
+        return generate_report_card_pdf(request, exam_id, student_id)
+    
+    if student_id:
+        try:
+            selected_student = get_live_or_archived(Admission, id=student_id, is_admitted=True)
+            
+            # Get the student's subjects
+            student_subjects = []
+            if selected_student.subject1:
+                student_subjects.append(selected_student.subject1.lower())
+            if selected_student.subject2:
+                student_subjects.append(selected_student.subject2.lower())
+            if selected_student.subject3:
+                student_subjects.append(selected_student.subject3.lower())
+            if selected_student.subject4:
+                student_subjects.append(selected_student.subject4.lower())
+            if selected_student.subject5:
+                student_subjects.append(selected_student.subject5.lower())
+            if selected_student.subject6:
+                student_subjects.append(selected_student.subject6.lower())
+            
+            print(f"Student: {selected_student.student_name}")
+            print(f"Student subjects: {student_subjects}")
+            
+            # Get all completed exams for this batch
+            all_exams = Exam.objects.using(selected_student._state.db).filter(
+                status='completed',
+                batch=selected_student.batch
+            ).order_by('-exam_date')
+            
+            # Filter exams based on student's subjects
+            exams = []
+            for exam in all_exams:
+                # Extract base subject from exam (remove _11 or _12)
+                exam_subject = exam.subject
+                if '_11' in exam_subject:
+                    base_subject = exam_subject.replace('_11', '')
+                elif '_12' in exam_subject:
+                    base_subject = exam_subject.replace('_12', '')
+                else:
+                    base_subject = exam_subject
+                
+                # Map subject codes to display names
+                subject_map = {
+                    'odia': 'odia',
+                    'english': 'english',
+                    'physics': 'physics',
+                    'chemistry': 'chemistry',
+                    'mathematics': 'mathematics',
+                    'biology': 'biology',
+                    'it': 'information technology',
+                    'electronics': 'electronics',
+                }
+                
+                # Get the base subject name for comparison
+                compare_subject = subject_map.get(base_subject.lower(), base_subject.lower())
+                
+                # Check if student takes this subject
+                takes_subject = False
+                for student_subj in student_subjects:
+                    if compare_subject in student_subj or student_subj in compare_subject:
+                        takes_subject = True
+                        break
+                
+                if takes_subject:
+                    exams.append(exam)
+                    print(f"  ✓ {exam.name} - {exam.get_subject_display()} (Student takes this subject)")
+                else:
+                    print(f"  ✗ {exam.name} - {exam.get_subject_display()} (Student does NOT take this subject)")
+            
+        except Http404:
+            messages.error(request, 'Student not found.')
+    
+    if exam_id:
+        try:
+            exam_db = selected_student._state.db if selected_student else None
+            selected_exam = Exam.objects.using(exam_db).get(id=exam_id)
+        except Exam.DoesNotExist:
+            messages.error(request, 'Exam not found.')
+    
+    # Search for students
+    if search_query:
+        student_search = Admission.objects.for_list().filter(
+            Q(is_admitted=True),
+            Q(student_name__icontains=search_query) |
+            Q(admission_id__icontains=search_query) |
+            Q(mobile_number__icontains=search_query)
+        )
+        students = list(student_search[:20])
+        # Passed-out batches are only searched when asked for
+        if include_archived:
+            students += list(student_search.using(ARCHIVE_DB)[:20])
+    
+    # Get existing results for the selected student
+    exam_results = {}
+    if selected_student and exams:
+        results = selected_student.exam_results.filter(
+            exam__in=exams
+        ).select_related('exam')
+        
+        for result in results:
+            exam_results[result.exam.id] = result
+    
+    context = {
+        'search_query': search_query,
+        'include_archived': include_archived,
+        'students': students,
+        'exams': exams,
+        'selected_exam': selected_exam,
+        'selected_student': selected_student,
+        'exam_results': exam_results,
+    }
+    return render(request, 'institute/report_card_search.html', context)
+
+
+@login_required
+@revalidated(report_card_etag)
+def view_report_card(request, exam_id, student_id):
+    """View report card in browser (not PDF)"""
+    if request.user.user_type != 'admin':
+        return redirect('home')
+    
+    student = get_live_or_archived(Admission, id=student_id, is_admitted=True)
+    exam = get_object_or_404(Exam.objects.using(student._state.db), id=exam_id)
+    
+    try:
+        result = student.exam_results.get(exam=exam)
+    except StudentResult.DoesNotExist:
+        result = None
+    standing = None
+    if result and not result.is_absent:
+        standing = StudentResult.objects.using(student._state.db).standing(exam, student.id)
+    
+    context = {
+        'exam': exam,
+        'student': student,
+        'result': result,
+        'standing': standing,
+    }
+    return render(request, 'institute/report_card_view.html', context)
+
+
+@login_required
+def term_report_cards(request):
+    """Consolidated report cards of a batch for one exam type, or the whole year, read from TermResult"""
+    if request.user.user_type != 'admin':
+        return redirect('home')
+
+    batches = list(Exam.objects.order_by('-batch').values_list('batch', flat=True).distinct())
+    batch = request.GET.get('batch') or (batches[0] if batches else '')
+    exam_type = request.GET.get('exam_type', '')
+    if exam_type not in dict(Exam.EXAM_TYPE_CHOICES):
+        exam_type = ''
+
+    if request.method == 'POST':
+        # Rows written with bulk_create or update() are only picked up by a rebuild
+        count = rebuild_term_results(batch)
+        messages.success(request, f'Rebuilt {count} term results for {batch}.')
+        return redirect(f"{request.path}?{urlencode({'batch': batch, 'exam_type': exam_type})}")
+
+    if request.GET.get('download') == 'pdf':
+        student_id = request.GET.get('student')
+        return generate_term_report_cards_pdf(
+            request, batch, exam_type, int(student_id) if student_id and student_id.isdigit() else None
+        )
+
+    rows = TermResult.objects.filter(batch=batch, exam_type=exam_type).order_by(
+        'rank', 'student__student_name'
+    ).values(
+        'student_id', 'student__admission_id', 'student__student_name',
+        'exams', 'total', 'out_of', 'percentage', 'grade', 'rank',
+    )
+    page = Paginator(rows, TERM_CARDS_PAGE_SIZE).get_page(request.GET.get('page'))
+
+    context = {
+        'batches': batches,
+        'batch': batch,
+        'exam_type': exam_type,
+        'exam_types': Exam.EXAM_TYPE_CHOICES,
+        'page': page,
+    }
+    return render(request, 'institute/term_report_cards.html', context)
+
+
+# @login_required
+# def edit_student_result(request, exam_id, student_id):
+#     """Edit individual student result"""
+#     if request.user.user_type != 'admin':
+#         return redirect('home')
+    
+#     exam = get_object_or_404(Exam, id=exam_id)
+#     student = get_object_or_404(Admission, id=student_id)
+    
+#     # Get existing result
+#     try:
+#         result = StudentResult.objects.get(exam=exam, student=student)
+#     except StudentResult.DoesNotExist:
+#         result = None
+    
+#     context = {
+#         'exam': exam,
+#         'student': student,
+#         'result': result,
+#     }
+#     return render(request, 'institute/edit_student_result.html', context)
+
+
+# @login_required
+# @require_POST
+# def update_student_result(request, exam_id, student_id):
+#     """Update individual student result"""
+#     if request.user.user_type != 'admin':
+#         return redirect('home')
+    
+#     exam = get_object_or_404(Exam, id=exam_id)
+#     student = get_object_or_404(Admission, id=student_id)
+    
+#     marks = request.POST.get('marks_obtained')
+#     is_absent = request.POST.get('is_absent') == 'on'
+#     remarks = request.POST.get('remarks', '')
+    
+#     # Update or create result
+#     result, created = StudentResult.objects.update_or_create(
+#         exam=exam,
+#         student=student,
+#         defaults={
+#             'marks_obtained': marks if marks and not is_absent else 0,
+#             'is_absent': is_absent,
+#             'remarks': remarks,
+#             'entered_by': request.user
+#         }
+#     )
+    
+#     messages.success(request, f'Result for {student.student_name} updated successfully!')
+#     return redirect('result_list', exam_id=exam.id)
@@ -31,6 +31,7 @@ INSTALLED_APPS = [
 CRISPY_TEMPLATE_PACK = 'bootstrap4'
 
 MIDDLEWARE = [
+    'institute.middleware.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -65,10 +66,17 @@ WSGI_APPLICATION = 'mother_institute.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'NAME': os.environ.get('INSTITUTE_DB_PATH', BASE_DIR / 'db.sqlite3'),
+    },
+    # Passed-out batches moved out by ``manage.py archive_batch``
+    'archive': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('INSTITUTE_ARCHIVE_DB_PATH', BASE_DIR / 'archive.sqlite3'),
+    },
 }
 
+DATABASE_ROUTERS = ['institute.archive.ArchiveRouter']
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -100,6 +108,35 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Snapshots written by ``manage.py backup_db``
+BACKUP_ROOT = os.environ.get('INSTITUTE_BACKUP_DIR', BASE_DIR / 'backups')
+
+# Error reports of admission imports (institute.imports); served only to admins
+IMPORT_REPORT_ROOT = os.environ.get('INSTITUTE_IMPORT_REPORT_DIR', BASE_DIR / 'import_reports')
+
+# Request instrumentation (institute.middleware)
+INSTITUTE_SLOW_REQUEST_MS = 500
+INSTITUTE_N_PLUS_ONE_THRESHOLD = 5
+INSTITUTE_SLOW_QUERY_MS = 100
+INSTITUTE_SLOW_QUERY_LOG_SIZE = 1000
+
+# Rows younger than this are left for the next change feed call (institute.changes)
+INSTITUTE_CHANGE_FEED_SETTLE_SECONDS = 30
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'institute.performance': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+        },
+    },
+}
+
 # Default primary key field type
 
 
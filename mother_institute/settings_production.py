@@ -0,0 +1,81 @@
+"""
+Production settings for mother_institute.
+
+Use with ``DJANGO_SETTINGS_MODULE=mother_institute.settings_production``.
+SQLite runs in WAL mode with tuned pragmas, and write views open their
+transactions with BEGIN IMMEDIATE (see institute.db.write_transaction).
+"""
+
+import os
+
+from .settings import *  # noqa: F401,F403
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', SECRET_KEY)
+
+DEBUG = False
+
+ALLOWED_HOSTS = os.environ.get('DJANGO_ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'institute.backends.sqlite3',
+        'NAME': os.environ.get('INSTITUTE_DB_PATH', BASE_DIR / 'db.sqlite3'),
+        # Keep connections (and their pragmas and page cache) between requests
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
+    },
+    'archive': {
+        'ENGINE': 'institute.backends.sqlite3',
+        'NAME': os.environ.get('INSTITUTE_ARCHIVE_DB_PATH', BASE_DIR / 'archive.sqlite3'),
+    },
+}
+
+# Applied to every new SQLite connection by institute.db.apply_sqlite_pragmas
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 268435456,     # 256 MB
+    'cache_size': -64000,       # 64 MB
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,       # ms
+}
+
+# Bounded retry for write transactions that still hit a locked database
+SQLITE_WRITE_ATTEMPTS = 5
+SQLITE_WRITE_BACKOFF = 0.05
+
+# Hashed, precompressed static files (collectstatic), served with the media
+# files by institute.static_serving ahead of sessions and auth. JSON and
+# exports are gzipped after that; HTML pages are not, since they carry the
+# CSRF token next to reflected input (BREACH).
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'institute.storage.CompressedManifestStaticFilesStorage'},
+}
+MIDDLEWARE = MIDDLEWARE.copy()
+MIDDLEWARE[MIDDLEWARE.index('django.middleware.security.SecurityMiddleware') + 1:0] = [
+    'institute.static_serving.StaticMediaMiddleware',
+    'institute.compression.NonHTMLGZipMiddleware',
+]
+
+# Compile each template once per process. Django already wraps the default
+# loaders this way when none are listed; naming them keeps it so if loaders
+# are ever customised. base.html's navigation and footer are additionally
+# fragment-cached (keyed by role and organization version) in the default
+# cache.
+TEMPLATES = [{**TEMPLATES[0], 'APP_DIRS': False, 'OPTIONS': {
+    **TEMPLATES[0]['OPTIONS'],
+    'loaders': [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ],
+}}]
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'institute',
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
+}
@@ -0,0 +1,80 @@
+// Sidebar toggle functionality
+document.addEventListener('DOMContentLoaded', function() {
+    const menuToggle = document.getElementById('menuToggle');
+    const sidebar = document.getElementById('sidebar');
+    const sidebarOverlay = document.getElementById('sidebarOverlay');
+
+    // Toggle sidebar
+    menuToggle.addEventListener('click', function(e) {
+        e.stopPropagation();
+        sidebar.classList.toggle('show');
+        sidebarOverlay.classList.toggle('show');
+    });
+
+    // Close sidebar when clicking overlay
+    sidebarOverlay.addEventListener('click', function() {
+        sidebar.classList.remove('show');
+        sidebarOverlay.classList.remove('show');
+    });
+
+    // Close sidebar when clicking outside on mobile
+    document.addEventListener('click', function(e) {
+        if (window.innerWidth <= 768) {
+            if (!sidebar.contains(e.target) && !menuToggle.contains(e.target)) {
+                sidebar.classList.remove('show');
+                sidebarOverlay.classList.remove('show');
+            }
+        }
+    });
+
+    // Submenu toggle functionality
+    const submenuItems = document.querySelectorAll('.nav-item.has-submenu > .nav-link');
+    submenuItems.forEach(link => {
+        link.addEventListener('click', function(e) {
+            e.preventDefault();
+            const parentItem = this.parentElement;
+            parentItem.classList.toggle('open');
+
+            // Close other submenus
+            document.querySelectorAll('.nav-item.has-submenu').forEach(item => {
+                if (item !== parentItem) {
+                    item.classList.remove('open');
+                }
+            });
+        });
+    });
+
+    // FIXED: Improved active link detection
+    const currentPath = window.location.pathname;
+    const navLinks = document.querySelectorAll('.nav-link');
+
+    navLinks.forEach(link => {
+        const href = link.getAttribute('href');
+        if (href && href !== 'javascript:void(0);') {
+            // Get the clean URL path
+            const hrefPath = href.replace(/^\//, '');
+            const currentPathClean = currentPath.replace(/^\//, '');
+
+            // Check if current path starts with href path (for nested pages)
+            if (currentPathClean === hrefPath || 
+                (hrefPath && currentPathClean.startsWith(hrefPath) && hrefPath !== '')) {
+                // Remove active class from all links first
+                navLinks.forEach(l => l.classList.remove('active'));
+                // Add active class to current link
+                link.classList.add('active');
+            }
+        }
+    });
+
+    // Auto-close sidebar on link click for mobile
+    if (window.innerWidth <= 768) {
+        navLinks.forEach(link => {
+            if (link.getAttribute('href') && link.getAttribute('href') !== 'javascript:void(0);') {
+                link.addEventListener('click', function() {
+                    sidebar.classList.remove('show');
+                    sidebarOverlay.classList.remove('show');
+                });
+            }
+        });
+    }
+});